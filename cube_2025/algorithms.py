@@ -0,0 +1,188 @@
+"""
+Algorithm library.
+The stored algorithms (the F2L, OLL and PLL json files next to this module)
+are loaded on first use, checked, and compiled into programs: the parsed
+moves of a sequence together with its MoveTable, so applying an algorithm
+costs one table application (see Cube.run).
+The checked data and the compiled programs are pickled to CACHE_PATH and
+reused while the json files are unchanged, so new processes skip parsing
+and compiling.
+"""
+
+import json
+import logging
+import os
+import pickle
+from cube import compile_sequence, parse_sequence
+
+DATA_DIR = os.path.dirname(os.path.abspath(__file__))
+# name -> json file, as read by the solver and the last layer index
+ALGORITHM_FILES = {
+    "f2l": "f2l_sequence_data.json",
+    "oll": "oll_sequence_data.json",
+    "oll_table": "oll_table.json",
+    "pll": "pll_sequence_data.json",
+    "pll_algorithms": "pll_sequences.json",
+}
+CACHE_PATH = os.path.join(DATA_DIR, "algorithms.pickle")
+# bump when the pickled layout changes
+CACHE_VERSION = 1
+
+
+class Program:
+    """
+    A sequence compiled ahead of time: its moves as parse_sequence returns
+    them, and the MoveTable of the whole sequence.
+    """
+
+    __slots__ = ("sequence", "moves", "table")
+
+    def __init__(self, sequence):
+        self.sequence = sequence
+        self.moves = tuple(parse_sequence(sequence))
+        self.table = compile_sequence(sequence)
+
+    def __repr__(self):
+        return f"Program({self.sequence!r})"
+
+
+def _sequences(data, path=()):
+    """
+    Yield (path, sequence) for every sequence in nested dicts of sequences.
+    """
+    if isinstance(data, str):
+        yield path, data
+    elif isinstance(data, dict):
+        for key, value in data.items():
+            yield from _sequences(value, path + (key,))
+    else:
+        raise ValueError(f"Invalid algorithm data at {'/'.join(path)}: {data!r}")
+
+
+class AlgorithmLibrary:
+    """
+    Lazily loaded, checked and compiled algorithms.
+    """
+
+    def __init__(self, data_dir=DATA_DIR, cache_path=CACHE_PATH):
+        """
+        Initialize the library, nothing is read until it is used.
+        Parameters:
+        - data_dir: The directory of the json files (default is DATA_DIR).
+        - cache_path: The pickle file for compiled algorithms, None to not
+          keep one (default is CACHE_PATH).
+        """
+        self.logger = logging.getLogger(__name__)
+        self.data_dir = data_dir
+        self.cache_path = cache_path
+        self._data = None
+        self._programs = None
+
+    def _signature(self):
+        """
+        Version, size and modification time of every json file,
+        the cache is only used while they all match.
+        """
+        signature = [CACHE_VERSION]
+        for name in sorted(ALGORITHM_FILES):
+            stat = os.stat(os.path.join(self.data_dir, ALGORITHM_FILES[name]))
+            signature.append((name, stat.st_size, stat.st_mtime_ns))
+        return tuple(signature)
+
+    def _read_cache(self, signature):
+        """
+        Return the pickled (data, programs), or None when there is no
+        usable cache.
+        """
+        if self.cache_path is None or not os.path.exists(self.cache_path):
+            return None
+        try:
+            with open(self.cache_path, "rb") as file:
+                cached = pickle.load(file)
+        except (OSError, pickle.UnpicklingError, EOFError, AttributeError) as error:
+            self.logger.warning("ignoring %s: %s", self.cache_path, error)
+            return None
+        if cached.get("signature") != signature:
+            return None
+        return cached["data"], cached["programs"]
+
+    def _write_cache(self, signature):
+        """
+        Pickle the data and programs, skipped when the directory is read only.
+        """
+        if self.cache_path is None:
+            return
+        cached = {
+            "signature": signature,
+            "data": self._data,
+            "programs": self._programs,
+        }
+        try:
+            with open(self.cache_path + ".tmp", "wb") as file:
+                pickle.dump(cached, file, protocol=pickle.HIGHEST_PROTOCOL)
+            os.replace(self.cache_path + ".tmp", self.cache_path)
+        except OSError as error:
+            self.logger.warning("could not write %s: %s", self.cache_path, error)
+
+    def _read(self, filename):
+        """
+        Read a json file of the library.
+        """
+        with open(os.path.join(self.data_dir, filename), "r", encoding="utf-8") as file:
+            return json.load(file)
+
+    def load(self):
+        """
+        Load, check and compile every algorithm, from the cache when possible.
+        Raises ValueError for data that is not nested dicts of valid sequences.
+        """
+        if self._data is not None:
+            return
+        signature = self._signature()
+        cached = self._read_cache(signature)
+        if cached is not None:
+            self._data, self._programs = cached
+            return
+        data = {}
+        programs = {}
+        for name, filename in ALGORITHM_FILES.items():
+            data[name] = self._read(filename)
+            for path, sequence in _sequences(data[name], (name,)):
+                if sequence not in programs:
+                    try:
+                        programs[sequence] = Program(sequence)
+                    except ValueError as error:
+                        raise ValueError(f"{'/'.join(path)}: {error}") from error
+        if set(data["f2l"]) != {"edge_sequences", "corner_sequences"}:
+            raise ValueError("f2l: expected edge_sequences and corner_sequences")
+        self._data = data
+        self._programs = programs
+        self._write_cache(signature)
+
+    def __getitem__(self, name):
+        """
+        The data of a json file by name (see ALGORITHM_FILES).
+        """
+        self.load()
+        return self._data[name]
+
+    def program(self, sequence):
+        """
+        The program of a sequence, compiled now if it is not in the library.
+        """
+        self.load()
+        program = self._programs.get(sequence)
+        if program is None:
+            program = self._programs[sequence] = Program(sequence)
+        return program
+
+    def __len__(self):
+        """
+        Return the number of compiled programs.
+        """
+        self.load()
+        return len(self._programs)
+
+
+# library shared by the solver and the last layer index
+ALGORITHMS = AlgorithmLibrary()
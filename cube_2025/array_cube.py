@@ -0,0 +1,430 @@
+"""
+Array backed cube engine.
+`ArrayCube` keeps the public `Cube` API, but stores the state as one packed
+piece/orientation code per slot (see `cube.SLOTS`) and applies every face,
+slice, wide and whole cube move with a single gather through `cube.MOVE_TABLES`.
+Cubies handed out by `ArrayCube` are live views of a piece, so code that holds
+on to a cubie across moves (like `Solver`) keeps working unchanged.
+"""
+
+import logging
+from cube import (
+    COLORS,
+    CORNERS,
+    FACES,
+    MOVE_TABLES,
+    SLOT_FACES,
+    SLOT_INDEX,
+    SLOTS,
+    SOLVED_CODES,
+    Cube,
+    Cubie,
+    compile_sequence,
+    face_position,
+    parse_sequence,
+    zobrist_key,
+)
+
+# colors of every piece in its home slot, same as Cube.reset()
+PIECE_COLORS = tuple(
+    tuple(COLORS[FACES.index(face)] for face in faces) for faces in SLOT_FACES
+)
+# STICKERS[code][k] is the color shown on face SLOT_FACES[slot][k]
+# by the piece/orientation packed in code
+STICKERS = tuple(
+    tuple(
+        PIECE_COLORS[code // 3][(k + code % 3) % len(PIECE_COLORS[code // 3])]
+        for k in range(len(PIECE_COLORS[code // 3]))
+    )
+    for code in range(3 * len(SLOTS))
+)
+# sticker colors read in slot face order -> code
+CODE_BY_STICKERS = {
+    STICKERS[code]: code
+    for code in range(3 * len(SLOTS))
+    if code % 3 < len(PIECE_COLORS[code // 3])
+}
+# (slot, k) for every sticker of a state string, by cube size
+FACELETS = {
+    size: tuple(
+        (
+            SLOT_INDEX[face_position(face, index, size)],
+            SLOT_FACES[SLOT_INDEX[face_position(face, index, size)]].index(face),
+        )
+        for face in FACES
+        for index in range(size**2)
+    )
+    for size in (2, 3)
+}
+# number of slots that hold real cubies, by cube size
+PIECE_COUNT = {2: len(CORNERS), 3: len(SLOTS)}
+# ZOBRIST[size][slot][code] is the zobrist key of code in slot,
+# the same key Cube uses for that cubie, or 0 for slots the size does not use
+ZOBRIST = {
+    size: tuple(
+        tuple(
+            zobrist_key(SLOTS[slot], PIECE_COLORS[code // 3], code % 3)
+            if slot < PIECE_COUNT[size] and code % 3 < len(PIECE_COLORS[code // 3])
+            else 0
+            for code in range(3 * len(SLOTS))
+        )
+        for slot in range(len(SLOTS))
+    )
+    for size in (2, 3)
+}
+
+
+class ArrayCubie(Cubie):
+    """
+    Live view of one piece of an ArrayCube.
+    The position and orientation are read from the cube's slot codes,
+    so the view follows its piece through every move.
+    """
+
+    def __init__(self, cube, piece):  # pylint: disable=super-init-not-called
+        self.cube = cube
+        self.piece = piece
+
+    @property
+    def color(self):
+        """
+        Colors of the piece, in the same order as a Cubie in its home slot.
+        """
+        return PIECE_COLORS[self.piece]
+
+    @property
+    def position(self):
+        """
+        Position the piece currently occupies.
+        """
+        return SLOTS[self.cube.slot_of(self.piece)]
+
+    @property
+    def orientation(self):
+        """
+        Orientation of the piece in its current position.
+        """
+        return self.cube.codes[self.cube.slot_of(self.piece)] % 3
+
+    @orientation.setter
+    def orientation(self, orientation):
+        self.cube.set_code(
+            self.cube.slot_of(self.piece),
+            self.piece * 3 + orientation % len(PIECE_COLORS[self.piece]),
+        )
+
+
+class ArrayCube(Cube):
+    """
+    Cube that stores its state as slot codes and moves through move tables.
+    """
+
+    # the codes are kept as the cube is held, so there is no frame to track
+    # and the state hash is a plain attribute
+    frame = 0
+    state_hash = 0
+
+    def __init__(self, **kwargs):  # pylint: disable=super-init-not-called
+        """
+        Initialize the cube with size n x n.
+        Parameters:
+        - size: The size of the cube (default is 3 for a 3x3 cube).
+        - state: A state string representing the cube's current state (optional).
+        - cubies: Cubie objects to copy positions and orientations from (optional).
+        - debug: A boolean flag to enable debug logging (default is False).
+        """
+        self.logger = logging.getLogger(__name__)
+        self.size = kwargs.get("size", 3)
+        if self.size < 2 or self.size > 3:
+            raise ValueError(f"Invalid cube size {self.size}: int({self.size})")
+        self.debug = kwargs.get("debug", False)
+        self.cube = {}
+        self.codes = list(SOLVED_CODES)
+        self.state_hash = 0
+        self.recording = None
+        self._views = []
+        self._where = None
+        if "cubies" in kwargs:
+            self._load_cubies(kwargs["cubies"])
+        elif "state" in kwargs:
+            self.load(kwargs["state"])
+        else:
+            self.reset()
+        self.solved_state = self._solved_state()
+
+    @property
+    def cubies(self):
+        """
+        Views of every piece on the cube.
+        """
+        return self._views
+
+    def _make_views(self):
+        """
+        Create the piece views for the current size.
+        """
+        if len(self._views) != PIECE_COUNT[self.size]:
+            self._views = [
+                ArrayCubie(self, piece) for piece in range(PIECE_COUNT[self.size])
+            ]
+
+    def _load_cubies(self, cubies):
+        """
+        Copy the positions and orientations of a list of cubies.
+        """
+        self.reset()
+        codes = list(SOLVED_CODES)
+        for cubie in cubies:
+            slot = SLOT_INDEX[cubie.position]
+            home = CODE_BY_STICKERS.get(tuple(cubie.color))
+            if home is None:
+                raise ValueError(f"Invalid cubie colors {cubie.color}")
+            # the color tuple may already be rotated from the home order
+            codes[slot] = home - home % 3 + (home % 3 + cubie.orientation) % len(
+                cubie.color
+            )
+        self.set_codes(codes)
+
+    def set_codes(self, codes):
+        """
+        Replace the whole state with a list of slot codes.
+        """
+        self.codes = list(codes)
+        self._where = None
+        zobrist = ZOBRIST[self.size]
+        state_hash = 0
+        for slot, code in enumerate(self.codes):
+            state_hash ^= zobrist[slot][code]
+        self.state_hash = state_hash
+
+    def set_code(self, slot, code):
+        """
+        Replace the code of a single slot.
+        """
+        zobrist = ZOBRIST[self.size][slot]
+        self.state_hash ^= zobrist[self.codes[slot]] ^ zobrist[code]
+        self.codes[slot] = code
+        self._where = None
+
+    def slot_codes(self):
+        """
+        Get the state as a list of slot codes.
+        """
+        return list(self.codes)
+
+    def load_codes(self, codes):
+        """
+        Replace the whole state with a list of slot codes.
+        """
+        self._make_views()
+        self.set_codes(codes)
+
+    def copy(self):
+        """
+        Return an independent copy of the cube.
+        Only the slot codes are duplicated; the copy has its own cubie views.
+        """
+        clone = self.__class__.__new__(self.__class__)
+        clone.__dict__.update(self.__dict__)
+        clone.codes = list(self.codes)
+        clone._views = [ArrayCubie(clone, view.piece) for view in self._views]
+        clone.recording = None
+        return clone
+
+    def snapshot(self):
+        """
+        Capture the current state as an opaque handle for restore().
+        """
+        return (self.size, self.state_hash, tuple(self.codes))
+
+    def restore(self, snapshot):
+        """
+        Return the cube to a state captured by snapshot().
+        Cubie views keep following their pieces.
+        """
+        self.size, self.state_hash, codes = snapshot
+        self._make_views()
+        self.codes = list(codes)
+        self._where = None
+
+    def slot_of(self, piece):
+        """
+        Get the slot that holds `piece`.
+        The inverse permutation is rebuilt at most once per move.
+        """
+        if self._where is None:
+            where = [0] * len(SLOTS)
+            for slot, code in enumerate(self.codes):
+                where[code // 3] = slot
+            self._where = where
+        return self._where[piece]
+
+    def reset(self):
+        """
+        Reset the cube to its solved state.
+        """
+        self._make_views()
+        self.set_codes(SOLVED_CODES)
+
+    def load(self, state):
+        """
+        Load a cube state from a string representation.
+        The string should be 6 * n^2 characters long,
+        representing the colors of the stickers on each face.
+        """
+        self.logger.debug("load: %s", state)
+        states = [char for char in state.upper() if char in COLORS]
+        self.size = int((len(state) / 6) ** 0.5)
+        if self.size not in FACELETS:
+            raise ValueError(f"Invalid cube size {self.size}: int({len(states)} / 6)")
+        if len(states) != 6 * self.size**2:
+            raise ValueError(
+                f"Invalid cube state length {len(states)} for size {self.size}"
+            )
+        self.reset()
+        stickers = [list(colors) for colors in PIECE_COLORS]
+        for (slot, k), color in zip(FACELETS[self.size], states):
+            stickers[slot][k] = color
+        codes = list(SOLVED_CODES)
+        for slot in range(PIECE_COUNT[self.size]):
+            code = CODE_BY_STICKERS.get(tuple(stickers[slot]))
+            if code is None:
+                raise ValueError(
+                    f"Invalid cubie colors {stickers[slot]} at {SLOTS[slot]}"
+                )
+            codes[slot] = code
+        if len({code // 3 for code in codes}) != len(codes):
+            raise ValueError(f"Invalid cube state {state}: duplicate cubies")
+        self.set_codes(codes)
+
+    def is_solved(self):
+        """
+        Check if every piece is home and unturned.
+        The state hashes are compared first, the codes only when they match.
+        """
+        count = PIECE_COUNT[self.size]
+        return self.state_hash == self.solved_state and self.codes[:count] == list(
+            SOLVED_CODES[:count]
+        )
+
+    def __hash__(self):
+        """
+        Return the incrementally updated state hash.
+        """
+        return self.state_hash
+
+    def __eq__(self, other):
+        """
+        Compare ArrayCubes by their codes, anything else by stickers.
+        """
+        if not isinstance(other, ArrayCube):
+            return super().__eq__(other)
+        count = PIECE_COUNT[self.size]
+        return (
+            self.size == other.size
+            and self.state_hash == other.state_hash
+            and self.codes[:count] == other.codes[:count]
+        )
+
+    def get_sticker(self, face, index=None, cubie=None):
+        """
+        Get the sticker at a specific face and index.
+        """
+        if cubie is None:
+            if index is None:
+                raise ValueError("Index must be specified if cubie is not provided")
+            position = face_position(face, index, self.size)
+        else:
+            position = cubie.position
+        slot = SLOT_INDEX[position]
+        try:
+            k = SLOT_FACES[slot].index(face)
+        except ValueError as exc:
+            self.logger.error("Invalid face %s in position %s", face, position)
+            raise ValueError(f"Invalid face {face} in position {position}") from exc
+        return STICKERS[self.codes[slot]][k]
+
+    def set_sticker(self, face, index, color):
+        """
+        Set the sticker at a specific face and index.
+        The slot takes the code of the piece its repainted stickers show.
+        As with Cube, a piece can be in two slots until the stickers of the
+        other one are repainted too.
+        """
+        position = face_position(face, index, self.size)
+        slot = SLOT_INDEX[position]
+        stickers = list(STICKERS[self.codes[slot]])
+        stickers[SLOT_FACES[slot].index(face)] = color
+        code = CODE_BY_STICKERS.get(tuple(stickers))
+        if code is None:
+            raise ValueError(f"Invalid cubie colors {stickers} at {position}")
+        self.set_code(slot, code)
+
+    def get_cubie(self, position):
+        """
+        Get the cubie at a specific position.
+        """
+        slot = SLOT_INDEX.get(position)
+        if slot is None or slot >= PIECE_COUNT[self.size]:
+            return None
+        return self._views[self.codes[slot] // 3]
+
+    def as_string(self):
+        """
+        Return a string representation of the cube for printing.
+        """
+        codes = self.codes
+        return "".join([STICKERS[codes[slot]][k] for slot, k in FACELETS[self.size]])
+
+    def apply_table(self, table):
+        """
+        Apply a precomputed move table to the state in one step.
+        The state hash is updated from the slots the table moves.
+        """
+        old_codes = self.codes
+        codes = self.codes = table.apply(old_codes)
+        self._where = None
+        zobrist = ZOBRIST[self.size]
+        state_hash = self.state_hash
+        for slot in table.moved:
+            state_hash ^= zobrist[slot][old_codes[slot]] ^ zobrist[slot][codes[slot]]
+        self.state_hash = state_hash
+
+    def rotate_cube(self, clockwise=True, axis="Y"):
+        """
+        Rotate the cube around a specified axis.
+        The axis can be 'X', 'Y', or 'Z'.
+        """
+        if axis.upper() not in ("X", "Y", "Z"):
+            raise ValueError(f"Invalid axis {axis}")
+        self.record(axis.upper(), clockwise)
+        self.apply_table(MOVE_TABLES[(axis.upper(), clockwise)])
+
+    def rotate_slice(self, cube_slice, clockwise=True):
+        """
+        Rotate a slice of the cube along M, E, S.
+        """
+        if cube_slice.upper() not in ("M", "E", "S"):
+            raise ValueError(f"Invalid slice {cube_slice}")
+        self.record(cube_slice.upper(), clockwise)
+        self.apply_table(MOVE_TABLES[(cube_slice.upper(), clockwise)])
+
+    def rotate_face(self, face, clockwise=True):
+        """
+        Rotate a face of the cube.
+        """
+        if face not in FACES:
+            raise ValueError(f"Invalid face {face}: {FACES}")
+        self.record(face, clockwise)
+        self.apply_table(MOVE_TABLES[(face, clockwise)])
+
+    def sequence(self, sequence):
+        """
+        Apply a sequence of rotations to the cube.
+        The sequence should be a string of face rotations (e.g., "U, D, L, R, F, B).
+        """
+        self.logger.debug("sequence: %s", sequence)
+        table = compile_sequence(sequence)
+        if self.recording is not None:
+            self.recording.extend(parse_sequence(sequence))
+        self.apply_table(table)
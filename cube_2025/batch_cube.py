@@ -0,0 +1,179 @@
+"""
+Vectorized 3x3 cubes.
+`BatchCube` holds N cube states as an (N, 54) uint8 array of sticker colors
+(indexes into `cube.COLORS`, in the same face order as `Cube.as_string`).
+Every move or compiled sequence is a single gather over the sticker columns,
+so moving, checking and converting many cubes at once is array work.
+"""
+
+from functools import lru_cache
+import numpy as np
+from cube import COLORS, FACES, SEQUENCE_CACHE_SIZE, SLOT_FACES, compile_sequence
+from array_cube import FACELETS, STICKERS
+
+# facelet index of every (slot, k) sticker of a 3x3
+_FACELET_INDEX = {facelet: index for index, facelet in enumerate(FACELETS[3])}
+# the 18 face turns used for random scrambles, in move id order
+SCRAMBLE_MOVES = tuple(face + turn for face in FACES for turn in ("", "'", "2"))
+# ASCII code -> color index
+_COLOR_INDEX = np.full(256, 255, dtype=np.uint8)
+for _index, _color in enumerate(COLORS):
+    _COLOR_INDEX[ord(_color)] = _index
+_COLOR_BYTES = np.frombuffer("".join(COLORS).encode(), dtype=np.uint8)
+SOLVED_FACELETS = np.repeat(np.arange(len(COLORS), dtype=np.uint8), 9)
+# slot and slot face of every sticker, for building stickers from slot codes
+_FACELET_SLOTS = np.array([slot for slot, _ in FACELETS[3]], dtype=np.intp)
+_FACELET_FACES = np.array([k for _, k in FACELETS[3]], dtype=np.intp)
+# _STICKER_COLORS[code, k]: color index of array_cube.STICKERS[code][k]
+_STICKER_COLORS = np.array(
+    [
+        [COLORS.index(color) for color in colors] + [255] * (3 - len(colors))
+        for colors in STICKERS
+    ],
+    dtype=np.uint8,
+)
+
+
+def facelet_permutation(table):
+    """
+    Convert a MoveTable into a permutation of the 54 stickers.
+    After the move, sticker i shows the color sticker permutation[i] showed before.
+    """
+    permutation = np.empty(len(FACELETS[3]), dtype=np.intp)
+    for index, (slot, k) in enumerate(FACELETS[3]):
+        source = table.source[slot]
+        turned = (k + table.twist[slot]) % len(SLOT_FACES[slot])
+        permutation[index] = _FACELET_INDEX[(source, turned)]
+    return permutation
+
+
+@lru_cache(maxsize=SEQUENCE_CACHE_SIZE)
+def sequence_permutation(sequence):
+    """
+    Get the sticker permutation of a whole sequence string.
+    Permutations are kept in an LRU cache, like compiled sequences, and
+    shared by every caller, so they are read only.
+    """
+    permutation = facelet_permutation(compile_sequence(sequence))
+    permutation.setflags(write=False)
+    return permutation
+
+
+# (18, 54) sticker permutation of every scramble move
+SCRAMBLE_PERMUTATIONS = np.stack(
+    [sequence_permutation(move) for move in SCRAMBLE_MOVES]
+)
+
+
+class BatchCube:
+    """
+    N 3x3 cube states stored as one (N, 54) uint8 sticker array.
+    """
+
+    def __init__(self, count=1, facelets=None):
+        """
+        Initialize the batch.
+        Parameters:
+        - count: number of solved cubes to start with (default is 1).
+        - facelets: an existing (N, 54) array of color indexes (optional).
+        """
+        if facelets is None:
+            facelets = np.tile(SOLVED_FACELETS, (count, 1))
+        facelets = np.asarray(facelets, dtype=np.uint8)
+        if facelets.ndim != 2 or facelets.shape[1] != len(SOLVED_FACELETS):
+            raise ValueError(f"Invalid facelet array shape {facelets.shape}")
+        self.facelets = facelets
+
+    @classmethod
+    def from_strings(cls, states):
+        """
+        Build a batch from 54 character state strings.
+        """
+        states = list(states)
+        data = np.frombuffer("".join(states).upper().encode(), dtype=np.uint8)
+        if len(data) != len(states) * len(SOLVED_FACELETS):
+            raise ValueError("Every state string must be 54 characters long")
+        facelets = _COLOR_INDEX[data].reshape(len(states), len(SOLVED_FACELETS))
+        if (facelets == 255).any():
+            raise ValueError(f"State strings may only contain {COLORS}")
+        return cls(facelets=facelets)
+
+    @classmethod
+    def from_codes(cls, codes):
+        """
+        Build a batch from an (N, 26) array of slot codes (see cube.SLOTS),
+        one row per cube, as held (the centers give the frame).
+        """
+        codes = np.asarray(codes, dtype=np.intp)
+        if codes.ndim != 2 or codes.shape[1] != _STICKER_COLORS.shape[0] // 3:
+            raise ValueError(f"Invalid slot code array shape {codes.shape}")
+        return cls(facelets=_STICKER_COLORS[codes[:, _FACELET_SLOTS], _FACELET_FACES])
+
+    def to_strings(self):
+        """
+        Convert every cube to its 54 character state string.
+        """
+        data = _COLOR_BYTES[self.facelets].tobytes().decode()
+        width = len(SOLVED_FACELETS)
+        return [data[start : start + width] for start in range(0, len(data), width)]
+
+    def __len__(self):
+        return len(self.facelets)
+
+    def __getitem__(self, index):
+        """
+        Select cubes by index, slice or mask as a new batch.
+        """
+        return BatchCube(facelets=np.atleast_2d(self.facelets[index]))
+
+    def copy(self):
+        """
+        Return an independent copy of the batch.
+        """
+        return BatchCube(facelets=self.facelets.copy())
+
+    def sequence(self, sequence):
+        """
+        Apply a sequence in Cube.sequence notation to every cube.
+        The whole sequence is compiled into one gather.
+        """
+        self.facelets = self.facelets[:, sequence_permutation(sequence)]
+
+    def apply_moves(self, move_ids):
+        """
+        Apply one scramble move per cube.
+        move_ids is an (N,) array of indexes into SCRAMBLE_MOVES.
+        """
+        permutations = SCRAMBLE_PERMUTATIONS[np.asarray(move_ids)]
+        self.facelets = np.take_along_axis(self.facelets, permutations, axis=1)
+
+    def scramble(self, moves=20, rng=None):
+        """
+        Scramble every cube with its own random face turns.
+        The same face is never turned twice in a row.
+        Returns the (N, moves) array of move ids that was applied.
+        """
+        rng = np.random.default_rng(rng)
+        count = len(self)
+        move_ids = np.empty((count, moves), dtype=np.uint8)
+        faces = rng.integers(len(FACES), size=count)
+        for step in range(moves):
+            if step:
+                faces = (faces + rng.integers(1, len(FACES), size=count)) % len(FACES)
+            move_ids[:, step] = faces * 3 + rng.integers(3, size=count)
+            self.apply_moves(move_ids[:, step])
+        return move_ids
+
+    @staticmethod
+    def move_strings(move_ids):
+        """
+        Convert rows of move ids into sequence strings.
+        """
+        return [" ".join(SCRAMBLE_MOVES[move] for move in row) for row in move_ids]
+
+    def is_solved(self):
+        """
+        Check every cube against the solved state.
+        Returns an (N,) bool array.
+        """
+        return (self.facelets == SOLVED_FACELETS).all(axis=1)
@@ -0,0 +1,161 @@
+"""
+Benchmarks for the cube engines.
+Run from the cube_2025 directory:
+    python benchmark.py [--iterations N]
+"""
+
+import argparse
+import contextlib
+import io
+import json
+import logging
+import math
+import os
+import subprocess
+import sys
+import tempfile
+from time import perf_counter
+from cube import Cube
+from algorithms import CACHE_PATH, DATA_DIR
+from array_cube import ArrayCube
+from scramble_corpus import generate_corpus
+from solver import Solver
+
+# run in a fresh interpreter by bench_startup, prints the timings as json
+STARTUP_SCRIPT = """
+import contextlib, io, json, sys
+from time import perf_counter
+start = perf_counter()
+from cube import Cube
+from solver import Solver
+from algorithms import ALGORITHMS
+imported = perf_counter()
+# a cold start is given an empty cache path, leaving the real cache alone
+if len(sys.argv) > 2:
+    ALGORITHMS.cache_path = sys.argv[2]
+cube = Cube()
+cube.sequence(sys.argv[1])
+with contextlib.redirect_stdout(io.StringIO()):
+    Solver(cube).solve()
+print(json.dumps([imported - start, perf_counter() - imported]))
+"""
+
+
+class LinearScanCube(Cube):
+    """
+    Cube that finds cubies with the original linear scan,
+    used as the baseline for the position index.
+    """
+
+    def get_cubie(self, position):
+        for cubie in self.cubies:
+            if cubie.position == position:
+                return cubie
+        return None
+
+    def get_cubies(self, face_filter=None, color_filter=None, position_filter=None):
+        cubies = []
+        for cubie in self:
+            if face_filter and not any(face in cubie.position for face in face_filter):
+                continue
+            if color_filter and not any(color in cubie.color for color in color_filter):
+                continue
+            if position_filter and not cubie.position in position_filter:
+                continue
+            cubies.append(cubie)
+        return cubies
+
+
+def percentile(values, percent):
+    """
+    Nearest rank percentile of a list of numbers.
+    """
+    values = sorted(values)
+    return values[max(0, math.ceil(percent / 100 * len(values)) - 1)]
+
+
+def per_second(func, iterations):
+    """
+    Call func iterations times and return the calls per second.
+    """
+    start = perf_counter()
+    for _ in range(iterations):
+        func()
+    return iterations / (perf_counter() - start)
+
+
+def bench_as_string(cube_class, iterations=2000):
+    """
+    as_string() calls per second on a scrambled cube.
+    """
+    cube = cube_class()
+    sequence, _ = next(generate_corpus(1))
+    cube.sequence(sequence)
+    return per_second(cube.as_string, iterations)
+
+
+def bench_rotate_face(cube_class, iterations=20000):
+    """
+    Quarter turns per second.
+    """
+    cube = cube_class()
+    return per_second(lambda: cube.rotate_face("R"), iterations)
+
+
+def bench_solve(cube_class, iterations=20):
+    """
+    Solver.solve() calls per second over seeded scrambles.
+    """
+    sequences = [sequence for sequence, _ in generate_corpus(iterations)]
+    start = perf_counter()
+    with contextlib.redirect_stdout(io.StringIO()):
+        for sequence in sequences:
+            cube = cube_class()
+            cube.sequence(sequence)
+            Solver(cube).solve()
+    return iterations / (perf_counter() - start)
+
+
+def bench_startup(cold=False):
+    """
+    Seconds a new process takes to import the solver and to finish its first
+    solve. A cold start has no compiled algorithm cache to load, it compiles
+    into a temporary cache file instead of CACHE_PATH.
+    """
+    sequence, _ = next(generate_corpus(1))
+    with tempfile.TemporaryDirectory() as directory:
+        command = [sys.executable, "-c", STARTUP_SCRIPT, sequence]
+        if cold:
+            command.append(os.path.join(directory, os.path.basename(CACHE_PATH)))
+        output = subprocess.run(
+            command, cwd=DATA_DIR, check=True, capture_output=True, text=True
+        ).stdout
+    return json.loads(output)
+
+
+def main():
+    """
+    Run every benchmark against every engine and print a table.
+    """
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument("--iterations", type=int, default=20, help="solves per engine")
+    args = parser.parse_args()
+    logging.basicConfig(level=logging.ERROR)
+    engines = [LinearScanCube, Cube, ArrayCube]
+    benchmarks = [
+        ("rotate_face/s", bench_rotate_face, {}),
+        ("as_string/s", bench_as_string, {}),
+        ("solve/s", bench_solve, {"iterations": args.iterations}),
+    ]
+    print(f"{'benchmark':<16}" + "".join(f"{e.__name__:>16}" for e in engines))
+    for name, bench, kwargs in benchmarks:
+        results = [bench(engine, **kwargs) for engine in engines]
+        print(f"{name:<16}" + "".join(f"{result:>16.1f}" for result in results))
+    print(f"\n{'startup':<16}{'import ms':>16}{'first solve ms':>16}")
+    for name, cold in (("cold", True), ("cached", False)):
+        results = bench_startup(cold)
+        print(f"{name:<16}" + "".join(f"{1000 * result:>16.1f}" for result in results))
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,408 @@
+"""
+Coordinates for search based solvers.
+A coordinate is a small integer that describes part of a cube state, like the
+permutation of the corners or the orientation of the edges.
+Every coordinate has a move table: `table[coordinate, move]` is the coordinate
+after applying FACE_MOVES[move], so searches can move coordinates with lookups
+instead of moving whole cubes.
+Move tables are built for all coordinates at once with numpy.
+"""
+
+import logging
+from array import array
+from itertools import combinations
+from math import comb, factorial, perm
+import numpy as np
+from cube import CORNERS, EDGES, SLOT_FACES, SOLVED_CODES, compile_sequence
+from batch_cube import SCRAMBLE_MOVES
+from simplify import ORIENTATIONS
+
+# the 18 face turns searched by the solvers, same ids as BatchCube.apply_moves
+FACE_MOVES = SCRAMBLE_MOVES
+FACE_MOVE_TABLES = tuple(compile_sequence(move) for move in FACE_MOVES)
+CORNER_COUNT = len(CORNERS)
+EDGE_COUNT = len(EDGES)
+EDGE_START = CORNER_COUNT
+# number of corner twist and edge flip coordinates
+TWIST_COUNT = 3 ** (CORNER_COUNT - 1)
+FLIP_COUNT = 2 ** (EDGE_COUNT - 1)
+# depth of states a breadth first search has not reached (the largest nibble)
+UNVISITED = 15
+
+
+def _destinations(start, count):
+    """
+    (moves, count) array: where each move sends the piece in slot start + i.
+    """
+    return np.array(
+        [
+            [table.destination[start + slot] - start for slot in range(count)]
+            for table in FACE_MOVE_TABLES
+        ]
+    )
+
+
+def _twists(start, count):
+    """
+    (moves, count) array: orientation added to the piece arriving in each slot.
+    """
+    return np.array(
+        [
+            [table.twist[start + slot] for slot in range(count)]
+            for table in FACE_MOVE_TABLES
+        ]
+    )
+
+
+CORNER_DESTINATIONS = _destinations(0, CORNER_COUNT)
+CORNER_TWISTS = _twists(0, CORNER_COUNT)
+EDGE_DESTINATIONS = _destinations(EDGE_START, EDGE_COUNT)
+EDGE_TWISTS = _twists(EDGE_START, EDGE_COUNT)
+# index of the U or D face in the faces of every corner slot
+UD_FACE = tuple(
+    next(index for index, face in enumerate(SLOT_FACES[slot]) if face in "UD")
+    for slot in range(CORNER_COUNT)
+)
+# corner orientation changes measured against the U/D sticker instead of the
+# first sticker of each slot, so U, D and half turns never twist a corner
+UD_CORNER_TWISTS = np.array(
+    [
+        [
+            (UD_FACE[table.source[slot]] - UD_FACE[slot] - table.twist[slot]) % 3
+            for slot in range(CORNER_COUNT)
+        ]
+        for table in FACE_MOVE_TABLES
+    ]
+)
+# the four edges of the E slice (FL, FR, BL, BR)
+SLICE_EDGES = tuple(range(8, EDGE_COUNT))
+SLICE_COUNT = comb(EDGE_COUNT, len(SLICE_EDGES))
+# center slots, after the corners and edges
+_CENTERS = slice(EDGE_START + EDGE_COUNT, len(SOLVED_CODES))
+
+
+def rank_positions(positions, count):
+    """
+    Rank rows of distinct positions in range(count).
+    Each row of k positions gets a rank in range(perm(count, k)).
+    """
+    positions = np.asarray(positions, dtype=np.int64)
+    ranks = np.zeros(len(positions), dtype=np.int64)
+    for index in range(positions.shape[1]):
+        digit = positions[:, index].copy()
+        for before in range(index):
+            digit -= positions[:, before] < positions[:, index]
+        ranks = ranks * (count - index) + digit
+    return ranks
+
+
+def unrank_positions(ranks, count, length):
+    """
+    Inverse of rank_positions(): (N, length) positions for every rank.
+    """
+    ranks = np.asarray(ranks, dtype=np.int64)
+    digits = np.empty((len(ranks), length), dtype=np.int64)
+    for index in range(length - 1, -1, -1):
+        ranks, digits[:, index] = np.divmod(ranks, count - index)
+    rows = np.arange(len(digits))
+    available = np.ones((len(digits), count), dtype=bool)
+    positions = np.empty_like(digits)
+    for index in range(length):
+        taken = np.cumsum(available, axis=1)
+        positions[:, index] = np.argmax(taken > digits[:, index : index + 1], axis=1)
+        available[rows, positions[:, index]] = False
+    return positions
+
+
+def rank_orientations(orientations, modulus):
+    """
+    Rank rows of orientations, first column most significant.
+    """
+    ranks = np.zeros(len(orientations), dtype=np.int64)
+    for column in np.asarray(orientations, dtype=np.int64).T:
+        ranks = ranks * modulus + column
+    return ranks
+
+
+def unrank_orientations(ranks, modulus, length):
+    """
+    Inverse of rank_orientations().
+    """
+    ranks = np.asarray(ranks, dtype=np.int64)
+    orientations = np.empty((len(ranks), length), dtype=np.int64)
+    for index in range(length - 1, -1, -1):
+        ranks, orientations[:, index] = np.divmod(ranks, modulus)
+    return orientations
+
+
+def corner_permutation_moves():
+    """
+    (8!, moves) table of the corner permutation coordinate,
+    the rank of the slots of all eight corner pieces.
+    """
+    positions = unrank_positions(np.arange(factorial(CORNER_COUNT)), CORNER_COUNT, 8)
+    return np.stack(
+        [
+            rank_positions(destinations[positions], CORNER_COUNT)
+            for destinations in CORNER_DESTINATIONS
+        ],
+        axis=1,
+    )
+
+
+def orientation_moves(destinations, twists, modulus, moves=None):
+    """
+    (modulus^(n-1), moves) table of an orientation coordinate:
+    the orientations of the first n - 1 slots, the last one follows from them.
+    destinations and twists are (moves, n) arrays like CORNER_DESTINATIONS and
+    CORNER_TWISTS; moves selects the move ids to build columns for.
+    """
+    moves = range(len(destinations)) if moves is None else moves
+    length = destinations.shape[1]
+    orientations = unrank_orientations(
+        np.arange(modulus ** (length - 1)), modulus, length - 1
+    )
+    orientations = np.hstack(
+        [orientations, -orientations.sum(axis=1, keepdims=True) % modulus]
+    )
+    columns = []
+    for move in moves:
+        moved = np.empty_like(orientations)
+        moved[:, destinations[move]] = orientations
+        columns.append(
+            rank_orientations((moved + twists[move])[:, :-1] % modulus, modulus)
+        )
+    return np.stack(columns, axis=1)
+
+
+def corner_twist_moves():
+    """
+    (3^7, moves) table of the corner twist coordinate,
+    the orientations of the first seven corner slots (the eighth follows).
+    """
+    return orientation_moves(CORNER_DESTINATIONS, CORNER_TWISTS, 3)
+
+
+def permutation_moves(destinations, moves=None):
+    """
+    (n!, moves) table of the permutation of n pieces that the selected moves
+    keep among their n slots, like the corners or, for U, D and half turns,
+    the U and D layer edges.
+    """
+    moves = range(len(destinations)) if moves is None else moves
+    count = destinations.shape[1]
+    positions = unrank_positions(np.arange(factorial(count)), count, count)
+    return np.stack(
+        [rank_positions(destinations[move][positions], count) for move in moves],
+        axis=1,
+    )
+
+
+def rank_combinations(positions):
+    """
+    Rank rows of sorted positions with the combinatorial number system.
+    """
+    ranks = np.zeros(len(positions), dtype=np.int64)
+    for index, column in enumerate(np.asarray(positions).T):
+        ranks += np.array([comb(int(position), index + 1) for position in column])
+    return ranks
+
+
+def slice_moves():
+    """
+    (C(12, 4), moves) table of the slice coordinate: which edge slots hold
+    the four E slice edges, in any order.
+    """
+    positions = np.array(list(combinations(range(EDGE_COUNT), len(SLICE_EDGES))))
+    order = np.argsort(rank_combinations(positions))
+    positions = positions[order]
+    return np.stack(
+        [
+            rank_combinations(np.sort(destinations[positions], axis=1))
+            for destinations in EDGE_DESTINATIONS
+        ],
+        axis=1,
+    )
+
+
+def edge_moves(pieces):
+    """
+    Move tables of the coordinate of a subset of edge pieces
+    (indexes into EDGES).
+    Returns (positions, flips): positions[p, move] is the position coordinate
+    after the move, and flips[p, move] is a bit mask of the pieces that flip,
+    to be XORed into the flip coordinate (bit k for piece k, last piece lowest).
+    """
+    length = len(pieces)
+    count = perm(EDGE_COUNT, length)
+    positions = unrank_positions(np.arange(count), EDGE_COUNT, length)
+    weights = 1 << np.arange(length - 1, -1, -1)
+    position_columns = []
+    flip_columns = []
+    for destinations, added in zip(EDGE_DESTINATIONS, EDGE_TWISTS):
+        moved = destinations[positions]
+        position_columns.append(rank_positions(moved, EDGE_COUNT))
+        flip_columns.append((added[moved] * weights).sum(axis=1))
+    return np.stack(position_columns, axis=1), np.stack(flip_columns, axis=1)
+
+
+def corner_coordinates(codes):
+    """
+    (permutation, twist) coordinates of the corners in a list of slot codes.
+    """
+    positions = [0] * CORNER_COUNT
+    for slot, code in enumerate(codes[:CORNER_COUNT]):
+        positions[code // 3] = slot
+    twists = [code % 3 for code in codes[: CORNER_COUNT - 1]]
+    return (
+        int(rank_positions([positions], CORNER_COUNT)[0]),
+        int(rank_orientations([twists], 3)[0]),
+    )
+
+
+def edge_coordinates(codes, pieces):
+    """
+    (position, flip) coordinates of a subset of edge pieces
+    in a list of slot codes.
+    """
+    slots = {}
+    for slot, code in enumerate(codes[EDGE_START : EDGE_START + EDGE_COUNT]):
+        slots[code // 3 - EDGE_START] = (slot, code % 3)
+    positions = [slots[piece][0] for piece in pieces]
+    flips = [slots[piece][1] for piece in pieces]
+    return (
+        int(rank_positions([positions], EDGE_COUNT)[0]),
+        int(rank_orientations([flips], 2)[0]),
+    )
+
+
+def ud_twist(codes):
+    """
+    Corner twist coordinate measured against the U/D stickers
+    (see UD_CORNER_TWISTS), for orientation_moves(..., UD_CORNER_TWISTS, 3).
+    """
+    twists = [
+        (UD_FACE[code // 3] - code % 3 - UD_FACE[slot]) % 3
+        for slot, code in enumerate(codes[: CORNER_COUNT - 1])
+    ]
+    return int(rank_orientations([twists], 3)[0])
+
+
+def flip(codes):
+    """
+    Edge flip coordinate, the orientations of the first eleven edge slots.
+    """
+    flips = [code % 3 for code in codes[EDGE_START : EDGE_START + EDGE_COUNT - 1]]
+    return int(rank_orientations([flips], 2)[0])
+
+
+def slice_coordinate(codes):
+    """
+    Slice coordinate: the edge slots holding the E slice edges.
+    """
+    positions = [
+        slot
+        for slot, code in enumerate(codes[EDGE_START : EDGE_START + EDGE_COUNT])
+        if code // 3 - EDGE_START in SLICE_EDGES
+    ]
+    return int(rank_combinations([positions])[0])
+
+
+def edge_permutation(codes, pieces):
+    """
+    Permutation coordinate of edge pieces that are in their own slots
+    (the U and D layer edges, or the E slice edges, of a cube in phase 2).
+    """
+    first = pieces[0]
+    positions = [0] * len(pieces)
+    for slot in pieces:
+        positions[codes[EDGE_START + slot] // 3 - EDGE_START - first] = slot - first
+    return int(rank_positions([positions], len(pieces))[0])
+
+
+def breadth_first_depths(count, children, solved=0, moves=None, chunk=1 << 20):
+    """
+    Depth of every state in range(count), searching out from the solved state.
+    children(states, move) returns the state each of states goes to,
+    for every move in range(moves) (default is every face move).
+    States deeper than UNVISITED - 1 are left at UNVISITED.
+    """
+    moves = len(FACE_MOVES) if moves is None else moves
+    depths = np.full(count, UNVISITED, dtype=np.uint8)
+    depths[solved] = 0
+    depth = 0
+    while depth < UNVISITED - 1:
+        frontier = np.flatnonzero(depths == depth)
+        if not len(frontier):
+            break
+        logging.debug("depth %s: %s states", depth, len(frontier))
+        for start in range(0, len(frontier), chunk):
+            states = frontier[start : start + chunk]
+            for move in range(moves):
+                reached = children(states, move)
+                depths[reached[depths[reached] == UNVISITED]] = depth + 1
+        depth += 1
+    return depths
+
+
+def int_array(table):
+    """
+    Flatten a numpy table into an array('i') for fast scalar lookups.
+    """
+    flat = array("i")
+    flat.frombytes(np.ascontiguousarray(table, dtype=np.int32).tobytes())
+    return flat
+
+
+def oriented_codes(cube):
+    """
+    Slot codes of a cube turned so its centers are home,
+    with the whole cube rotations that turn it.
+    """
+    return orient_codes(cube.slot_codes())
+
+
+def orient_codes(codes):
+    """
+    Turn a list of slot codes so its centers are home.
+    Returns the turned codes and the whole cube rotations that turn them.
+    """
+    for table, names in ORIENTATIONS.values():
+        rotated = table.apply(codes)
+        if rotated[_CENTERS] == list(SOLVED_CODES[_CENTERS]):
+            return rotated, list(names)
+    raise ValueError("Invalid cube state: centers can not be oriented")
+
+
+def _parity(pieces):
+    """
+    Parity of a permutation of range(n), 0 for even.
+    """
+    pieces = list(pieces)
+    swaps = 0
+    for index in range(len(pieces)):
+        while pieces[index] != index:
+            target = pieces[index]
+            pieces[index], pieces[target] = pieces[target], pieces[index]
+            swaps += 1
+    return swaps % 2
+
+
+def check_solvable(codes):
+    """
+    Raise ValueError for states that no sequence of moves can solve.
+    """
+    corners = codes[:CORNER_COUNT]
+    edges = codes[EDGE_START : EDGE_START + EDGE_COUNT]
+    corner_pieces = [code // 3 for code in corners]
+    edge_pieces = [code // 3 - EDGE_START for code in edges]
+    # _parity only ends on permutations, a repeated piece would loop forever
+    if (
+        sorted(corner_pieces) != list(range(CORNER_COUNT))
+        or sorted(edge_pieces) != list(range(EDGE_COUNT))
+    ):
+        raise ValueError("Invalid cube state: a piece is missing or repeated")
+    if sum(code % 3 for code in corners) % 3 or sum(code % 3 for code in edges) % 2:
+        raise ValueError("Unsolvable cube state: twisted corner or flipped edge")
+    if _parity(corner_pieces) != _parity(edge_pieces):
+        raise ValueError("Unsolvable cube state: swapped pieces")
@@ -14,7 +14,9 @@ Notes:
 """
 
 import logging
-from random import choice
+from functools import lru_cache
+from random import Random, choice
+from state_encoding import SIZE_BY_BYTES, STATE_BYTES, decode_codes, encode_codes
 # from visualize import print_color_cube
 
 FACES = ["U", "D", "L", "R", "F", "B"]
@@ -255,131 +257,367 @@ def get_axis_map(axis, clockwise=True):
     return ROTATION_MAP_INVERSE[axis]
 
 
+def face_position(face, index, size=3):
+    """
+    Get the cubie position that holds sticker `index` of `face`.
+    A 2x2 cube only has corners, so edge and center indexes are
+    skipped forward to the next corner.
+    """
+    position = FACE_POSITIONS[face][index]
+    if size == 2:
+        while len(position) < 3:
+            index += 1
+            position = FACE_POSITIONS[face][index]
+    return position
+
+
+# Every cubie position is a slot: 8 corners, then 12 edges, then 6 centers.
+# A piece is numbered by its home slot, and the contents of a slot are packed
+# as piece * 3 + orientation, so a whole cube state is a flat list of 26 ints.
+SLOTS = CORNERS + EDGES + FACES
+SLOT_INDEX = {position: slot for slot, position in enumerate(SLOTS)}
+SLOT_FACES = tuple(
+    CORNER_FACE_ORDER.get(position, tuple(position)) for position in SLOTS
+)
+SOLVED_CODES = tuple(slot * 3 for slot in range(len(SLOTS)))
+# home color tuple of every piece -> piece (its home slot)
+PIECE_BY_COLOR = {
+    tuple(FACE_COLORS[face] for face in faces): piece
+    for piece, faces in enumerate(SLOT_FACES)
+}
+
+
+@lru_cache(maxsize=None)
+def zobrist_key(position, color, orientation):
+    """
+    Random 64-bit key for a cubie of `color` at `position` in `orientation`.
+    A cube's state hash is the XOR of the keys of all its cubies, so a move
+    only has to XOR out the old and in the new keys of the cubies it moves.
+    Keys are seeded from their arguments, so they are stable across processes.
+    """
+    return Random(f"{position}:{''.join(color)}:{orientation}").getrandbits(64)
+
+# _TWIST[delta][code] is code with its orientation advanced by delta
+_TWIST = tuple(
+    tuple(
+        code - code % 3 + (code % 3 + delta) % len(SLOTS[code // 3])
+        for code in range(3 * len(SLOTS))
+    )
+    for delta in range(3)
+)
+
+
+class MoveTable:
+    """
+    A precomputed move: a permutation of the 26 slots plus the orientation
+    change of every piece it carries.
+    Slot `dest` receives the piece from slot `source[dest]`, and that piece's
+    orientation advances by `twist[dest]`.
+    """
+
+    __slots__ = ("source", "twist", "steps", "destination", "moved")
+
+    def __init__(self, source, twist):
+        self.source = tuple(source)
+        self.twist = tuple(twist)
+        self.steps = tuple(
+            (src, _TWIST[delta]) for src, delta in zip(self.source, self.twist)
+        )
+        # destination[slot] is where the piece in slot ends up
+        destination = [0] * len(self.source)
+        for dest, src in enumerate(self.source):
+            destination[src] = dest
+        self.destination = tuple(destination)
+        # slots whose contents change
+        self.moved = tuple(
+            dest
+            for dest, (src, delta) in enumerate(zip(self.source, self.twist))
+            if src != dest or delta
+        )
+
+    def apply(self, codes):
+        """
+        Return a new list of slot codes with this move applied.
+        """
+        return [advance[codes[src]] for src, advance in self.steps]
+
+    def then(self, other):
+        """
+        Return the table for this move followed by `other`.
+        """
+        return MoveTable(
+            (self.source[src] for src in other.source),
+            (
+                (self.twist[src] + delta) % len(SLOTS[dest])
+                for dest, (src, delta) in enumerate(zip(other.source, other.twist))
+            ),
+        )
+
+
+IDENTITY_TABLE = MoveTable(range(len(SLOTS)), [0] * len(SLOTS))
+
+
+def _axis_table(axis, clockwise, positions):
+    """
+    Build the move table for turning `positions` a quarter turn about `axis`.
+    A sticker at (position, face) travels to (axis_map[position], axis_map[face]),
+    which fixes how far the orientation of each moved piece advances.
+    """
+    axis_map = get_axis_map(axis, clockwise)
+    source = list(range(len(SLOTS)))
+    twist = [0] * len(SLOTS)
+    for position in positions:
+        slot = SLOT_INDEX[position]
+        dest = SLOT_INDEX[axis_map[position]]
+        source[dest] = slot
+        twist[dest] = -SLOT_FACES[dest].index(axis_map[SLOT_FACES[slot][0]]) % len(
+            position
+        )
+    return MoveTable(source, twist)
+
+
+def _build_move_tables():
+    """
+    Build the move table of every target used in sequence notation,
+    in both directions.
+    """
+    tables = {}
+    for clockwise in (True, False):
+        for face, (axis, axis_clockwise) in FACE_ROTATIONS.items():
+            tables[(face, clockwise)] = _axis_table(
+                axis, clockwise == axis_clockwise, FACE_POSITIONS[face].values()
+            )
+        for cube_slice, axis in SLICE_AXIS.items():
+            tables[(cube_slice, clockwise)] = _axis_table(
+                axis, clockwise, SLICE_POSITIONS[cube_slice]
+            )
+        for axis in "xyz":
+            tables[(axis.upper(), clockwise)] = _axis_table(axis, clockwise, SLOTS)
+    # wide moves turn a face together with the slice next to it
+    for face, cube_slice, same_direction in (
+        ("U", "E", True),
+        ("D", "E", False),
+        ("L", "M", False),
+        ("R", "M", True),
+        ("F", "S", True),
+        ("B", "S", False),
+    ):
+        for clockwise in (True, False):
+            tables[(face.lower(), clockwise)] = tables[(face, clockwise)].then(
+                tables[(cube_slice, clockwise == same_direction)]
+            )
+    return tables
+
+
+MOVE_TABLES = _build_move_tables()
+
+
+def _build_frames():
+    """
+    Every orientation a cube can be held in, as the whole cube rotation
+    table that turns a cube from its home orientation into it.
+    The home orientation comes first.
+    """
+    keys = {(IDENTITY_TABLE.source, IDENTITY_TABLE.twist): 0}
+    frames = [IDENTITY_TABLE]
+    for frame in frames:
+        for axis in "XYZ":
+            turned = frame.then(MOVE_TABLES[(axis, True)])
+            key = (turned.source, turned.twist)
+            if key not in keys:
+                keys[key] = len(frames)
+                frames.append(turned)
+    return tuple(frames)
+
+
+# Cube keeps its cubies in a frame with the centers home (the DBL corner for
+# a 2x2) plus the orientation it is held in, one of FRAMES.
+# Whole cube rotations only change the orientation.
+FRAMES = _build_frames()
+_FRAME_INDEX = {
+    (frame.source, frame.twist): index for index, frame in enumerate(FRAMES)
+}
+# the inverse of a frame carries every piece back to its slot, untwisted
+FRAME_INVERSES = tuple(
+    _FRAME_INDEX[
+        (
+            frame.destination,
+            tuple(
+                -frame.twist[dest] % len(SLOTS[slot])
+                for slot, dest in enumerate(frame.destination)
+            ),
+        )
+    ]
+    for frame in FRAMES
+)
+_CENTER_SLOTS = slice(len(CORNERS) + len(EDGES), len(SLOTS))
+_REFERENCE_CORNER = SLOT_INDEX["DBL"]
+# orientation the cube is held in, from where its centers or DBL corner are
+FRAME_BY_CENTERS = {
+    tuple(frame.apply(SOLVED_CODES)[_CENTER_SLOTS]): index
+    for index, frame in enumerate(FRAMES)
+}
+FRAME_BY_CORNER = {
+    (
+        frame.destination[_REFERENCE_CORNER],
+        frame.twist[frame.destination[_REFERENCE_CORNER]],
+    ): index
+    for index, frame in enumerate(FRAMES)
+}
+# per orientation: position held -> position in the home frame, and
+# position in the home frame -> (position held, orientation added)
+_FRAME_HOME = tuple(
+    {position: SLOTS[frame.source[slot]] for slot, position in enumerate(SLOTS)}
+    for frame in FRAMES
+)
+_FRAME_HELD = tuple(
+    {
+        position: (SLOTS[dest], frame.twist[dest])
+        for position, dest in zip(SLOTS, frame.destination)
+    }
+    for frame in FRAMES
+)
+
+
+def frame_of(codes, size=3):
+    """
+    Index into FRAMES of the orientation a list of slot codes is held in.
+    """
+    if size == 3:
+        frame = FRAME_BY_CENTERS.get(tuple(codes[_CENTER_SLOTS]))
+    else:
+        frame = next(
+            (
+                FRAME_BY_CORNER.get((slot, code % 3))
+                for slot, code in enumerate(codes[: len(CORNERS)])
+                if code // 3 == _REFERENCE_CORNER
+            ),
+            None,
+        )
+    if frame is None:
+        raise ValueError("Invalid cube state: orientation can not be found")
+    return frame
+
+
+@lru_cache(maxsize=4096)
+def framed_table(frame, table, size=3):
+    """
+    A move table applied to a cube held in `frame`, split into the table
+    that moves the cubies in the home frame (None when nothing moves) and
+    the frame the cube is held in afterwards.
+    """
+    turned = FRAMES[frame].then(table)
+    after = frame_of(turned.apply(SOLVED_CODES), size)
+    home_table = turned.then(FRAMES[FRAME_INVERSES[after]])
+    return (home_table if home_table.moved else None), after
+
+
+def parse_sequence(sequence):
+    """
+    Split a sequence string into (target, clockwise, count) tuples.
+    Moves may be separated by commas or spaces and grouped with (), [] or {}.
+    """
+    sequence = sequence.replace("(", "").replace(")", "")
+    sequence = sequence.replace("[", "").replace("]", "")
+    sequence = sequence.replace("{", "").replace("}", "")
+    sequence = sequence.replace(" ", ",")
+    moves = []
+    for move in sequence.split(","):
+        move = move.strip()
+        if not move:
+            continue
+        target = move[0]
+        if target in "xyz":
+            target = target.upper()
+        if (target, True) not in MOVE_TABLES:
+            raise ValueError(f"Invalid move {move} in sequence {sequence}")
+        moves.append((target, "'" not in move, 2 if "2" in move else 1))
+    return moves
+
+
+def format_moves(moves):
+    """
+    Write (target, clockwise, count) moves, as parse_sequence returns them,
+    as a sequence string that Cube.sequence replays.
+    """
+    names = []
+    for target, clockwise, count in moves:
+        if count == 2:
+            names.append(f"{target}2")
+        else:
+            names.append(target if clockwise else f"{target}'")
+    return " ".join(names)
+
+
+# number of compiled sequences kept by compile_sequence
+SEQUENCE_CACHE_SIZE = 4096
+
+
+@lru_cache(maxsize=SEQUENCE_CACHE_SIZE)
+def compile_sequence(sequence):
+    """
+    Compile a sequence string into a single MoveTable.
+    The whole algorithm is composed into one net permutation and orientation
+    change, so replaying it costs one table application however long it is.
+    Compiled sequences are kept in an LRU cache.
+    """
+    table = IDENTITY_TABLE
+    for target, clockwise, count in parse_sequence(sequence):
+        for _ in range(count):
+            table = table.then(MOVE_TABLES[(target, clockwise)])
+    return table
+
+
 class Cubie:
     """
     Class representing a single cubie in the cube.
     Each cubie has a color and an index.
     """
 
-    def rotate(self, axis, clockwise, axis_map=None):
-        """
-        Rotate the cubie around a specified face.
-        The face can be 'U', 'D', 'L', 'R', 'F', or 'B'.
-        face=W specifies whole cube
-        FIXME:
-            cube.py:265:4: R0912: Too many branches (47/12) (too-many-branches)
-            cube.py:265:4: R0915: Too many statements (81/50) (too-many-statements)
-        """
-        logging.debug("Cubie.rotate: %s %s", axis, clockwise)
-        if axis_map is None:
-            axis_map = get_axis_map(axis, clockwise)
-        # rotate the cubie
-        new_position = axis_map[self.position]
-        logging.debug("Cubie.rotate: %s %s", self.position, new_position)
-        self.position = new_position
-        # rotate the cubie orientation
-        if axis == "x" and len(self.color) == 3:  # corner
-            if clockwise:
-                if new_position in ["DBR", "UFL"]:
-                    pass
-                else:
-                    if "R" in new_position:
-                        # rotate the orientation of the cubie
-                        self.orientation = (self.orientation - 1) % len(self.color)
-                    if "L" in new_position:
-                        # rotate the orientation of the cubie
-                        self.orientation = (self.orientation + 1) % len(self.color)
-
-            else:
-                if new_position in ["UBR", "DFL"]:
-                    pass
-                    # self.orientation = (self.orientation - 1) % len(self.color)
-                else:
-                    if "R" in new_position:
-                        # rotate the orientation of the cubie
-                        self.orientation = (self.orientation + 1) % len(self.color)
-                    if "L" in new_position:
-                        # rotate the orientation of the cubie
-                        self.orientation = (self.orientation - 1) % len(self.color)
-        if axis == "x" and len(self.color) == 2:  # edge
-            if new_position in ["DF", "UF", "UB", "DB"]:
-                if clockwise:
-                    # rotate the orientation of the cubie
-                    self.orientation = (self.orientation + 1) % len(self.color)
-                else:
-                    self.orientation = (self.orientation - 1) % len(self.color)
-        if axis == "y" and len(self.color) == 2:  # edge
-            if new_position in ["FL", "FR", "BL", "BR"]:
-                if clockwise:
-                    # rotate the orientation of the cubie
-                    self.orientation = (self.orientation - 1) % len(self.color)
-                else:
-                    self.orientation = (self.orientation + 1) % len(self.color)
-        if axis == "z" and len(self.color) == 3:  # corner
-            if new_position in ["DFR"]:
-                if clockwise:
-                    # rotate the orientation of the cubie
-                    # self.orientation = (self.orientation + 1) % len(self.color)
-                    pass
-                else:
-                    self.orientation = (self.orientation + 1) % len(self.color)
-            elif new_position in ["UFR"]:
-                if clockwise:
-                    # rotate the orientation of the cubie
-                    self.orientation = (self.orientation - 1) % len(self.color)
-                else:
-                    # self.orientation = (self.orientation + 1) % len(self.color)
-                    pass
-            elif new_position in ["UBL"]:
-                if clockwise:
-                    # rotate the orientation of the cubie
-                    # self.orientation = (self.orientation + 1) % len(self.color)
-                    pass
-                else:
-                    self.orientation = (self.orientation - 1) % len(self.color)
-            elif new_position in ["DBL"]:
-                if clockwise:
-                    # rotate the orientation of the cubie
-                    self.orientation = (self.orientation + 1) % len(self.color)
-                else:
-                    # self.orientation = (self.orientation - 1) % len(self.color)
-                    pass
-            elif new_position in ["UBR"]:
-                if clockwise:
-                    # rotate the orientation of the cubie
-                    self.orientation = (self.orientation + 1) % len(self.color)
-                else:
-                    self.orientation = (self.orientation - 1) % len(self.color)
-            elif new_position in ["DBR"]:
-                if clockwise:
-                    # rotate the orientation of the cubie
-                    self.orientation = (self.orientation + 1) % len(self.color)
-                else:
-                    self.orientation = (self.orientation - 1) % len(self.color)
-            else:
-                if clockwise:
-                    self.orientation = (self.orientation - 1) % len(self.color)
-                else:
-                    self.orientation = (self.orientation + 1) % len(self.color)
-        if axis == "z" and len(self.color) == 2:  # edge
-            if new_position in ["UL", "UR", "DL", "DR"]:
-                if clockwise:
-                    # rotate the orientation of the cubie
-                    self.orientation = (self.orientation + 1) % len(self.color)
-                else:
-                    self.orientation = (self.orientation - 1) % len(self.color)
-            if new_position in ["UF", "DF", "UB", "DB", "FL", "FR", "BL", "BR"]:
-                # These edges flip when moved in F/B rotation
-                if clockwise:
-                    self.orientation = (self.orientation + 1) % len(self.color)
-                else:
-                    self.orientation = (self.orientation - 1) % len(self.color)
-
     def __init__(self, cube, position, color, orientation):
+        """
+        Parameters:
+        - cube: the Cube the cubie belongs to.
+        - position, orientation: where the cubie is in the cube's home frame.
+        - color: colors of the cubie.
+        """
         self.cube = cube
-        self.position = position
+        self.home_position = position
         self.color = color
-        self.orientation = orientation
+        self.home_orientation = orientation
+
+    @property
+    def position(self):
+        """
+        Position of the cubie as the cube is held.
+        """
+        frame = self.cube.frame
+        if not frame:
+            return self.home_position
+        return _FRAME_HELD[frame][self.home_position][0]
+
+    @position.setter
+    def position(self, position):
+        frame = self.cube.frame
+        self.home_position = _FRAME_HOME[frame][position] if frame else position
+
+    @property
+    def orientation(self):
+        """
+        Orientation of the cubie as the cube is held.
+        """
+        frame = self.cube.frame
+        if not frame:
+            return self.home_orientation
+        twist = _FRAME_HELD[frame][self.home_position][1]
+        return (self.home_orientation + twist) % len(self.color)
+
+    @orientation.setter
+    def orientation(self, orientation):
+        frame = self.cube.frame
+        if frame:
+            orientation -= _FRAME_HELD[frame][self.home_position][1]
+        self.home_orientation = orientation % len(self.color)
 
     def __repr__(self):
         return (
@@ -444,8 +682,21 @@ class Cube:
         # init cube in solved state
         self.cube = {}
         self.cubies = []
+        # position -> cubie in the home frame, updated by every move
+        self.position_index = {}
+        # XOR of the zobrist keys of every cubie in the home frame,
+        # updated by every move
+        self.home_hash = 0
+        # index into FRAMES of the orientation the cube is held in
+        self.frame = 0
+        # ((home_hash, frame), state_hash) last worked out by state_hash
+        self._held_hash = (None, 0)
+        # (target, clockwise, count) of every move since start_recording
+        self.recording = None
         if "cubies" in kwargs:
             self.cubies = kwargs["cubies"]
+            self.index_cubies()
+            self.rehash()
         elif "state" in kwargs:
             self.load(kwargs["state"])
         else:
@@ -459,13 +710,12 @@ class Cube:
         """
         self.logger.setLevel(level)
 
-
-
     def reset(self):
         """
         Reset the cube to its solved state.
         This method is useful for resetting the cube after scrambling or solving.
         """
+        self.frame = 0
         self.cubies = []
         for corner in CORNERS:
             self.cubies.append(
@@ -497,6 +747,154 @@ class Cube:
                         orientation=0,
                     )
                 )
+        self.index_cubies()
+        self.rehash()
+
+    def index_cubies(self):
+        """
+        Rebuild the position -> cubie index from the cubie list.
+        Only needed after cubie positions are changed without a move.
+        """
+        self.position_index = {cubie.home_position: cubie for cubie in self.cubies}
+
+    def rehash(self):
+        """
+        Recompute the state hash from scratch.
+        Only needed after cubies are changed directly instead of through
+        moves, set_sticker or load.
+        """
+        state_hash = 0
+        for cubie in self.cubies:
+            state_hash ^= zobrist_key(
+                cubie.home_position, cubie.color, cubie.home_orientation
+            )
+        self.home_hash = state_hash
+
+    @property
+    def state_hash(self):
+        """
+        XOR of the zobrist keys of every cubie as the cube is held.
+        Held in the home orientation this is the incrementally kept home_hash,
+        otherwise it is worked out once per state and orientation.
+        """
+        if not self.frame:
+            return self.home_hash
+        key = (self.home_hash, self.frame)
+        if self._held_hash[0] != key:
+            state_hash = 0
+            for cubie in self.cubies:
+                state_hash ^= zobrist_key(
+                    cubie.position, cubie.color, cubie.orientation
+                )
+            self._held_hash = (key, state_hash)
+        return self._held_hash[1]
+
+    def copy(self):
+        """
+        Return an independent copy of the cube.
+        Only the cubie states are duplicated, nothing is rendered or parsed.
+        The copy has its own cubies, bound to the copy.
+        """
+        clone = self.__class__.__new__(self.__class__)
+        clone.__dict__.update(self.__dict__)
+        clone.cubies = [
+            Cubie(clone, cubie.home_position, cubie.color, cubie.home_orientation)
+            for cubie in self.cubies
+        ]
+        clone.index_cubies()
+        clone.recording = None
+        return clone
+
+    def snapshot(self):
+        """
+        Capture the current state as an opaque handle for restore().
+        """
+        return (
+            self.size,
+            self.home_hash,
+            self.frame,
+            tuple(
+                (cubie, cubie.home_position, cubie.color, cubie.home_orientation)
+                for cubie in self.cubies
+            ),
+        )
+
+    def restore(self, snapshot):
+        """
+        Return the cube to a state captured by snapshot().
+        The snapshot's cubie objects are put back in place, so cubies held
+        by callers (like Solver) keep tracking the same pieces.
+        """
+        self.size, self.home_hash, self.frame, cubies = snapshot
+        self.cubies = []
+        for cubie, position, color, orientation in cubies:
+            cubie.home_position = position
+            cubie.color = color
+            cubie.home_orientation = orientation
+            self.cubies.append(cubie)
+        self.index_cubies()
+
+    def slot_codes(self):
+        """
+        Get the state as a list of slot codes (piece * 3 + orientation per slot).
+        """
+        codes = list(SOLVED_CODES)
+        for cubie in self.cubies:
+            piece = PIECE_BY_COLOR.get(tuple(cubie.color))
+            if piece is None:
+                raise ValueError(f"Invalid cubie colors {cubie.color}")
+            codes[SLOT_INDEX[cubie.home_position]] = piece * 3 + cubie.home_orientation
+        if self.frame:
+            return FRAMES[self.frame].apply(codes)
+        return codes
+
+    def load_codes(self, codes):
+        """
+        Replace the whole state with a list of slot codes.
+        """
+        self.reset()
+        frame = frame_of(codes, self.size)
+        if frame:
+            codes = FRAMES[FRAME_INVERSES[frame]].apply(codes)
+        for slot, code in enumerate(codes[: len(self.cubies)]):
+            cubie = self.cubies[code // 3]
+            cubie.home_position = SLOTS[slot]
+            cubie.home_orientation = code % 3
+        self.frame = frame
+        self.index_cubies()
+        self.rehash()
+
+    def to_int(self):
+        """
+        Pack the state into an integer (see state_encoding).
+        Equal states always give the same integer.
+        """
+        return encode_codes(self.slot_codes(), self.size)
+
+    def to_bytes(self):
+        """
+        Pack the state into STATE_BYTES[size] bytes (10 for a 3x3, 4 for a 2x2).
+        """
+        return self.to_int().to_bytes(STATE_BYTES[self.size], "big")
+
+    @classmethod
+    def from_int(cls, value, size=3):
+        """
+        Build a cube from an integer made by to_int().
+        """
+        cube = cls(size=size)
+        cube.load_codes(decode_codes(value, size))
+        return cube
+
+    @classmethod
+    def from_bytes(cls, data):
+        """
+        Build a cube from bytes made by to_bytes().
+        The cube size is taken from the length of the data.
+        """
+        if len(data) not in SIZE_BY_BYTES:
+            raise ValueError(f"Invalid packed state length {len(data)}")
+        return cls.from_int(int.from_bytes(data, "big"), SIZE_BY_BYTES[len(data)])
 
     def centers(self, color_filter=None):
         """
@@ -585,26 +983,34 @@ class Cube:
                 self.set_sticker(face, idx, color)
         # adjust cubies to their positions
         for cubie in self.get_cubies():
-            while cubie.color not in valid_cubies:
+            for _ in range(len(cubie.color)):
+                if cubie.color in valid_cubies:
+                    break
                 cubie.color = cubie.color[1:] + cubie.color[:1]
                 cubie.orientation = (cubie.orientation - 1) % len(cubie.color)
+            else:
+                raise ValueError(f"Invalid cubie colors {cubie.color}")
+        self.rehash()
 
     def _solved_state(self):
         """
         Calculate the solved state of the cube.
-        The solved state is a hash of the cube's current state.
+        The solved state is the state hash of a solved cube of this size.
         """
-        solve_state = ""
-        for color in COLORS:
-            for _ in range(self.size**2):
-                solve_state += color
-        self.logger.debug("solved_state: %s %s", solve_state, hash(solve_state))
-        return hash(solve_state)
+        solved_state = 0
+        count = len(CORNERS) if self.size == 2 else len(SLOTS)
+        for position, faces in zip(SLOTS[:count], SLOT_FACES):
+            color = tuple(FACE_COLORS[face] for face in faces)
+            solved_state ^= zobrist_key(position, color, 0)
+        self.logger.debug("solved_state: %s", solved_state)
+        return solved_state
 
     def scramble(self, moves=20):
         """
         Scramble the cube by performing a series of random rotations.
         The number of moves can be specified (default is 20).
+        Random turns do not give every state the same chance, see
+        random_state.random_cube() for uniform random states.
         """
         for _ in range(moves):
             face = choice(FACES)
@@ -614,9 +1020,12 @@ class Cube:
         """
         Check if the cube is in the solved state.
         The cube is considered solved if all stickers on each face are the same color.
+        The state hashes are compared first, the slot codes only when they match.
         """
-        self.logger.debug("is_solved: %s == %s", self.solved_state, hash(self))
-        return self.solved_state == hash(self)
+        self.logger.debug("is_solved: %s == %s", self.solved_state, self.state_hash)
+        return self.solved_state == self.state_hash and self.slot_codes() == list(
+            SOLVED_CODES
+        )
 
     def get_sticker(self, face, index=None, cubie=None):
         """
@@ -626,41 +1035,19 @@ class Cube:
         if cubie is None:
             if index is None:
                 raise ValueError("Index must be specified if cubie is not provided")
-            self.logger.debug("get_sticker: %s %s", face, index)
-            position = FACE_POSITIONS[face][index]
-            if self.size == 2:
-                while len(position) < 3:
-                    index += 1
-                    position = FACE_POSITIONS[face][index]
-            self.logger.debug("position: %s", position)
+            position = face_position(face, index, self.size)
             cubie = self.get_cubie(position)
         else:
             position = cubie.position
         if cubie is None:
             raise ValueError(f"Invalid cubie position {position}")
-        self.logger.debug("cubie.color: %s", cubie.color)
-        self.logger.debug("cubie.position: %s", cubie.position)
-        self.logger.debug("cubie.orientation: %s", cubie.orientation)
+        self.logger.debug("get_sticker: %s %s %s %s", face, index, position, cubie)
         try:
-            self.logger.debug("position.index(face): %s", position.index(face))
+            face_index = SLOT_FACES[SLOT_INDEX[position]].index(face)
         except ValueError as exc:
             self.logger.error("Invalid face %s in position %s", face, position)
             raise ValueError(f"Invalid face {face} in position {position}") from exc
-        if len(cubie.color) == 3:
-            return cubie.color[
-                (CORNER_FACE_ORDER[position].index(face) + cubie.orientation)
-                % len(cubie.color)
-            ]
-        self.logger.debug(
-            "get edge sticker: %s %s %s %s",
-            face,
-            position.index(face),
-            cubie.position,
-            cubie.color,
-        )
-        return cubie.color[
-            (position.index(face) + cubie.orientation) % len(cubie.color)
-        ]
+        return cubie.color[(face_index + cubie.orientation) % len(cubie.color)]
 
     def set_sticker(self, face, index, color):
         """
@@ -668,11 +1055,7 @@ class Cube:
         This is useful for accessing specific stickers on the cube.
         """
         self.logger.debug("set_sticker: %s %s %s", face, index, color)
-        position = FACE_POSITIONS[face][index]
-        if self.size == 2:
-            while len(position) < 3:
-                index += 1
-                position = FACE_POSITIONS[face][index]
+        position = face_position(face, index, self.size)
         self.logger.debug("position: %s", position)
         cubie = self.get_cubie(position)
         if cubie is None:
@@ -693,25 +1076,46 @@ class Cube:
             color_index = (position.index(face) + cubie.orientation) % len(cubie.color)
         color_list = list(cubie.color)
         color_list[color_index] = color
+        self.home_hash ^= zobrist_key(
+            cubie.home_position, cubie.color, cubie.home_orientation
+        )
         cubie.color = tuple(color_list)
+        self.home_hash ^= zobrist_key(
+            cubie.home_position, cubie.color, cubie.home_orientation
+        )
 
     def get_cubie(self, position):
         """
         Get the cubie at a specific position.
         This is useful for accessing specific cubies on the cube.
+        The position is as the cube is held.
         """
-        for cubie in self.cubies:
-            if cubie.position == position:
-                return cubie
-        return None
+        if self.frame:
+            position = _FRAME_HOME[self.frame].get(position)
+        return self.position_index.get(position)
 
     def get_cubies(self, face_filter=None, color_filter=None, position_filter=None):
         """
         Get a list of cubies that match the specified filters.
         The filters can be face_filter (a list of faces) or color_filter (a list of colors).
+        Position and face filters are resolved through the position index.
         """
+        candidates = self
+        if position_filter:
+            candidates = [self.get_cubie(position) for position in position_filter]
+        elif face_filter:
+            candidates = [
+                self.get_cubie(position)
+                for position in dict.fromkeys(
+                    position
+                    for face in face_filter
+                    for position in FACE_POSITIONS[face].values()
+                )
+            ]
         cubies = []
-        for cubie in self:
+        for cubie in candidates:
+            if cubie is None:
+                continue
             if face_filter and not any(face in cubie.position for face in face_filter):
                 continue
             if color_filter and not any(color in cubie.color for color in color_filter):
@@ -725,13 +1129,22 @@ class Cube:
         """
         Return a hash of the cube's current state.
         This is useful for comparing cube states or storing them in sets/dictionaries.
+        The hash is kept up to date by every move, so this is constant-time.
         """
-        debug = self.debug
-        self.debug = True
-        cube_str = str(self)
-        self.logger.debug("cube_str: %s", {cube_str})
-        self.debug = debug
-        return hash(str(cube_str))
+        return self.state_hash
+
+    def __eq__(self, other):
+        """
+        Cubes are equal when they show the same stickers.
+        The state hashes are compared first, the slot codes only when they match.
+        """
+        if not isinstance(other, Cube):
+            return NotImplemented
+        return (
+            self.size == other.size
+            and self.state_hash == other.state_hash
+            and self.slot_codes() == other.slot_codes()
+        )
 
     def __str__(self):
         """
@@ -739,7 +1152,7 @@ class Cube:
         This is useful for printing the cube's current state.
         """
         return self.as_string()
-        
+
     def as_string(self):
         """
         Return a string representation of the cube for printing.
@@ -775,37 +1188,33 @@ class Cube:
         """
         Rotate the cube around a specified axis.
         The axis can be 'X', 'Y', or 'Z'.
+        Only the orientation the cube is held in changes, no cubie moves.
         """
         self.logger.debug("rotate_cube: %s %s", axis, clockwise)
-        axis = axis.lower()
-        axis_map = get_axis_map(axis, clockwise)
-        for cubie in self.cubies:
-            cubie.rotate(axis, clockwise, axis_map)
+        if axis.upper() not in ("X", "Y", "Z"):
+            raise ValueError(f"Invalid axis {axis}")
+        self.record(axis.upper(), clockwise)
+        self.apply_table(MOVE_TABLES[(axis.upper(), clockwise)])
 
     def rotate_slice(self, cube_slice, clockwise=True):
         """
         Rotate a slice of the cube along M, E, S.
         """
         self.logger.debug("_rotate_slice: %s %s", cube_slice, clockwise)
-        axis = SLICE_AXIS[cube_slice.upper()]
-        axis_map = get_axis_map(axis, clockwise)
-        for cubie in self.get_cubies(
-            position_filter=SLICE_POSITIONS[cube_slice.upper()]
-        ):
-            cubie.rotate(axis, clockwise, axis_map)
+        if cube_slice.upper() not in ("M", "E", "S"):
+            raise ValueError(f"Invalid slice {cube_slice}")
+        self.record(cube_slice.upper(), clockwise)
+        self.apply_table(MOVE_TABLES[(cube_slice.upper(), clockwise)])
 
     def rotate_face(self, face, clockwise=True):
         """
         Rotate a face of the cube.
         """
         self.logger.debug("rotate_face: %s clockwise: %s", face, clockwise)
-        (axis, mod_clockwise) = FACE_ROTATIONS[face]
-        if not mod_clockwise:
-            clockwise = not clockwise
-        axis_map = get_axis_map(axis, clockwise)
-
-        for cubie in self.get_cubies(face_filter=[face]):
-            cubie.rotate(axis, clockwise, axis_map)
+        if face not in FACES:
+            raise ValueError(f"Invalid face {face}: {FACES}")
+        self.record(face, clockwise)
+        self.apply_table(MOVE_TABLES[(face, clockwise)])
 
     def sequence(self, sequence):
         """
@@ -813,51 +1222,75 @@ class Cube:
         The sequence should be a string of face rotations (e.g., "U, D, L, R, F, B).
         """
         self.logger.debug("sequence: %s", sequence)
-        sequence = sequence.replace("(", "").replace(")", "")
-        sequence = sequence.replace("[", "").replace("]", "")
-        sequence = sequence.replace("{", "").replace("}", "")
-        sequence = sequence.replace(" ", ",")
-        sequence = sequence.replace(",,", ",")
-        self.logger.debug("adjusted sequence: %s", sequence)
-        moves = sequence.split(",")
-        moves = [move.strip() for move in moves if move.strip()]
-        for move in moves:
-            self.logger.debug("move: %s", move)
-            target = move[0]
-            count = 1
-            if "2" in move:
-                count = 2
-            clockwise = True
-            if "'" in move:
-                clockwise = False
-            for _ in range(count):
-                if target in FACES:
-                    self.rotate_face(target, clockwise=clockwise)
-                elif target in SLICE_AXIS:
-                    self.rotate_slice(target, clockwise=clockwise)
-                elif target.upper() in ["X", "Y", "Z"]:
-                    self.rotate_cube(axis=target.upper(), clockwise=clockwise)
-                elif target == 'd':
-                    self.rotate_face("D", clockwise=clockwise)
-                    self.rotate_slice("E", clockwise=not clockwise)
-                elif target == 'u':
-                    self.rotate_face("U", clockwise=clockwise)
-                    self.rotate_slice("E", clockwise=clockwise)
-                elif target == 'l':
-                    self.rotate_face("L", clockwise=clockwise)
-                    self.rotate_slice("M", clockwise=not clockwise)
-                elif target == 'r':
-                    self.rotate_face("R", clockwise=clockwise)
-                    self.rotate_slice("M", clockwise=clockwise)
-                elif target == 'f':
-                    self.rotate_face("F", clockwise=clockwise)
-                    self.rotate_slice("S", clockwise=clockwise)
-                elif target == 'b':
-                    self.rotate_face("B", clockwise=clockwise)
-                    self.rotate_slice("S", clockwise=not clockwise)
-                    
-                else:
-                    raise ValueError(f"Invalid move {move} in sequence {sequence}")
+        table = compile_sequence(sequence)
+        if self.recording is not None:
+            self.recording.extend(parse_sequence(sequence))
+        self.apply_table(table)
+
+    def run(self, program):
+        """
+        Apply a sequence compiled ahead of time, see algorithms.Program.
+        Same as sequence(program.sequence) without parsing or compiling it.
+        """
+        self.logger.debug("run: %s", program.sequence)
+        if self.recording is not None:
+            self.recording.extend(program.moves)
+        self.apply_table(program.table)
+
+    def start_recording(self):
+        """
+        Start recording every face, slice and whole cube move applied to the
+        cube, dropping any earlier recording.
+        """
+        self.recording = []
+
+    def stop_recording(self):
+        """
+        Stop recording.
+        Returns the recorded moves as (target, clockwise, count) tuples,
+        see format_moves.
+        """
+        moves = self.recording or []
+        self.recording = None
+        return moves
+
+    def record(self, target, clockwise=True, count=1):
+        """
+        Add a move to the recording, if there is one.
+        """
+        if self.recording is not None:
+            self.recording.append((target, clockwise, count))
+
+    def apply_table(self, table):
+        """
+        Move every cubie through a precomputed move table in one step.
+        The table is seen from the orientation the cube is held in
+        (see framed_table), whole cube rotations only change self.frame.
+        Only the cubies in the slots the table moves are touched.
+        """
+        table, self.frame = framed_table(self.frame, table, self.size)
+        if table is None:
+            return
+        position_index = self.position_index
+        # the moved slots are whole cycles, so every entry read here is
+        # written again below
+        moved = []
+        for slot in table.moved:
+            cubie = position_index.get(SLOTS[slot])
+            if cubie is not None:
+                moved.append((cubie, table.destination[slot]))
+        state_hash = self.home_hash
+        twist = table.twist
+        for cubie, dest in moved:
+            color = cubie.color
+            orientation = cubie.home_orientation
+            state_hash ^= zobrist_key(cubie.home_position, color, orientation)
+            orientation = (orientation + twist[dest]) % len(color)
+            cubie.home_position = position = SLOTS[dest]
+            cubie.home_orientation = orientation
+            state_hash ^= zobrist_key(position, color, orientation)
+            position_index[position] = cubie
+        self.home_hash = state_hash
 
     def __iter__(self):
         """
@@ -0,0 +1,379 @@
+"""
+F2L pair table.
+With the white cross solved on the up face, an F2L pair (a white corner and
+the edge between its two other colors) can be in any of
+8 corner slots * 3 twists * 8 edge slots * 2 flips = 384 cases, the cross
+edges being taken. The table holds, for every case, a shortest sequence of
+face turns that puts the pair into its slot while keeping the cross and every
+F2L slot the pair is not sitting in.
+The table is written for the UFR / FR slot. The other slots use it through
+the whole cube rotation that takes them there, relabeling the moves.
+Cases are searched with IDA*, bounded by the breadth first search distances
+of the cross with the corner, the cross with the edge, and the pair on its
+own, for the target slot and every slot that has to be kept.
+The generated table is stored in F2L_TABLE, rebuild it with:
+    python f2l_table.py --generate
+"""
+
+import argparse
+import json
+import os
+from functools import lru_cache
+from time import perf_counter
+import numpy as np
+from coordinates import (
+    EDGE_START,
+    FACE_MOVE_TABLES,
+    FACE_MOVES,
+    breadth_first_depths,
+    edge_coordinates,
+    edge_moves,
+    int_array,
+    oriented_codes,
+)
+from cube import SLOTS, SOLVED_CODES, compile_sequence
+from white_cross import CROSS_EDGES, FLIP_COUNT
+
+F2L_TABLE = os.path.join(
+    os.path.dirname(os.path.abspath(__file__)), "f2l_table.json"
+)
+MOVE_COUNT = len(FACE_MOVES)
+# (corner slot, edge slot) of every F2L slot, the table is for the first one
+F2L_SLOTS = (
+    (SLOTS.index("UFR"), SLOTS.index("FR")),
+    (SLOTS.index("UBR"), SLOTS.index("BR")),
+    (SLOTS.index("UBL"), SLOTS.index("BL")),
+    (SLOTS.index("UFL"), SLOTS.index("FL")),
+)
+# slots a pair can be in while the cross is solved
+CORNER_SLOTS = tuple(range(8))
+EDGE_SLOTS = tuple(range(EDGE_START + len(CROSS_EDGES), EDGE_START + 12))
+# a single corner is slot * 3 + twist, a single edge (slot - EDGE_START) * 2 + flip
+PIECE_COUNT = 24
+# whole cube rotations about the up face, with their inverses
+ROTATION_NAMES = {"": "", "Y": "Y'", "Y2": "Y2", "Y'": "Y"}
+
+
+def _key(table):
+    """
+    Hashable identity of a move table.
+    """
+    return (table.source, table.twist)
+
+
+def _rotations():
+    """
+    For every F2L slot, the whole cube rotation that takes it to the table's
+    slot, and moves[move]: the face move that `move` is in the rotated view.
+    """
+    face_moves = {_key(table): move for move, table in enumerate(FACE_MOVE_TABLES)}
+    rotations = []
+    for corner, _ in F2L_SLOTS:
+        for name, inverse in ROTATION_NAMES.items():
+            rotation = compile_sequence(name)
+            if rotation.destination[corner] == F2L_SLOTS[0][0]:
+                break
+        inverse = compile_sequence(inverse)
+        moves = tuple(
+            face_moves[_key(inverse.then(table).then(rotation))]
+            for table in FACE_MOVE_TABLES
+        )
+        rotations.append((rotation, moves))
+    return tuple(rotations)
+
+
+ROTATIONS = _rotations()
+
+
+def rotated_view(codes, rotation):
+    """
+    Slot codes of a cube seen after a whole cube rotation: every piece is
+    renamed after the slot its home is turned to, so the centers stay home.
+    """
+    view = []
+    for code in rotation.apply(codes):
+        piece, orientation = divmod(code, 3)
+        home = rotation.destination[piece]
+        orientation = (orientation - rotation.twist[home]) % len(SLOTS[home])
+        view.append(home * 3 + orientation)
+    return view
+
+
+def pair_case(codes):
+    """
+    (corner slot, twist, edge slot, flip) of the table slot's pair.
+    """
+    corner, edge = F2L_SLOTS[0]
+    for slot, code in enumerate(codes):
+        if code // 3 == corner:
+            corner_case = (slot, code % 3)
+        elif code // 3 == edge:
+            edge_case = (slot, code % 3)
+    return corner_case + edge_case
+
+
+def case_key(case):
+    """
+    Table key of a case, like "DFR 1 FR 0".
+    """
+    corner, twist, edge, flip = case
+    return f"{SLOTS[corner]} {twist} {SLOTS[edge]} {flip}"
+
+
+def case_codes(case):
+    """
+    Slot codes with the cross and F2L solved, except for the table slot's pair,
+    which is put in the case, swapping places with the pieces there.
+    """
+    codes = list(SOLVED_CODES)
+    corner, twist, edge, flip = case
+    for home, slot, orientation in (
+        (F2L_SLOTS[0][0], corner, twist),
+        (F2L_SLOTS[0][1], edge, flip),
+    ):
+        codes[home], codes[slot] = codes[slot], home * 3 + orientation
+    return codes
+
+
+def _piece_moves(slots, modulus):
+    """
+    Move table of a single corner or edge over `slots`:
+    moves[piece, move] is the piece after the move.
+    """
+    moves = np.zeros((len(slots) * modulus, MOVE_COUNT), dtype=np.int32)
+    for index, slot in enumerate(slots):
+        for orientation in range(modulus):
+            for move, table in enumerate(FACE_MOVE_TABLES):
+                dest = table.destination[slot]
+                moves[index * modulus + orientation, move] = (
+                    dest - slots[0]
+                ) * modulus + (orientation + table.twist[dest]) % modulus
+    return moves
+
+
+def _frame(codes):
+    """
+    (cross, corner, edge) coordinates of the table slot's pair
+    in a list of slot codes.
+    """
+    position, flip = edge_coordinates(codes, CROSS_EDGES)
+    corner, edge = F2L_SLOTS[0]
+    for slot, code in enumerate(codes):
+        if code // 3 == corner:
+            corner_piece = slot * 3 + code % 3
+        elif code // 3 == edge:
+            edge_piece = (slot - EDGE_START) * 2 + code % 3
+    return position * FLIP_COUNT + flip, corner_piece, edge_piece
+
+
+SOLVED_FRAME = _frame(SOLVED_CODES)
+
+
+@lru_cache(maxsize=None)
+def search_tables():
+    """
+    Build the move and distance tables of the insertion search.
+    Returns (cross, corners, edges) move tables and the
+    (cross with corner, cross with edge, corner with edge) distances,
+    each pair indexed as first * PIECE_COUNT + second.
+    """
+    positions, flips = edge_moves(CROSS_EDGES)
+    # cross[position * FLIP_COUNT + flip, move]
+    cross = (
+        positions[:, None, :] * FLIP_COUNT
+        + (np.arange(FLIP_COUNT)[None, :, None] ^ flips[:, None, :])
+    ).reshape(-1, MOVE_COUNT)
+    corners = _piece_moves(CORNER_SLOTS, 3)
+    edges = _piece_moves(tuple(range(EDGE_START, EDGE_START + 12)), 2)
+    solved_cross, solved_corner, solved_edge = SOLVED_FRAME
+
+    def pair_children(first, second):
+        def children(states, move):
+            one, other = np.divmod(states, PIECE_COUNT)
+            return first[one, move] * PIECE_COUNT + second[other, move]
+
+        return children
+
+    distances = (
+        breadth_first_depths(
+            len(cross) * PIECE_COUNT,
+            pair_children(cross, corners),
+            solved_cross * PIECE_COUNT + solved_corner,
+        ),
+        breadth_first_depths(
+            len(cross) * PIECE_COUNT,
+            pair_children(cross, edges),
+            solved_cross * PIECE_COUNT + solved_edge,
+        ),
+        breadth_first_depths(
+            PIECE_COUNT * PIECE_COUNT,
+            pair_children(corners, edges),
+            solved_corner * PIECE_COUNT + solved_edge,
+        ),
+    )
+    return tuple(int_array(table) for table in (cross, corners, edges)) + tuple(
+        depths.tobytes() for depths in distances
+    )
+
+
+def _distance(frames):
+    """
+    Lower bound of the moves that solve every frame.
+    """
+    _, _, _, cross_corner, cross_edge, pair = search_tables()
+    return max(
+        max(
+            cross_corner[cross * PIECE_COUNT + corner],
+            cross_edge[cross * PIECE_COUNT + edge],
+            pair[corner * PIECE_COUNT + edge],
+        )
+        for cross, corner, edge, _ in frames
+    )
+
+
+def _search(frames, remaining, previous, path):
+    """
+    Search for a sequence of exactly `remaining` more moves solving every
+    frame, a frame being the (cross, corner, edge) coordinates of a pair seen
+    through its rotation, with that rotation's move relabeling.
+    """
+    if remaining == 0:
+        return all(frame[:3] == SOLVED_FRAME for frame in frames)
+    cross_moves, corner_moves, edge_moves_, cross_corner, cross_edge, pair = (
+        search_tables()
+    )
+    for move in range(MOVE_COUNT):
+        face = move // 3
+        if previous is not None:
+            # never turn a face twice in a row, and turn opposite faces
+            # in one order only
+            if face == previous or (face // 2 == previous // 2 and face < previous):
+                continue
+        children = []
+        for cross, corner, edge, moves in frames:
+            view_move = moves[move]
+            cross = cross_moves[cross * MOVE_COUNT + view_move]
+            corner = corner_moves[corner * MOVE_COUNT + view_move]
+            edge = edge_moves_[edge * MOVE_COUNT + view_move]
+            if (
+                cross_corner[cross * PIECE_COUNT + corner] >= remaining
+                or cross_edge[cross * PIECE_COUNT + edge] >= remaining
+                or pair[corner * PIECE_COUNT + edge] >= remaining
+            ):
+                break
+            children.append((cross, corner, edge, moves))
+        else:
+            path.append(move)
+            if _search(children, remaining - 1, face, path):
+                return True
+            path.pop()
+    return False
+
+
+def search_case(case):
+    """
+    Search a shortest insertion of the table slot's pair from a case,
+    keeping the cross and the F2L slots the pair is not in.
+    Returns the list of moves.
+    """
+    codes = case_codes(case)
+    frames = [_frame(codes) + (ROTATIONS[0][1],)]
+    for (corner, edge), (rotation, moves) in zip(F2L_SLOTS[1:], ROTATIONS[1:]):
+        if corner != case[0] and edge != case[2]:
+            frames.append(_frame(rotated_view(codes, rotation)) + (moves,))
+    depth = _distance(frames)
+    path = []
+    while not _search(frames, depth, None, path):
+        depth += 1
+    return [FACE_MOVES[move] for move in path]
+
+
+def all_cases():
+    """
+    Every case of the table slot's pair with the cross solved.
+    """
+    return [
+        (corner, twist, edge, flip)
+        for corner in CORNER_SLOTS
+        for twist in range(3)
+        for edge in EDGE_SLOTS
+        for flip in range(2)
+    ]
+
+
+def generate_table(path=F2L_TABLE):
+    """
+    Search every case and write the table to `path`.
+    """
+    table = {case_key(case): " ".join(search_case(case)) for case in all_cases()}
+    with open(path, "w", encoding="utf-8") as file:
+        json.dump(table, file, indent=2)
+        file.write("\n")
+    f2l_table.cache_clear()
+    return table
+
+
+@lru_cache(maxsize=None)
+def f2l_table():
+    """
+    Load the table: case key -> insertion sequence.
+    """
+    with open(F2L_TABLE, "r", encoding="utf-8") as file:
+        return json.load(file)
+
+
+def pair_insertion(codes, slot):
+    """
+    Moves that insert the pair of an F2L slot (an index into F2L_SLOTS),
+    from slot codes with the centers home and the cross solved.
+    """
+    rotation, moves = ROTATIONS[slot]
+    sequence = f2l_table()[case_key(pair_case(rotated_view(codes, rotation)))]
+    return [
+        FACE_MOVES[moves.index(FACE_MOVES.index(move))] for move in sequence.split()
+    ]
+
+
+def solve_f2l(cube):
+    """
+    Get a list of moves that solves the first two layers of a cube with its
+    white cross solved, one table lookup per pair.
+    Whole cube rotations that put the centers home come first, and the
+    pair with the shortest insertion is always placed next.
+    """
+    codes, moves = oriented_codes(cube)
+    if edge_coordinates(codes, CROSS_EDGES) != edge_coordinates(
+        SOLVED_CODES, CROSS_EDGES
+    ):
+        raise ValueError("The white cross must be solved before F2L")
+    while True:
+        insertions = [
+            pair_insertion(codes, slot)
+            for slot, pieces in enumerate(F2L_SLOTS)
+            if any(codes[piece] != SOLVED_CODES[piece] for piece in pieces)
+        ]
+        if not insertions:
+            return moves
+        insertion = min(insertions, key=len)
+        for move in insertion:
+            codes = FACE_MOVE_TABLES[FACE_MOVES.index(move)].apply(codes)
+        moves.extend(insertion)
+
+
+def main():
+    """
+    Generate the table and print how many cases need each length.
+    """
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument("--generate", action="store_true", help="rebuild the table")
+    args = parser.parse_args()
+    start = perf_counter()
+    table = generate_table() if args.generate else f2l_table()
+    print(f"{len(table)} cases in {perf_counter() - start:.2f} seconds")
+    lengths = [len(sequence.split()) for sequence in table.values()]
+    for length in range(max(lengths) + 1):
+        print(f"  {length} moves: {lengths.count(length)}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,314 @@
+"""
+Korf style optimal solver.
+`KorfSolver` runs an IDA* search over the 18 face turns, bounded by the largest
+of three pattern database lower bounds:
+  - every corner (8! permutations * 3^7 twists),
+  - the first six edges, UF UR UB UL DF DR (12!/6! positions * 2^6 flips),
+  - the other six edges.
+Each database holds the exact number of moves needed to solve its pieces,
+one nibble per state. They are generated once with a breadth first search,
+written to TABLE_DIR and memory mapped on later runs.
+Generate the tables up front with:
+    python korf_solver.py --generate
+"""
+
+import argparse
+import logging
+import mmap
+import os
+from functools import partial
+from time import perf_counter
+import numpy as np
+from coordinates import (
+    FACE_MOVES,
+    EDGE_COUNT,
+    TWIST_COUNT,
+    UNVISITED,
+    breadth_first_depths,
+    check_solvable,
+    corner_coordinates,
+    corner_permutation_moves,
+    corner_twist_moves,
+    edge_coordinates,
+    edge_moves,
+    int_array,
+    oriented_codes,
+)
+from cube import SOLVED_CODES, Cube
+
+TABLE_DIR = os.path.join(
+    os.path.dirname(os.path.abspath(__file__)), "pattern_databases"
+)
+EDGE_PATTERNS = (tuple(range(6)), tuple(range(6, 12)))
+MOVE_COUNT = len(FACE_MOVES)
+
+
+def pack_nibbles(depths):
+    """
+    Pack depths two per byte, even states in the low nibble.
+    """
+    if len(depths) % 2:
+        depths = np.append(depths, UNVISITED)
+    return (depths[0::2] | (depths[1::2] << 4)).astype(np.uint8)
+
+
+class KorfSolver:
+    """
+    Optimal solver using IDA* with pattern database heuristics.
+    """
+
+    def __init__(self, table_dir=TABLE_DIR, corners=True, edge_patterns=EDGE_PATTERNS):
+        """
+        Load the move tables and pattern databases, generating missing ones.
+        Parameters:
+        - table_dir: directory the pattern databases are stored in.
+        - corners: use the corner pattern database (default is True).
+        - edge_patterns: tuples of edge pieces (indexes into EDGES)
+          to build edge pattern databases for, covering every edge once.
+        """
+        self.logger = logging.getLogger(__name__)
+        self.table_dir = table_dir
+        os.makedirs(table_dir, exist_ok=True)
+        self._files = []
+        self.corner_permutations = corner_permutation_moves()
+        self.corner_twists = corner_twist_moves()
+        self.corner_permutations_flat = int_array(self.corner_permutations)
+        self.corner_twists_flat = int_array(self.corner_twists)
+        self.corner_table = None
+        if corners:
+            self.corner_table = self._database("corners", self._corner_depths)
+        self.edge_patterns = tuple(tuple(pieces) for pieces in edge_patterns)
+        # the search state is only complete if every edge is in some pattern
+        if sorted(piece for pieces in self.edge_patterns for piece in pieces) != list(
+            range(EDGE_COUNT)
+        ):
+            raise ValueError(f"Edge patterns must cover every edge: {edge_patterns}")
+        self.edge_tables = []
+        for pieces in self.edge_patterns:
+            name = "edges_" + "_".join(str(piece) for piece in pieces)
+            positions, flips = self._edge_moves(name, pieces)
+            flip_count = 2 ** len(pieces)
+            position, flip = edge_coordinates(SOLVED_CODES, pieces)
+            solved = position * flip_count + flip
+            table = self._database(
+                name, partial(self._edge_depths, positions, flips, flip_count, solved)
+            )
+            self.edge_tables.append(
+                (int_array(positions), int_array(flips), flip_count, table)
+            )
+        self._solved = self._state(list(SOLVED_CODES))
+        self.stats = {}
+
+    def _database(self, name, build):
+        """
+        Memory map a nibble packed pattern database, building it first if needed.
+        """
+        path = os.path.join(self.table_dir, f"{name}.pdb")
+        if not os.path.exists(path):
+            start = perf_counter()
+            packed = pack_nibbles(build())
+            packed.tofile(path + ".tmp")
+            os.replace(path + ".tmp", path)
+            self.logger.info("built %s in %.1fs", path, perf_counter() - start)
+        with open(path, "rb") as file:
+            table = mmap.mmap(file.fileno(), 0, access=mmap.ACCESS_READ)
+        self._files.append(table)
+        return table
+
+    def _edge_moves(self, name, pieces):
+        """
+        Load or build the move tables of an edge pattern.
+        """
+        path = os.path.join(self.table_dir, f"{name}.moves.npz")
+        if os.path.exists(path):
+            with np.load(path) as tables:
+                return tables["positions"], tables["flips"]
+        positions, flips = edge_moves(pieces)
+        positions = positions.astype(np.int32)
+        flips = flips.astype(np.uint8)
+        np.savez(path, positions=positions, flips=flips)
+        return positions, flips
+
+    def _corner_depths(self):
+        """
+        Breadth first search over the corner permutation and twist.
+        """
+        permutations = self.corner_permutations
+        twists = self.corner_twists
+
+        def children(states, move):
+            permutation, twist = np.divmod(states, TWIST_COUNT)
+            return permutations[permutation, move] * TWIST_COUNT + twists[twist, move]
+
+        return breadth_first_depths(len(permutations) * TWIST_COUNT, children)
+
+    @staticmethod
+    def _edge_depths(positions, flips, flip_count, solved):
+        """
+        Breadth first search over the positions and flips of an edge pattern.
+        """
+
+        def children(states, move):
+            position, flip = np.divmod(states, flip_count)
+            return positions[position, move] * flip_count + (
+                flip ^ flips[position, move]
+            )
+
+        return breadth_first_depths(len(positions) * flip_count, children, solved)
+
+    def close(self):
+        """
+        Release the memory mapped pattern databases.
+        """
+        for table in self._files:
+            table.close()
+        self._files = []
+
+    @staticmethod
+    def _lookup(table, index):
+        """
+        Read the nibble of a state from a packed pattern database.
+        """
+        return (table[index >> 1] >> ((index & 1) << 2)) & 15
+
+    def _state(self, codes):
+        """
+        Coordinates of a list of slot codes as a flat tuple:
+        corner permutation, corner twist, then position and flip of every
+        edge pattern.
+        """
+        state = corner_coordinates(codes)
+        for pieces in self.edge_patterns:
+            state += edge_coordinates(codes, pieces)
+        return state
+
+    def solve(self, cube, max_depth=20):
+        """
+        Find a shortest face turn solution for a 3x3 cube.
+        Returns the list of moves, starting with any whole cube rotations
+        needed to put the centers home, or None if there is no solution
+        within max_depth face turns.
+        Search statistics are kept in self.stats.
+        """
+        if cube.size != 3:
+            raise ValueError(f"Invalid cube size {cube.size}: KorfSolver solves 3x3")
+        codes, rotations = oriented_codes(cube)
+        check_solvable(codes)
+        start = self._state(codes)
+        self.stats = {"nodes": 0, "nodes_per_depth": [0] * (max_depth + 1)}
+        timer = perf_counter()
+        path = []
+        bound = self._heuristic(start)
+        found = False
+        while bound <= max_depth:
+            self.logger.debug("searching to depth %s", bound)
+            result = self._search(start, 0, bound, None, path)
+            if result is True:
+                found = True
+                break
+            bound = result
+        seconds = perf_counter() - timer
+        self.stats["seconds"] = seconds
+        self.stats["nodes_per_second"] = self.stats["nodes"] / seconds if seconds else 0
+        if not found:
+            return None
+        return rotations + [FACE_MOVES[move] for move in path]
+
+    def _heuristic(self, state):
+        """
+        Largest pattern database lower bound of a state.
+        """
+        bound = 0
+        if self.corner_table is not None:
+            bound = self._lookup(self.corner_table, state[0] * TWIST_COUNT + state[1])
+        for offset, (_, _, flip_count, table) in enumerate(self.edge_tables, 1):
+            position, flip = state[2 * offset], state[2 * offset + 1]
+            bound = max(bound, self._lookup(table, position * flip_count + flip))
+        return bound
+
+    def _search(self, state, depth, bound, previous, path):
+        """
+        Depth first search from a state whose estimate is within bound.
+        Children are estimated before they are searched, so nodes are only
+        entered (and counted) when they can still lead to a solution.
+        Returns True when solved, otherwise the smallest bound that was exceeded.
+        """
+        if state == self._solved:
+            return True
+        self.stats["nodes"] += 1
+        self.stats["nodes_per_depth"][depth] += 1
+        corner_table = self.corner_table
+        permutations = self.corner_permutations_flat
+        twists = self.corner_twists_flat
+        edge_tables = self.edge_tables
+        limit = bound - depth - 1
+        permutation, twist = state[0], state[1]
+        smallest = UNVISITED * 2
+        for move in range(MOVE_COUNT):
+            face = move // 3
+            if previous is not None:
+                # never turn a face twice in a row, and turn opposite faces
+                # in one order only
+                if face == previous or (face // 2 == previous // 2 and face < previous):
+                    continue
+            child = [
+                permutations[permutation * MOVE_COUNT + move],
+                twists[twist * MOVE_COUNT + move],
+            ]
+            estimate = 0
+            if corner_table is not None:
+                index = child[0] * TWIST_COUNT + child[1]
+                estimate = (corner_table[index >> 1] >> ((index & 1) << 2)) & 15
+            for offset, (positions, flips, flip_count, table) in enumerate(
+                edge_tables, 1
+            ):
+                if estimate > limit:
+                    break
+                index = state[2 * offset] * MOVE_COUNT + move
+                position = positions[index]
+                flip = state[2 * offset + 1] ^ flips[index]
+                child.append(position)
+                child.append(flip)
+                index = position * flip_count + flip
+                estimate = max(
+                    estimate, (table[index >> 1] >> ((index & 1) << 2)) & 15
+                )
+            if estimate > limit:
+                smallest = min(smallest, depth + 1 + estimate)
+                continue
+            path.append(move)
+            result = self._search(tuple(child), depth + 1, bound, face, path)
+            if result is True:
+                return True
+            path.pop()
+            smallest = min(smallest, result)
+        return smallest
+
+
+def main():
+    """
+    Generate the pattern databases and optionally solve a scramble.
+    """
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument("scramble", nargs="?", help="sequence to scramble with")
+    parser.add_argument("--generate", action="store_true", help="build the tables")
+    parser.add_argument("--tables", default=TABLE_DIR, help="table directory")
+    args = parser.parse_args()
+    if not args.generate and not args.scramble:
+        parser.error("give a scramble or --generate")
+    logging.basicConfig(level=logging.INFO)
+    solver = KorfSolver(args.tables)
+    if args.scramble:
+        cube = Cube()
+        cube.sequence(args.scramble)
+        solution = solver.solve(cube)
+        print(" ".join(solution) if solution is not None else "no solution")
+        stats = solver.stats
+        print(f"{stats['nodes']} nodes, {stats['nodes_per_second']:.0f} nodes/s")
+        for depth, nodes in enumerate(stats["nodes_per_depth"]):
+            if nodes:
+                print(f"  depth {depth}: {nodes}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,179 @@
+"""
+Last layer recognition.
+The last layer is read as a 20 sticker key: the 8 outer stickers of the
+yellow face and the 12 side stickers next to it. Every sticker is written as
+the face its color belongs to, so the key does not depend on how the cube is
+held or which colors it has.
+Two indexes are built, once per process:
+  - OLL: orientation keys (only whether each sticker is yellow) -> sequence,
+    the generated OLL table (see oll_table.py), which holds all 216,
+  - PLL: full keys of oriented last layers -> sequence, filled by running
+    every stored PLL algorithm backwards from a solved cube after each of the
+    four pre-AUFs and post-AUFs, so every U turn of a case is in the index.
+With F2L solved, turning the whole cube about U gives the same last layer as
+turning U, so that covers every y rotation too.
+Sequences come back with the AUFs folded in, for the cube held yellow up as
+Solver.invert_cube holds it, and recognition never moves the cube.
+"""
+
+from functools import lru_cache
+from algorithms import ALGORITHMS
+from cube import (
+    FACES,
+    SLOT_FACES,
+    SLOT_INDEX,
+    SLOTS,
+    SOLVED_CODES,
+    MoveTable,
+    compile_sequence,
+    face_position,
+)
+from coordinates import orient_codes, oriented_codes
+from simplify import simplify_sequence
+
+# the last layer is the down face with the centers home
+LAST_FACE = "D"
+# (slot, sticker index in SLOT_FACES) of the 20 last layer stickers
+LAST_LAYER_STICKERS = tuple(
+    (SLOT_INDEX[position], SLOT_FACES[SLOT_INDEX[position]].index(face))
+    for face in FACES
+    for position in (face_position(face, index) for index in range(9))
+    if LAST_FACE in position and len(position) > 1
+)
+# slots that make up the first two layers
+F2L_SLOTS = tuple(
+    slot
+    for slot, position in enumerate(SLOTS)
+    if len(position) > 1 and LAST_FACE not in position
+)
+# cube held yellow up, as Solver.invert_cube leaves it
+YELLOW_UP = "X2"
+AUFS = ("", "U", "U2", "U'")
+
+
+def _sticker_faces():
+    """
+    _STICKER_FACES[code][index]: the home face of the sticker a piece shows
+    on sticker `index` of the slot it is in.
+    """
+    faces = []
+    for code in range(3 * len(SLOTS)):
+        piece, orientation = divmod(code, 3)
+        stickers = SLOT_FACES[piece]
+        faces.append(
+            tuple(
+                stickers[(index + orientation) % len(stickers)]
+                for index in range(len(stickers))
+            )
+        )
+    return tuple(faces)
+
+
+_STICKER_FACES = _sticker_faces()
+
+
+def last_layer_key(codes):
+    """
+    20 character key of the last layer in a list of slot codes
+    with the centers home.
+    """
+    return "".join(
+        _STICKER_FACES[codes[slot]][index] for slot, index in LAST_LAYER_STICKERS
+    )
+
+
+def orientation_key(key):
+    """
+    Orientation part of a last layer key: stickers of the last face stay,
+    every other sticker becomes "_".
+    """
+    return "".join(face if face == LAST_FACE else "_" for face in key)
+
+
+SOLVED_KEY = last_layer_key(SOLVED_CODES)
+ORIENTED_KEY = orientation_key(SOLVED_KEY)
+
+
+def _inverse(table):
+    """
+    Table that undoes a move table.
+    """
+    return MoveTable(
+        table.destination,
+        (
+            -table.twist[dest] % len(SLOTS[slot])
+            for slot, dest in enumerate(table.destination)
+        ),
+    )
+
+
+def case_codes(sequence):
+    """
+    Slot codes, centers home, of the state that `sequence` solves when it is
+    applied to the cube held yellow up.
+    """
+    held = compile_sequence(YELLOW_UP).apply(SOLVED_CODES)
+    table = compile_sequence(sequence)
+    # the sequence ends on a solved cube held however it leaves the centers
+    _, names = orient_codes(table.apply(held))
+    finished = _inverse(compile_sequence(" ".join(names))).apply(SOLVED_CODES)
+    return orient_codes(_inverse(table).apply(finished))[0]
+
+
+def auf_sequences(algorithm):
+    """
+    Yield an algorithm with each of the 4 pre-AUFs and 4 post-AUFs, simplified.
+    The post-AUF turns whichever face the last layer ends up on.
+    """
+    for pre in AUFS:
+        table = compile_sequence(f"{pre} {algorithm}")
+        face = SLOTS[table.destination[SLOT_INDEX["U"]]]
+        for post in AUFS:
+            post = post.replace("U", face)
+            yield simplify_sequence(f"{pre} {algorithm} {post}")
+
+
+@lru_cache(maxsize=None)
+def last_layer_index():
+    """
+    Build the recognition indexes.
+    Returns (oll, pll): orientation key -> sequence, and full key of an
+    oriented last layer -> sequence, keeping the shortest sequence of a key.
+    """
+    oll = dict(ALGORITHMS["oll_table"])
+    pll = {}
+    for algorithm in [""] + list(ALGORITHMS["pll_algorithms"].values()):
+        for sequence in auf_sequences(algorithm):
+            codes = case_codes(sequence)
+            # skip algorithms that do not keep the first two layers
+            # or the orientation of the last one
+            if any(codes[slot] != SOLVED_CODES[slot] for slot in F2L_SLOTS):
+                continue
+            key = last_layer_key(codes)
+            if orientation_key(key) != ORIENTED_KEY:
+                continue
+            if key not in pll or len(sequence.split()) < len(pll[key].split()):
+                pll[key] = sequence
+    return oll, pll
+
+
+def recognize_oll(cube):
+    """
+    Sequence that orients the last layer of a cube with F2L solved,
+    for the cube held yellow up.
+    Returns "" when the last layer is already oriented, the OLL table has
+    every other orientation.
+    """
+    codes, _ = oriented_codes(cube)
+    return last_layer_index()[0].get(orientation_key(last_layer_key(codes)))
+
+
+def recognize_pll(cube):
+    """
+    Sequence that solves the oriented last layer of a cube with F2L solved,
+    for the cube held yellow up.
+    Returns "" when the cube is solved and None for cases that are not in
+    the index.
+    """
+    codes, _ = oriented_codes(cube)
+    return last_layer_index()[1].get(last_layer_key(codes))
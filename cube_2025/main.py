@@ -1,13 +1,30 @@
 """
 main cli loop
 to play with the cube
+With --batch it runs without prompting or rendering instead: every line of a
+file (or of stdin) is a 54 character state string or a scramble sequence from
+a solved cube, and one json line is written per input line, in input order:
+    {"moves": ..., "turns": ..., "ms": ...} or {"error": ...}
+Run:
+    python main.py [--batch [FILE]] [--jobs N]
 """
 
+import argparse
+import contextlib
+import json
 import logging
-from cube import Cube
-from solver import Solver
+import sys
+from collections import deque
+from concurrent.futures import ProcessPoolExecutor
+from itertools import islice
+from time import perf_counter
+from cube import COLORS, Cube
+from solver import Solver, solve_state
 from visualize import print_color_cube
 
+# input lines sent to a worker process at a time
+CHUNK_SIZE = 64
+
 logging.basicConfig(
     level=logging.INFO, format="%(asctime)s - %(levelname)s - %(message)s"
 )
@@ -63,6 +80,7 @@ def main_loop():
                 cubie = cube.get_cubie("DBL")
                 print(f"cubie: {cubie}")
                 cubie.orientation = (cubie.orientation + 1) % len(cubie.color)
+                cube.rehash()
                 print(f"new orientation: {cubie.orientation}")
             elif len(command) == 54:
                 cube = Cube(state=command)
@@ -88,6 +106,107 @@ def main_loop():
                     logging.error(f"Invalid command or cubie: {command}")
 
 
+def read_lines(path="-"):
+    """
+    Yield the stripped, non empty lines of a file, "-" for stdin.
+    """
+    with contextlib.ExitStack() as stack:
+        if path == "-":
+            file = sys.stdin
+        else:
+            file = stack.enter_context(open(path, "r", encoding="utf-8"))
+        for line in file:
+            line = line.strip()
+            if line:
+                yield line
+
+
+def solve_line(line):
+    """
+    Solve one batch input line: a state string or a scramble sequence.
+    Returns {"moves", "turns", "ms"}, or {"error"} for lines that are not
+    a solvable cube or a valid sequence.
+    """
+    start = perf_counter()
+    try:
+        if len(line) == 54 and set(line) <= set(COLORS):
+            state = line
+        else:
+            cube = Cube()
+            cube.sequence(line)
+            state = str(cube)
+        solution = solve_state(state)
+    except ValueError as error:
+        return {"error": str(error)}
+    return {
+        "moves": solution["moves"],
+        "turns": solution["quarter_turns"] + solution["half_turns"],
+        "ms": round(1000 * (perf_counter() - start), 3),
+    }
+
+
+def solve_chunk(lines):
+    """
+    Solve a list of lines in a worker process.
+    """
+    return [solve_line(line) for line in lines]
+
+
+def solve_lines(lines, jobs=1, chunk_size=CHUNK_SIZE):
+    """
+    Yield the result of every line, in input order.
+    With several jobs, chunks of lines are solved by worker processes and
+    only a few chunks per job are read ahead, so any number of lines runs
+    in constant memory.
+    """
+    if jobs <= 1:
+        for line in lines:
+            yield solve_line(line)
+        return
+    lines = iter(lines)
+    with ProcessPoolExecutor(jobs) as executor:
+        pending = deque()
+        while chunk := list(islice(lines, chunk_size)):
+            pending.append(executor.submit(solve_chunk, chunk))
+            if len(pending) >= 2 * jobs:
+                yield from pending.popleft().result()
+        while pending:
+            yield from pending.popleft().result()
+
+
+def run_batch(path="-", jobs=1, output=None):
+    """
+    Solve every line of a file, "-" for stdin, writing one json line each
+    to output (default is stdout).
+    """
+    output = output or sys.stdout
+    for result in solve_lines(read_lines(path), jobs):
+        output.write(json.dumps(result) + "\n")
+        # a pipe is block buffered, flush so each result streams out at once
+        output.flush()
+
+
+def main():
+    """
+    Run the interactive loop, or the batch mode with --batch.
+    """
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument(
+        "--batch",
+        nargs="?",
+        const="-",
+        default=None,
+        metavar="FILE",
+        help="solve every line of FILE (default is stdin) without prompting",
+    )
+    parser.add_argument("--jobs", type=int, default=1, help="batch worker processes")
+    args = parser.parse_args()
+    if args.batch is None:
+        main_loop()
+    else:
+        run_batch(args.batch, args.jobs)
+
+
 if __name__ == "__main__":
-    main_loop()
+    main()
 
@@ -0,0 +1,316 @@
+"""
+OLL table generator.
+Finds a shortest sequence of face turns for every orientation of the last
+layer: the 57 OLL cases, each with its four AUFs, and the solved one, 216
+orientation keys in all (see last_layer.orientation_key).
+Cases are enumerated from orientation coordinates, the twists of the last
+layer corners and the flips of its edges, with every piece home.
+Search runs with the centers home, where the last layer is the down face, on
+states that keep which F2L piece is where but only the orientation of the
+last layer pieces. Every oriented last layer with F2L solved is then a single
+goal state, so the search is bidirectional:
+  - a breadth first search out from the goal, BACKWARD_DEPTH moves deep,
+    is shared by every case,
+  - each case searches forwards one depth at a time, up to FORWARD_DEPTH,
+    until it meets a state of the backward search,
+which gives a shortest sequence of up to 12 moves, enough for every case.
+Sequences are turned for the cube held yellow up, checked against last layer
+recognition, and written to OLL_TABLE.
+Run:
+    python oll_table.py [--output PATH]
+"""
+
+import argparse
+import json
+import logging
+import os
+from itertools import product
+from time import perf_counter
+import numpy as np
+from algorithms import ALGORITHM_FILES, DATA_DIR
+from coordinates import EDGE_COUNT, EDGE_START, FACE_MOVE_TABLES, FACE_MOVES
+from cube import SLOTS, SOLVED_CODES, compile_sequence
+from last_layer import (
+    F2L_SLOTS,
+    LAST_FACE,
+    YELLOW_UP,
+    case_codes,
+    last_layer_key,
+    orientation_key,
+)
+from simplify import simplify_sequence
+
+OLL_TABLE = os.path.join(DATA_DIR, ALGORITHM_FILES["oll_table"])
+BACKWARD_DEPTH = 6
+FORWARD_DEPTH = 6
+MOVE_COUNT = len(FACE_MOVES)
+# corner and edge slots, the centers never move under face turns
+STATE_SLOTS = EDGE_START + EDGE_COUNT
+LAST_CORNERS = tuple(slot for slot in range(EDGE_START) if LAST_FACE in SLOTS[slot])
+LAST_EDGES = tuple(
+    slot for slot in range(EDGE_START, STATE_SLOTS) if LAST_FACE in SLOTS[slot]
+)
+# FACE_MOVES id of the inverse of every face move
+INVERSE_MOVES = tuple(
+    FACE_MOVES.index(
+        move[0] if move.endswith("'") else move if move.endswith("2") else move + "'"
+    )
+    for move in FACE_MOVES
+)
+
+
+def _projection():
+    """
+    PROJECTION[code]: the code with every last layer corner renamed to the
+    first one, and every last layer edge to the first one, orientation kept.
+    """
+    projection = np.arange(3 * len(SLOTS), dtype=np.uint8)
+    for slots in (LAST_CORNERS, LAST_EDGES):
+        for slot in slots:
+            projection[3 * slot : 3 * slot + 3] = np.arange(
+                3 * slots[0], 3 * slots[0] + 3
+            )
+    return projection
+
+
+PROJECTION = _projection()
+# (moves, STATE_SLOTS) source slots, and (moves, STATE_SLOTS, codes) code
+# after the orientation change, of every slot under every face move
+_SOURCES = np.array([table.source[:STATE_SLOTS] for table in FACE_MOVE_TABLES])
+_ADVANCES = np.array(
+    [
+        [advance for _, advance in table.steps[:STATE_SLOTS]]
+        for table in FACE_MOVE_TABLES
+    ],
+    dtype=np.uint8,
+)
+_ROWS = np.arange(STATE_SLOTS)
+
+
+def project(codes):
+    """
+    (1, STATE_SLOTS) search state of a list of slot codes.
+    """
+    return PROJECTION[np.asarray(codes[:STATE_SLOTS])][np.newaxis]
+
+
+def _keys(states):
+    """
+    One sortable value per row of states.
+    """
+    return np.ascontiguousarray(states).view(np.dtype((np.void, STATE_SLOTS)))[:, 0]
+
+
+def _expand(states):
+    """
+    Every state one face turn away from states, without duplicates.
+    Returns (children, parents, moves): children[i] is FACE_MOVES[moves[i]]
+    applied to states[parents[i]].
+    """
+    children = np.concatenate(
+        [
+            _ADVANCES[move][_ROWS, states[:, _SOURCES[move]]]
+            for move in range(MOVE_COUNT)
+        ]
+    )
+    _, first = np.unique(_keys(children), return_index=True)
+    moves, parents = np.divmod(first, len(states))
+    return children[first], parents, moves
+
+
+def _path(layers, depth, index):
+    """
+    FACE_MOVES ids from the first state of a search to layers[depth][0][index].
+    """
+    path = []
+    while depth:
+        _, parents, moves = layers[depth]
+        path.append(int(moves[index]))
+        index = parents[index]
+        depth -= 1
+    return path[::-1]
+
+
+class BackwardSearch:
+    """
+    Breadth first search out from the goal: F2L solved, last layer oriented.
+    """
+
+    def __init__(self, depth=BACKWARD_DEPTH):
+        """
+        Search every state up to depth moves from the goal.
+        Parameters:
+        - depth: The number of moves searched (default is BACKWARD_DEPTH).
+        """
+        goal = project(SOLVED_CODES)
+        self.layers = [(goal, None, None)]
+        keys = _keys(goal)
+        for _ in range(depth):
+            children, parents, moves = _expand(self.layers[-1][0])
+            new = ~np.isin(_keys(children), keys)
+            self.layers.append((children[new], parents[new], moves[new]))
+            keys = np.concatenate([keys, _keys(children[new])])
+        self.depths = np.concatenate(
+            [
+                np.full(len(states), depth)
+                for depth, (states, _, _) in enumerate(self.layers)
+            ]
+        )
+        self.indexes = np.concatenate(
+            [np.arange(len(states)) for states, _, _ in self.layers]
+        )
+        order = np.argsort(keys)
+        self.keys = keys[order]
+        self.depths = self.depths[order]
+        self.indexes = self.indexes[order]
+
+    def lookup(self, states):
+        """
+        Depth of every state in the search, -1 for states it did not reach.
+        Returns (depths, positions), positions being where each state is
+        in self.keys.
+        """
+        keys = _keys(states)
+        positions = np.minimum(np.searchsorted(self.keys, keys), len(self.keys) - 1)
+        depths = np.where(self.keys[positions] == keys, self.depths[positions], -1)
+        return depths, positions
+
+    def solution(self, position):
+        """
+        FACE_MOVES ids that take the state at self.keys[position] to the goal.
+        """
+        path = _path(self.layers, self.depths[position], self.indexes[position])
+        return [INVERSE_MOVES[move] for move in reversed(path)]
+
+
+def search_case(codes, backward, depth=FORWARD_DEPTH):
+    """
+    Shortest FACE_MOVES ids that solve F2L and orient the last layer of
+    slot codes with the centers home, None if it needs more than depth
+    moves on top of the backward search.
+    """
+    layers = [(project(codes), None, None)]
+    for forward in range(depth + 1):
+        if forward:
+            layers.append(_expand(layers[-1][0]))
+        depths, positions = backward.lookup(layers[-1][0])
+        met = np.flatnonzero(depths >= 0)
+        if len(met):
+            best = met[np.argmin(depths[met])]
+            return _path(layers, forward, best) + backward.solution(positions[best])
+    return None
+
+
+def orientation_cases():
+    """
+    Slot codes, centers home, of every orientation of the last layer with
+    every piece home: 27 corner twists * 8 edge flips.
+    Returns {orientation key: codes}.
+    """
+    cases = {}
+    for twists in product(range(3), repeat=len(LAST_CORNERS) - 1):
+        for flips in product(range(2), repeat=len(LAST_EDGES) - 1):
+            codes = list(SOLVED_CODES)
+            # the last twist and flip follow from the others
+            for slots, orientations in (
+                (LAST_CORNERS, twists + (-sum(twists) % 3,)),
+                (LAST_EDGES, flips + (sum(flips) % 2,)),
+            ):
+                for slot, orientation in zip(slots, orientations):
+                    codes[slot] = 3 * slot + orientation
+            cases[orientation_key(last_layer_key(codes))] = codes
+    return cases
+
+
+def oll_case(codes):
+    """
+    The OLL case of a last layer, the same for all four AUFs:
+    the smallest orientation key of the four.
+    """
+    turn = compile_sequence(LAST_FACE)
+    keys = []
+    for _ in range(4):
+        keys.append(orientation_key(last_layer_key(codes)))
+        codes = turn.apply(codes)
+    return min(keys)
+
+
+def held_sequence(moves):
+    """
+    Sequence of FACE_MOVES ids found with the centers home,
+    for the cube held yellow up.
+    """
+    sequence = " ".join(FACE_MOVES[move] for move in moves)
+    return simplify_sequence(f"{YELLOW_UP} {sequence} {YELLOW_UP}")
+
+
+def check_sequence(key, sequence):
+    """
+    Raise ValueError unless sequence orients the last layer with orientation
+    key, and keeps F2L, for the cube held yellow up.
+    """
+    codes = case_codes(sequence)
+    if orientation_key(last_layer_key(codes)) != key or any(
+        codes[slot] != SOLVED_CODES[slot] for slot in F2L_SLOTS
+    ):
+        raise ValueError(f"{sequence!r} does not solve OLL state {key}")
+
+
+def generate_table(backward_depth=BACKWARD_DEPTH, forward_depth=FORWARD_DEPTH):
+    """
+    Search every orientation of the last layer.
+    Returns {orientation key: sequence}.
+    Raises ValueError if a case is deeper than the two searches.
+    """
+    start = perf_counter()
+    backward = BackwardSearch(backward_depth)
+    logging.info(
+        "backward search: %d states in %.1f seconds",
+        len(backward.keys),
+        perf_counter() - start,
+    )
+    table = {}
+    for key, codes in orientation_cases().items():
+        moves = search_case(codes, backward, forward_depth)
+        if moves is None:
+            depth = backward_depth + forward_depth
+            raise ValueError(f"No sequence of {depth} moves solves OLL state {key}")
+        table[key] = held_sequence(moves)
+        check_sequence(key, table[key])
+    logging.info(
+        "searched %d cases in %.1f seconds", len(table), perf_counter() - start
+    )
+    return dict(sorted(table.items()))
+
+
+def write_table(table, path=OLL_TABLE):
+    """
+    Write the table as json, replacing the old file in one step.
+    """
+    with open(path + ".tmp", "w", encoding="utf-8") as file:
+        json.dump(table, file, indent=4)
+    os.replace(path + ".tmp", path)
+
+
+def main():
+    """
+    Generate and write the OLL table.
+    """
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument("--output", default=OLL_TABLE, help="json file to write")
+    args = parser.parse_args()
+    logging.basicConfig(level=logging.INFO)
+    table = generate_table()
+    write_table(table, args.output)
+    lengths = [len(sequence.split()) for sequence in table.values()]
+    logging.info(
+        "wrote %d orientations (%d OLL cases, up to %d moves) to %s",
+        len(table),
+        len({oll_case(codes) for codes in orientation_cases().values()}) - 1,
+        max(lengths),
+        args.output,
+    )
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,162 @@
+"""
+PLL table generator.
+Builds the table Solver.pll_iterative looks cases up in (keyed by
+Solver._pll_get_state) in one pass, instead of solving one random scramble
+per run:
+  - every case is made by running a stored PLL algorithm (pll_sequences.json)
+    with each of the 4 pre-AUFs and 4 post-AUFs backwards from a solved cube
+    held yellow up, and is read the way the solver reads it,
+  - every such candidate sequence is applied to all cases at once, as one
+    sticker gather over a BatchCube, with the candidates split across
+    worker processes,
+  - the shortest candidate that solves a case is kept, and the table is
+    written atomically.
+Run:
+    python pll_table.py [--output PATH] [--workers N]
+"""
+
+import argparse
+import json
+import logging
+import os
+from concurrent.futures import ProcessPoolExecutor
+import numpy as np
+from algorithms import ALGORITHM_FILES, ALGORITHMS, DATA_DIR
+from batch_cube import BatchCube
+from coordinates import oriented_codes
+from cube import SOLVED_CODES, Cube, format_moves, parse_sequence
+from last_layer import (
+    F2L_SLOTS,
+    ORIENTED_KEY,
+    YELLOW_UP,
+    auf_sequences,
+    last_layer_key,
+    orientation_key,
+)
+from solver import Solver
+
+PLL_TABLE = os.path.join(DATA_DIR, ALGORITHM_FILES["pll"])
+
+
+def inverse_sequence(sequence):
+    """
+    Sequence string that undoes a sequence.
+    """
+    return format_moves(
+        (target, not clockwise, count)
+        for target, clockwise, count in reversed(parse_sequence(sequence))
+    )
+
+
+def candidates():
+    """
+    Every stored PLL algorithm, and doing nothing, with each pre-AUF and
+    post-AUF (see last_layer.auf_sequences), without duplicates.
+    """
+    sequences = {}
+    for algorithm in [""] + list(ALGORITHMS["pll_algorithms"].values()):
+        for sequence in auf_sequences(algorithm):
+            sequences.setdefault(sequence, None)
+    return list(sequences)
+
+
+def pll_cases(sequences):
+    """
+    The case each sequence solves, as the solver sees it, for sequences
+    that only permute the last layer.
+    Returns {pll state: state string of the cube once _pll_get_state has
+    turned it}.
+    """
+    cases = {}
+    for sequence in sequences:
+        cube = Cube()
+        cube.sequence(f"{YELLOW_UP} {inverse_sequence(sequence)}")
+        solver = Solver(cube)
+        solver.invert_cube()
+        key = solver._pll_get_state()  # pylint: disable=protected-access
+        codes, _ = oriented_codes(cube)
+        # skip stored algorithms that do not keep the first two layers
+        # or the orientation of the last one
+        if ORIENTED_KEY == orientation_key(last_layer_key(codes)) and all(
+            codes[slot] == SOLVED_CODES[slot] for slot in F2L_SLOTS
+        ):
+            cases.setdefault(key, str(cube))
+    return cases
+
+
+def _uniform(batch):
+    """
+    (N,) bool array: whether every face of each cube has a single color.
+    """
+    faces = batch.facelets.reshape(len(batch), 6, 9)
+    return (faces == faces[:, :, 4:5]).all(axis=(1, 2))
+
+
+def solved_cases(states, sequences):
+    """
+    For every sequence, the indexes of the states it solves.
+    """
+    batch = BatchCube.from_strings(states)
+    solved = []
+    for sequence in sequences:
+        moved = batch.copy()
+        moved.sequence(sequence)
+        solved.append((sequence, np.flatnonzero(_uniform(moved)).tolist()))
+    return solved
+
+
+def generate_table(workers=None):
+    """
+    Find the shortest candidate for every PLL case.
+    Returns {pll state: sequence}.
+    Raises ValueError if a case has no candidate that solves it.
+    """
+    sequences = candidates()
+    cases = pll_cases(sequences)
+    keys = list(cases)
+    states = [cases[key] for key in keys]
+    workers = workers or os.cpu_count() or 1
+    chunks = [sequences[start::workers] for start in range(workers)]
+    table = {}
+    with ProcessPoolExecutor(max_workers=workers) as executor:
+        results = executor.map(solved_cases, [states] * workers, chunks)
+        for result in results:
+            for sequence, indexes in result:
+                for index in indexes:
+                    best = table.get(keys[index])
+                    if best is None or (len(sequence.split()), sequence) < (
+                        len(best.split()),
+                        best,
+                    ):
+                        table[keys[index]] = sequence
+    missing = [key for key in keys if key not in table]
+    if missing:
+        raise ValueError(f"No sequence solves PLL states {missing}")
+    return dict(sorted(table.items()))
+
+
+def write_table(table, path=PLL_TABLE):
+    """
+    Write the table as json, replacing the old file in one step.
+    """
+    with open(path + ".tmp", "w", encoding="utf-8") as file:
+        json.dump(table, file, indent=4)
+    os.replace(path + ".tmp", path)
+
+
+def main():
+    """
+    Generate and write the PLL table.
+    """
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument("--output", default=PLL_TABLE, help="json file to write")
+    parser.add_argument("--workers", type=int, default=None, help="worker processes")
+    args = parser.parse_args()
+    logging.basicConfig(level=logging.INFO)
+    table = generate_table(args.workers)
+    write_table(table, args.output)
+    logging.info("wrote %d PLL cases to %s", len(table), args.output)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,175 @@
+"""
+Uniform random cube states.
+Random face turns (Cube.scramble, BatchCube.scramble) do not reach every
+state with the same probability, short scrambles favor states near solved.
+Here the pieces are drawn instead, for many cubes at once with numpy:
+  - the corner and edge permutations are uniform random permutations,
+    and when their parities differ the last two edges are swapped,
+  - the first 7 corner twists and 11 edge flips are uniform, the last one
+    makes the twists sum to 0 mod 3 and the flips to 0 mod 2.
+Every state a cube can reach by moves, centers home, has the same
+probability. The states are given as slot codes (see cube.SLOTS), packed
+integers (see state_encoding) or cubes.
+Run:
+    python random_state.py [--count N] [--seed N]
+prints that many random state strings, one per line.
+"""
+
+import argparse
+from math import factorial
+import numpy as np
+from batch_cube import BatchCube
+from coordinates import CORNER_COUNT, EDGE_COUNT, EDGE_START
+from cube import SOLVED_CODES, Cube
+
+# radixes of the parts of a packed 3x3 state below the centers, which are
+# home (rank 0), see state_encoding
+_TWIST_RADIX = 3**CORNER_COUNT
+_EDGE_RADIX = factorial(EDGE_COUNT) * 2**EDGE_COUNT
+_CENTER_CODES = np.array(SOLVED_CODES[EDGE_START + EDGE_COUNT :], dtype=np.uint8)
+
+
+def _parities(permutations):
+    """
+    (N,) parities of the rows of an (N, n) permutation array, 0 for even:
+    the number of inversions, mod 2.
+    """
+    count = permutations.shape[1]
+    inversions = np.zeros(len(permutations), dtype=np.int64)
+    for index in range(count - 1):
+        inversions += (
+            permutations[:, index + 1 :] < permutations[:, index, None]
+        ).sum(axis=1)
+    return inversions % 2
+
+
+def _orientations(rng, count, length, modulus):
+    """
+    (count, length) orientations whose rows sum to 0 mod modulus.
+    """
+    orientations = rng.integers(modulus, size=(count, length), dtype=np.uint8)
+    orientations[:, -1] = -orientations[:, :-1].sum(axis=1, dtype=np.int64) % modulus
+    return orientations
+
+
+def random_pieces(count, rng=None):
+    """
+    Draw count uniform random solvable states.
+    Returns (corners, twists, edges, flips): (count, 8) and (count, 12)
+    uint8 arrays of the piece in every corner and edge slot (0 based) and
+    its orientation.
+    Parameters:
+    - count: number of states.
+    - rng: a numpy Generator or seed (optional).
+    """
+    rng = np.random.default_rng(rng)
+    corners = rng.permuted(
+        np.tile(np.arange(CORNER_COUNT, dtype=np.uint8), (count, 1)), axis=1
+    )
+    edges = rng.permuted(
+        np.tile(np.arange(EDGE_COUNT, dtype=np.uint8), (count, 1)), axis=1
+    )
+    # swapping two edges makes the edge parity match the corner parity
+    swap = _parities(corners) != _parities(edges)
+    edges[swap, -2:] = edges[swap, :-3:-1]
+    twists = _orientations(rng, count, CORNER_COUNT, 3)
+    flips = _orientations(rng, count, EDGE_COUNT, 2)
+    return corners, twists, edges, flips
+
+
+def pieces_codes(corners, twists, edges, flips):
+    """
+    (N, 26) uint8 slot codes of the states of random_pieces(), centers home.
+    """
+    centers = np.broadcast_to(_CENTER_CODES, (len(corners), len(_CENTER_CODES)))
+    return np.hstack(
+        [corners * 3 + twists, (edges + EDGE_START) * 3 + flips, centers]
+    ).astype(np.uint8)
+
+
+def _ranks(permutations):
+    """
+    (N,) Lehmer ranks of the rows of an (N, n) permutation array, the same
+    as state_encoding.rank_permutation().
+    """
+    count = permutations.shape[1]
+    ranks = np.zeros(len(permutations), dtype=np.int64)
+    for index in range(count):
+        smaller = (permutations[:, index + 1 :] < permutations[:, index, None]).sum(
+            axis=1
+        )
+        ranks = ranks * (count - index) + smaller
+    return ranks
+
+
+def _orientation_ranks(orientations, modulus):
+    """
+    (N,) ranks of the rows of an orientation array, the same as
+    state_encoding.rank_orientation().
+    """
+    ranks = np.zeros(len(orientations), dtype=np.int64)
+    for column in orientations.T:
+        ranks = ranks * modulus + column
+    return ranks
+
+
+def pack_pieces(corners, twists, edges, flips):
+    """
+    Packed integers (state_encoding.encode_codes()) of the states of
+    random_pieces(), as a list.
+    The corner and edge halves are ranked as arrays, a packed state needs
+    more than 64 bits so only their sum is made of Python integers.
+    """
+    high = _ranks(corners) * _TWIST_RADIX + _orientation_ranks(twists, 3)
+    low = _ranks(edges) * 2**EDGE_COUNT + _orientation_ranks(flips, 2)
+    return [
+        corner * _EDGE_RADIX + edge for corner, edge in zip(high.tolist(), low.tolist())
+    ]
+
+
+def random_codes(count, rng=None):
+    """
+    (count, 26) uint8 slot codes of uniform random solvable states.
+    """
+    return pieces_codes(*random_pieces(count, rng))
+
+
+def random_states(count, rng=None):
+    """
+    Packed integers of count uniform random solvable 3x3 states, as a list.
+    Cube.from_int() builds the cubes.
+    """
+    return pack_pieces(*random_pieces(count, rng))
+
+
+def random_batch(count, rng=None):
+    """
+    A BatchCube of count uniform random solvable states.
+    """
+    return BatchCube.from_codes(random_codes(count, rng))
+
+
+def random_cube(rng=None, cube_class=Cube):
+    """
+    A cube in a uniform random solvable state.
+    Parameters:
+    - rng: a numpy Generator or seed (optional).
+    - cube_class: Cube or a subclass like ArrayCube (default is Cube).
+    """
+    return cube_class.from_int(random_states(1, rng)[0])
+
+
+def main():
+    """
+    Print random state strings.
+    """
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument("--count", type=int, default=10, help="number of states")
+    parser.add_argument("--seed", type=int, default=None, help="random seed")
+    args = parser.parse_args()
+    for state in random_batch(args.count, args.seed).to_strings():
+        print(state)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,204 @@
+"""
+Seeded scramble corpus.
+A corpus is a reproducible list of scrambles: the same seed, count and
+length always give the same scrambles, on any machine, so benchmarks,
+fuzzers and regression tests can replay one exact workload.
+Scrambles are random face turns (FACE_MOVES) without redundant neighbors:
+a face is never turned twice in a row, and two turns of opposite faces, which
+commute, only come in one order (U D, never D U), so no turn cancels or
+merges with the next ones.
+On disk a corpus is one json header line followed by fixed size binary
+records, one per scramble:
+    {"format": "scramble-corpus", "version": 1, "seed": ..., "count": ...,
+     "moves": ..., "record_size": ...}\\n
+    record: `moves` bytes of FACE_MOVES ids, then the STATE_BYTES[3] bytes
+    of the scrambled state (see Cube.to_bytes)
+Files are written and read as streams, and records can be read by index.
+Run:
+    python scramble_corpus.py OUTPUT [--count N] [--seed N] [--moves N]
+"""
+
+import argparse
+import json
+import os
+from itertools import islice
+from random import Random
+from coordinates import FACE_MOVE_TABLES, FACE_MOVES
+from cube import FACES, SOLVED_CODES, Cube
+from state_encoding import STATE_BYTES, encode_codes
+
+FORMAT = "scramble-corpus"
+VERSION = 1
+# turns of each face in FACE_MOVES, move id // TURNS is the index of its
+# face in FACES, which lists opposite faces next to each other
+TURNS = len(FACE_MOVES) // len(FACES)
+
+
+def _allowed_moves():
+    """
+    ALLOWED_MOVES[previous]: the move ids that may follow move id previous,
+    ALLOWED_MOVES[None] those that may start a scramble.
+    """
+    allowed = {None: tuple(range(len(FACE_MOVES)))}
+    for previous in range(len(FACE_MOVES)):
+        face = previous // TURNS
+        allowed[previous] = tuple(
+            move
+            for move in range(len(FACE_MOVES))
+            if move // TURNS != face
+            # turns of opposite faces commute, keep the first face first
+            and not (move // TURNS // 2 == face // 2 and move // TURNS < face)
+        )
+    return allowed
+
+
+ALLOWED_MOVES = _allowed_moves()
+
+
+def scramble_moves(count, seed=0, moves=20):
+    """
+    Yield the FACE_MOVES ids of count scrambles of `moves` turns each,
+    as tuples, lazily.
+    """
+    rng = Random(seed)
+    for _ in range(count):
+        previous = None
+        scramble = []
+        for _ in range(moves):
+            previous = rng.choice(ALLOWED_MOVES[previous])
+            scramble.append(previous)
+        yield tuple(scramble)
+
+
+def scramble_state(move_ids):
+    """
+    Packed state (STATE_BYTES[3] bytes, see Cube.to_bytes) of a solved cube
+    after the FACE_MOVES ids.
+    """
+    codes = SOLVED_CODES
+    for move in move_ids:
+        codes = FACE_MOVE_TABLES[move].apply(codes)
+    return encode_codes(codes, 3).to_bytes(STATE_BYTES[3], "big")
+
+
+def generate_corpus(count, seed=0, moves=20):
+    """
+    Yield (sequence string, packed state) for count seeded scrambles, lazily.
+    """
+    for move_ids in scramble_moves(count, seed, moves):
+        sequence = " ".join(FACE_MOVES[move] for move in move_ids)
+        yield sequence, scramble_state(move_ids)
+
+
+def write_corpus(path, count, seed=0, moves=20):
+    """
+    Generate a corpus and write it to path, streaming the records and
+    replacing the old file in one step.
+    """
+    header = {
+        "format": FORMAT,
+        "version": VERSION,
+        "seed": seed,
+        "count": count,
+        "moves": moves,
+        "record_size": moves + STATE_BYTES[3],
+    }
+    with open(path + ".tmp", "wb") as file:
+        file.write(json.dumps(header).encode() + b"\n")
+        for move_ids in scramble_moves(count, seed, moves):
+            file.write(bytes(move_ids) + scramble_state(move_ids))
+    os.replace(path + ".tmp", path)
+
+
+class ScrambleCorpus:
+    """
+    A corpus file, read lazily.
+    Iterating yields (sequence string, packed state) in corpus order.
+    """
+
+    def __init__(self, path):
+        """
+        Read the header of a corpus file.
+        Raises ValueError for files that are not a corpus.
+        """
+        self.path = path
+        with open(path, "rb") as file:
+            line = file.readline()
+            self._start = file.tell()
+        try:
+            header = json.loads(line)
+        except ValueError as error:
+            raise ValueError(f"{path} is not a scramble corpus") from error
+        if not isinstance(header, dict) or header.get("format") != FORMAT:
+            raise ValueError(f"{path} is not a scramble corpus")
+        if header.get("version") != VERSION:
+            raise ValueError(f"Unsupported corpus version {header.get('version')}")
+        self.seed = header["seed"]
+        self.count = header["count"]
+        self.moves = header["moves"]
+        self.record_size = header["record_size"]
+        if self.record_size != self.moves + STATE_BYTES[3]:
+            raise ValueError(f"Invalid record size {self.record_size} in {path}")
+        size = os.path.getsize(path) - self._start
+        if size != self.count * self.record_size:
+            raise ValueError(f"{path} is truncated: {size} bytes of records")
+
+    def _entry(self, record):
+        """
+        (sequence string, packed state) of one record.
+        """
+        sequence = " ".join(FACE_MOVES[move] for move in record[: self.moves])
+        return sequence, record[self.moves :]
+
+    def __iter__(self):
+        with open(self.path, "rb") as file:
+            file.seek(self._start)
+            for _ in range(self.count):
+                yield self._entry(file.read(self.record_size))
+
+    def __len__(self):
+        return self.count
+
+    def __getitem__(self, index):
+        """
+        Read one record by index.
+        """
+        if index < 0:
+            index += self.count
+        if not 0 <= index < self.count:
+            raise IndexError(f"Corpus index {index} out of range")
+        with open(self.path, "rb") as file:
+            file.seek(self._start + index * self.record_size)
+            return self._entry(file.read(self.record_size))
+
+    def sequences(self, count=None):
+        """
+        Yield the first count scramble sequences (default is all of them).
+        """
+        for sequence, _ in islice(self, count):
+            yield sequence
+
+    @staticmethod
+    def cube(state, cube_class=Cube):
+        """
+        Build a cube from a packed state of the corpus.
+        """
+        return cube_class.from_bytes(state)
+
+
+def main():
+    """
+    Write a corpus file.
+    """
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument("output", help="corpus file to write")
+    parser.add_argument("--count", type=int, default=1000, help="number of scrambles")
+    parser.add_argument("--seed", type=int, default=0, help="random seed")
+    parser.add_argument("--moves", type=int, default=20, help="turns per scramble")
+    args = parser.parse_args()
+    write_corpus(args.output, args.count, args.seed, args.moves)
+    print(f"wrote {args.count} scrambles to {args.output}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,195 @@
+"""
+Move sequence simplifier.
+`simplify_sequence` rewrites a sequence string (in `Cube.sequence` notation)
+into a shorter sequence with exactly the same effect:
+  - whole cube rotations (x, y, z / X, Y, Z) are pushed to the end of the
+    sequence, relabeling the moves they pass, and emitted once as the
+    shortest rotation for their net effect,
+  - consecutive moves about the same axis (U, D, E, u, d, ...) commute, so they
+    are merged per layer: R R' cancels, U U becomes U2, U D U becomes U2 D.
+Everything is derived from `cube.MOVE_TABLES`, so it follows the same turn
+directions as the cube itself.
+"""
+
+from functools import lru_cache
+from itertools import product
+from cube import FACES, IDENTITY_TABLE, MOVE_TABLES, parse_sequence
+
+ROTATIONS = ("X", "Y", "Z")
+# layers about every rotation axis, face / slice / opposite face
+AXIS_LAYERS = {"X": ("R", "M", "L"), "Y": ("U", "E", "D"), "Z": ("F", "S", "B")}
+# preferred order of the targets of an axis when writing moves
+_TARGET_ORDER = {target: order for order, target in enumerate(FACES + ["M", "E", "S"])}
+
+
+def _key(table):
+    """
+    Hashable identity of a move table.
+    """
+    return (table.source, table.twist)
+
+
+def _power(table, count):
+    """
+    Table for `table` applied count times.
+    """
+    result = IDENTITY_TABLE
+    for _ in range(count):
+        result = result.then(table)
+    return result
+
+
+def _move_name(target, count):
+    """
+    Write count (1, 2 or 3) clockwise quarter turns of target.
+    """
+    return target + {1: "", 2: "2", 3: "'"}[count]
+
+
+def _build_axes():
+    """
+    Express every non rotation move as quarter turns of the three layers of
+    its axis, each counted in the direction the whole cube rotation turns it.
+    Returns {target: (axis, vector)} for clockwise turns.
+    """
+    vectors = {}
+    for axis, layers in AXIS_LAYERS.items():
+        rotation = _key(MOVE_TABLES[(axis, True)])
+        # the direction of each layer that makes up the rotation
+        choices = [
+            (MOVE_TABLES[(layer, True)], MOVE_TABLES[(layer, False)])
+            for layer in layers
+        ]
+        layer_tables = next(
+            tables
+            for tables in product(*choices)
+            if _key(tables[0].then(tables[1]).then(tables[2])) == rotation
+        )
+        targets = [
+            target
+            for (target, clockwise) in MOVE_TABLES
+            if clockwise and target not in ROTATIONS
+        ]
+        for vector in product(range(4), repeat=3):
+            table = IDENTITY_TABLE
+            for layer_table, count in zip(layer_tables, vector):
+                table = table.then(_power(layer_table, count))
+            key = _key(table)
+            for target in targets:
+                if _key(MOVE_TABLES[(target, True)]) == key:
+                    vectors[target] = (axis, vector)
+    return vectors
+
+
+MOVE_AXES = _build_axes()
+
+
+@lru_cache(maxsize=None)
+def _axis_moves(axis, vector):
+    """
+    Fewest moves that turn the layers of axis by vector.
+    Faces are preferred over slices and wide moves.
+    """
+    targets = sorted(
+        (target for target, (moved, _) in MOVE_AXES.items() if moved == axis),
+        key=lambda target: (target.islower(), _TARGET_ORDER.get(target.upper(), 0)),
+    )
+    best = None
+    for counts in product(range(4), repeat=len(targets)):
+        total = [0, 0, 0]
+        for target, count in zip(targets, counts):
+            for layer, amount in enumerate(MOVE_AXES[target][1]):
+                total[layer] = (total[layer] + amount * count) % 4
+        if tuple(total) != vector:
+            continue
+        cost = (
+            sum(1 for count in counts if count),
+            sum(rank for rank, count in enumerate(counts) if count),
+            sum(2 if count == 2 else 1 for count in counts if count),
+        )
+        if best is None or cost < best[0]:
+            best = (cost, counts)
+    return tuple(
+        _move_name(target, count) for target, count in zip(targets, best[1]) if count
+    )
+
+
+@lru_cache(maxsize=None)
+def _conjugate(rotation, target):
+    """
+    The (target, clockwise) move that has the same effect before `rotation`
+    as a clockwise turn of target has after it.
+    """
+    table = rotation.then(MOVE_TABLES[(target, True)])
+    for (other, clockwise), other_table in MOVE_TABLES.items():
+        if other not in ROTATIONS and _key(other_table.then(rotation)) == _key(table):
+            return other, clockwise
+    raise ValueError(f"No conjugate for {target}")
+
+
+def _build_rotations():
+    """
+    Shortest rotation sequence for each of the 24 cube orientations,
+    by breadth first search over quarter and half turns.
+    """
+    turns = [
+        (_move_name(axis, count), _power(MOVE_TABLES[(axis, True)], count))
+        for axis in ROTATIONS
+        for count in (1, 3, 2)
+    ]
+    rotations = {_key(IDENTITY_TABLE): (IDENTITY_TABLE, ())}
+    frontier = [(IDENTITY_TABLE, ())]
+    while frontier:
+        next_frontier = []
+        for table, names in frontier:
+            for name, turn in turns:
+                rotated = table.then(turn)
+                if _key(rotated) not in rotations:
+                    rotations[_key(rotated)] = (rotated, names + (name,))
+                    next_frontier.append((rotated, names + (name,)))
+        frontier = next_frontier
+    return rotations
+
+
+ORIENTATIONS = _build_rotations()
+
+
+def simplify_moves(sequence, keep_rotation=True):
+    """
+    Simplify a sequence string into a list of move strings.
+    With keep_rotation=False the final whole cube rotation is dropped,
+    so the result only matches the original up to the cube's orientation.
+    """
+    rotation = IDENTITY_TABLE
+    # merged runs of moves as [axis, [layer, layer, layer]]
+    runs = []
+    for target, clockwise, count in parse_sequence(sequence):
+        if target in ROTATIONS:
+            turn = MOVE_TABLES[(target, clockwise)]
+            for _ in range(count):
+                rotation = ORIENTATIONS[_key(rotation.then(turn))][0]
+            continue
+        target, same_direction = _conjugate(rotation, target)
+        axis, vector = MOVE_AXES[target]
+        direction = 1 if clockwise == same_direction else 3
+        turns = [amount * direction * count % 4 for amount in vector]
+        if runs and runs[-1][0] == axis:
+            layers = runs[-1][1]
+            runs[-1][1] = [(a + b) % 4 for a, b in zip(layers, turns)]
+            if not any(runs[-1][1]):
+                runs.pop()
+        else:
+            runs.append([axis, turns])
+    moves = []
+    for axis, layers in runs:
+        moves.extend(_axis_moves(axis, tuple(layers)))
+    if keep_rotation:
+        moves.extend(ORIENTATIONS[_key(rotation)][1])
+    return moves
+
+
+def simplify_sequence(sequence, keep_rotation=True):
+    """
+    Simplify a sequence string, returning a space separated sequence string.
+    """
+    return " ".join(simplify_moves(sequence, keep_rotation))
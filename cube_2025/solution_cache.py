@@ -0,0 +1,133 @@
+"""
+Solution cache for Solver.solve().
+Solutions are stored under the canonical form of the scrambled state
+(see symmetry.canonicalize), so a state, its 47 symmetric states and every
+recoloring of them share one entry. A solution is stored as it solves the
+canonical state and mapped through the symmetry of each state that hits it.
+Entries are kept in a bounded in-memory LRU and, optionally, in a sqlite
+file that survives restarts.
+"""
+
+import json
+import sqlite3
+from collections import OrderedDict
+from symmetry import SYMMETRY_INVERSES, canonicalize, map_sequence
+
+# number of solutions kept in memory by default
+CACHE_SIZE = 4096
+
+
+def map_solution(solution, symmetry):
+    """
+    Map a solution returned by Solver.solve() through a symmetry,
+    see symmetry.map_sequence.
+    """
+    mapped = dict(solution)
+    mapped["moves"] = map_sequence(solution["moves"], symmetry)
+    mapped["phases"] = {
+        phase: map_sequence(moves, symmetry)
+        for phase, moves in solution["phases"].items()
+    }
+    return mapped
+
+
+class SolutionCache:
+    """
+    Symmetry aware cache of solutions, keyed by canonical state.
+    """
+
+    def __init__(self, maxsize=CACHE_SIZE, path=None):
+        """
+        Initialize the cache.
+        Parameters:
+        - maxsize: The number of solutions kept in memory (default is CACHE_SIZE).
+        - path: A sqlite file to keep every solution in across restarts (optional).
+        """
+        if maxsize < 1:
+            raise ValueError(f"Invalid cache size {maxsize}")
+        self.maxsize = maxsize
+        self.path = path
+        self.entries = OrderedDict()
+        self.hits = 0
+        self.misses = 0
+        self.connection = None
+        if path is not None:
+            self.connection = sqlite3.connect(path)
+            self.connection.execute(
+                "CREATE TABLE IF NOT EXISTS solutions "
+                "(state TEXT PRIMARY KEY, solution TEXT NOT NULL)"
+            )
+            self.connection.commit()
+
+    @staticmethod
+    def key(cube):
+        """
+        Cache key of a cube: (size and canonical encoding, symmetry), see
+        symmetry.canonicalize.
+        """
+        encoding, symmetry, _ = canonicalize(cube, colors=True)
+        return f"{cube.size}:{encoding}", symmetry
+
+    def get(self, key):
+        """
+        Solution of the state a key was made from, or None on a miss.
+        """
+        state, symmetry = key
+        solution = self.entries.get(state)
+        if solution is not None:
+            self.entries.move_to_end(state)
+        elif self.connection is not None:
+            row = self.connection.execute(
+                "SELECT solution FROM solutions WHERE state = ?", (state,)
+            ).fetchone()
+            if row is not None:
+                solution = json.loads(row[0])
+                self._remember(state, solution)
+        if solution is None:
+            self.misses += 1
+            return None
+        self.hits += 1
+        return map_solution(solution, symmetry)
+
+    def put(self, key, solution):
+        """
+        Store the solution of the state a key was made from.
+        """
+        state, symmetry = key
+        solution = map_solution(solution, SYMMETRY_INVERSES[symmetry])
+        self._remember(state, solution)
+        if self.connection is not None:
+            self.connection.execute(
+                "INSERT OR REPLACE INTO solutions VALUES (?, ?)",
+                (state, json.dumps(solution)),
+            )
+            self.connection.commit()
+
+    def _remember(self, state, solution):
+        """
+        Keep a canonical solution in memory, dropping the least recently used.
+        """
+        self.entries[state] = solution
+        self.entries.move_to_end(state)
+        while len(self.entries) > self.maxsize:
+            self.entries.popitem(last=False)
+
+    def stats(self):
+        """
+        Return the hit and miss counters and the number of entries in memory.
+        """
+        return {"hits": self.hits, "misses": self.misses, "size": len(self.entries)}
+
+    def close(self):
+        """
+        Close the sqlite file, if there is one.
+        """
+        if self.connection is not None:
+            self.connection.close()
+            self.connection = None
+
+    def __len__(self):
+        """
+        Return the number of solutions kept in memory.
+        """
+        return len(self.entries)
@@ -0,0 +1,388 @@
+"""
+JSON lines solve service.
+An asyncio server on a TCP port or a Unix socket. Every request is one line
+    {"id": ..., "state": "<54 character state string>"}
+and is answered by one line, in the order solves finish,
+    {"id": ..., "solution": {...}, "latency_ms": ...}
+or {"id": ..., "error": "...", "latency_ms": ...}, the solution being what
+Solver.solve() returns and the latency counted from the moment the request
+was read. A line longer than LINE_LIMIT gets an error and ends the connection.
+  - Requests wait in a bounded queue. While it is full the server stops
+    reading from the connection, so a client sending faster than the workers
+    solve is held back by the socket instead of growing the queue.
+  - Worker processes load the algorithm library, the last layer index and
+    the cross table when they start, before the server accepts connections,
+    so no request pays for them.
+  - Every worker has one dispatcher feeding it, which takes up to batch_size
+    queued requests at a time and sends them over in a single call.
+  - A state the solver fails on gets an error of its own. If a worker dies,
+    the requests it had get errors and the pool is started again.
+A load generator sends scrambled states over several connections and reports
+the throughput and the latency percentiles seen by the clients.
+Run from the cube_2025 directory:
+    python solve_server.py serve [--port N | --unix PATH] [--workers N]
+    python solve_server.py load [--port N | --unix PATH] [--requests N]
+"""
+
+import argparse
+import asyncio
+import contextlib
+import json
+import logging
+import os
+from concurrent.futures.process import BrokenProcessPool
+from time import perf_counter
+from benchmark import percentile
+from cube import Cube
+from scramble_corpus import generate_corpus
+from solver import solve_state
+from worker_pool import warm_pool
+
+HOST = "127.0.0.1"
+PORT = 8765
+# requests a worker solves in one call
+BATCH_SIZE = 8
+# requests waiting for a worker before connections stop being read
+QUEUE_SIZE = 256
+# longest request line read, longer ones get an error and close the connection
+LINE_LIMIT = 2**16
+# scramble solved by every worker as it starts
+WARM_UP_SCRAMBLE = "R U F' L2 D B' R2 U' F D2"
+
+
+
+def warm_up():
+    """
+    Load every table the solver uses, run once in each worker process:
+    the algorithm library, the last layer index and the cross table are all
+    built on the first solve.
+    """
+    cube = Cube()
+    cube.sequence(WARM_UP_SCRAMBLE)
+    solve_state(str(cube))
+
+
+def solve_batch(states):
+    """
+    Solve a batch of states in a worker.
+    Returns a list of {"solution": ...} or {"error": ...}, one per state.
+    """
+    results = []
+    for state in states:
+        try:
+            results.append({"solution": solve_state(state)})
+        except ValueError as error:
+            results.append({"error": str(error)})
+        except Exception as error:  # pylint: disable=broad-exception-caught
+            # a solver bug fails its own state, not the rest of the batch
+            logging.getLogger(__name__).exception("solving %s failed", state)
+            results.append({"error": f"{type(error).__name__}: {error}"})
+    return results
+
+
+class SolveServer:
+    """
+    JSON lines solve server backed by a pool of worker processes.
+    """
+
+    def __init__(self, workers=None, batch_size=BATCH_SIZE, queue_size=QUEUE_SIZE):
+        """
+        Initialize the server, nothing runs until start().
+        Parameters:
+        - workers: The number of worker processes (default is one per CPU).
+        - batch_size: The most requests sent to a worker at once
+          (default is BATCH_SIZE).
+        - queue_size: The most requests waiting for a worker (default is
+          QUEUE_SIZE).
+        """
+        if batch_size < 1 or queue_size < 1:
+            raise ValueError(
+                f"Invalid batch size {batch_size} or queue size {queue_size}"
+            )
+        self.logger = logging.getLogger(__name__)
+        self.workers = workers or os.cpu_count() or 1
+        self.batch_size = batch_size
+        self.queue_size = queue_size
+        self.queue = None
+        self.executor = None
+        # held while the pool is started again after a worker died
+        self.restarting = None
+        self.server = None
+        self.dispatchers = []
+
+    async def start(self, host=HOST, port=PORT, path=None):
+        """
+        Start the workers, wait until they are warm, then listen.
+        Parameters:
+        - host, port: The TCP address to listen on (default is HOST:PORT,
+          port 0 picks a free port, see address()).
+        - path: A Unix socket to listen on instead (optional).
+        """
+        loop = asyncio.get_running_loop()
+        self.queue = asyncio.Queue(self.queue_size)
+        self.restarting = asyncio.Lock()
+        self.executor = await loop.run_in_executor(
+            None, warm_pool, self.workers, warm_up
+        )
+        self.dispatchers = [
+            asyncio.create_task(self._dispatch()) for _ in range(self.workers)
+        ]
+        if path is None:
+            self.server = await asyncio.start_server(
+                self._handle, host, port, limit=LINE_LIMIT
+            )
+        else:
+            self.server = await asyncio.start_unix_server(
+                self._handle, path, limit=LINE_LIMIT
+            )
+        self.logger.info(
+            "listening on %s with %d workers", self.address(), self.workers
+        )
+
+    def address(self):
+        """
+        The address the server listens on: (host, port) or a socket path.
+        """
+        return self.server.sockets[0].getsockname()
+
+    async def close(self):
+        """
+        Stop listening, stop the dispatchers and shut the workers down.
+        """
+        if self.server is not None:
+            self.server.close()
+            await self.server.wait_closed()
+        for dispatcher in self.dispatchers:
+            dispatcher.cancel()
+        await asyncio.gather(*self.dispatchers, return_exceptions=True)
+        if self.executor is not None:
+            self.executor.shutdown()
+
+    async def _dispatch(self):
+        """
+        Feed one worker: wait for a request, take whatever else is queued up
+        to batch_size, and hand the results back to the connections.
+        """
+        loop = asyncio.get_running_loop()
+        while True:
+            batch = [await self.queue.get()]
+            while len(batch) < self.batch_size and not self.queue.empty():
+                batch.append(self.queue.get_nowait())
+            states = [state for state, _ in batch]
+            async with self.restarting:
+                executor = self.executor
+            try:
+                results = await loop.run_in_executor(executor, solve_batch, states)
+            except BrokenProcessPool as error:
+                self.logger.error("worker died: %s", error)
+                results = [{"error": f"worker died: {error}"}] * len(batch)
+                await self._restart(executor)
+            for (_, future), result in zip(batch, results):
+                if not future.done():
+                    future.set_result(result)
+
+    async def _restart(self, broken):
+        """
+        Replace a broken pool with a new warm one, unless another dispatcher
+        already has.
+        """
+        async with self.restarting:
+            if self.executor is not broken:
+                return
+            broken.shutdown(wait=False, cancel_futures=True)
+            self.executor = await asyncio.get_running_loop().run_in_executor(
+                None, warm_pool, self.workers, warm_up
+            )
+            self.logger.info("restarted %d workers", self.workers)
+
+    async def _handle(self, reader, writer):
+        """
+        Read the requests of one connection, queueing each for a worker.
+        """
+        loop = asyncio.get_running_loop()
+        responses = set()
+        try:
+            while True:
+                try:
+                    line = await reader.readline()
+                except ValueError:
+                    # what is left of a line over the limit can not be told
+                    # apart from the next request, so stop reading
+                    await _write(
+                        writer, {"error": f"Request longer than {LINE_LIMIT} bytes"}
+                    )
+                    break
+                if not line:
+                    break
+                start = perf_counter()
+                try:
+                    request = json.loads(line)
+                    request_id, state = request.get("id"), request["state"]
+                except (ValueError, KeyError, AttributeError):
+                    await _write(writer, {"error": f"Invalid request {line[:80]!r}"})
+                    continue
+                future = loop.create_future()
+                # waits while the queue is full, which stops reading
+                await self.queue.put((state, future))
+                response = asyncio.create_task(
+                    self._respond(writer, request_id, future, start)
+                )
+                responses.add(response)
+                response.add_done_callback(responses.discard)
+            await asyncio.gather(*responses)
+        except ConnectionError as error:
+            self.logger.info("connection lost: %s", error)
+        finally:
+            for response in responses:
+                response.cancel()
+            writer.close()
+            with contextlib.suppress(ConnectionError):
+                await writer.wait_closed()
+
+    async def _respond(self, writer, request_id, future, start):
+        """
+        Write the response to one request once its solve finishes.
+        """
+        response = {"id": request_id}
+        response.update(await future)
+        response["latency_ms"] = round(1000 * (perf_counter() - start), 3)
+        await _write(writer, response)
+
+
+async def _write(writer, message):
+    """
+    Write one json line and wait while the client is not reading.
+    """
+    writer.write(json.dumps(message).encode() + b"\n")
+    await writer.drain()
+
+
+async def serve(host=HOST, port=PORT, path=None, **kwargs):
+    """
+    Run a SolveServer until cancelled, kwargs go to SolveServer.
+    """
+    server = SolveServer(**kwargs)
+    await server.start(host, port, path)
+    try:
+        await server.server.serve_forever()
+    finally:
+        await server.close()
+
+
+def scrambled_states(count, seed=0, moves=20):
+    """
+    Build a reproducible list of scrambled state strings,
+    see scramble_corpus.generate_corpus.
+    """
+    return [
+        str(Cube.from_bytes(state)) for _, state in generate_corpus(count, seed, moves)
+    ]
+
+
+async def _client(reader, writer, states, first_id):
+    """
+    Send states over one connection while reading the responses.
+    Returns (latencies in ms, error count).
+    """
+    sent = {}
+
+    async def send():
+        for request_id, state in enumerate(states, first_id):
+            sent[request_id] = perf_counter()
+            await _write(writer, {"id": request_id, "state": state})
+
+    sender = asyncio.create_task(send())
+    latencies = []
+    errors = 0
+    for _ in states:
+        response = json.loads(await reader.readline())
+        latencies.append(1000 * (perf_counter() - sent[response["id"]]))
+        errors += "error" in response
+    await sender
+    writer.close()
+    await writer.wait_closed()
+    return latencies, errors
+
+
+async def load_test(
+    requests=1000, connections=4, host=HOST, port=PORT, path=None, seed=0
+):
+    """
+    Send scrambled states to a running server and measure it.
+    Returns a dict with the number of requests and errors, the seconds taken,
+    the requests per second, and the p50, p99 and max latencies in ms, as
+    the clients see them.
+    """
+    states = scrambled_states(requests, seed)
+    streams = []
+    for _ in range(connections):
+        if path is None:
+            streams.append(await asyncio.open_connection(host, port))
+        else:
+            streams.append(await asyncio.open_unix_connection(path))
+    start = perf_counter()
+    results = await asyncio.gather(
+        *(
+            _client(reader, writer, states[index::connections], index * requests)
+            for index, (reader, writer) in enumerate(streams)
+        )
+    )
+    seconds = perf_counter() - start
+    latencies = [latency for result, _ in results for latency in result]
+    return {
+        "requests": requests,
+        "errors": sum(errors for _, errors in results),
+        "seconds": seconds,
+        "throughput": requests / seconds,
+        "p50_ms": percentile(latencies, 50),
+        "p99_ms": percentile(latencies, 99),
+        "max_ms": max(latencies),
+    }
+
+
+def main():
+    """
+    Serve, or measure a running server.
+    """
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument("command", choices=("serve", "load"))
+    parser.add_argument("--host", default=HOST, help="TCP host")
+    parser.add_argument("--port", type=int, default=PORT, help="TCP port")
+    parser.add_argument("--unix", default=None, help="Unix socket instead of TCP")
+    parser.add_argument("--workers", type=int, default=None, help="worker processes")
+    parser.add_argument("--batch-size", type=int, default=BATCH_SIZE)
+    parser.add_argument("--queue-size", type=int, default=QUEUE_SIZE)
+    parser.add_argument("--requests", type=int, default=1000, help="load: requests")
+    parser.add_argument("--connections", type=int, default=4, help="load: connections")
+    args = parser.parse_args()
+    logging.basicConfig(
+        level=logging.INFO, format="%(asctime)s - %(levelname)s - %(message)s"
+    )
+    if args.command == "serve":
+        with contextlib.suppress(KeyboardInterrupt):
+            asyncio.run(
+                serve(
+                    args.host,
+                    args.port,
+                    args.unix,
+                    workers=args.workers,
+                    batch_size=args.batch_size,
+                    queue_size=args.queue_size,
+                )
+            )
+        return
+    results = asyncio.run(
+        load_test(args.requests, args.connections, args.host, args.port, args.unix)
+    )
+    print(
+        f"{results['requests']} requests ({results['errors']} errors) in "
+        f"{results['seconds']:.2f} s: {results['throughput']:.1f} solves/s"
+    )
+    print(
+        f"latency p50 {results['p50_ms']:.1f} ms, p99 {results['p99_ms']:.1f} ms, "
+        f"max {results['max_ms']:.1f} ms"
+    )
+
+
+if __name__ == "__main__":
+    main()
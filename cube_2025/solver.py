@@ -2,38 +2,41 @@
 Module to solve a rubiks cube puzzle
 """
 
+import contextlib
+import io
 import sys
-import json
 import logging
+from time import perf_counter
 # from random import choice, randint
-from cube import Cube
+from algorithms import ALGORITHMS
+from cube import Cube, format_moves
 from visualize import print_color_cube
 
-with open("f2l_sequence_data.json", "r", encoding='utf-8') as f:
-    f2l_data = json.load(f)
-edge_sequences = f2l_data["edge_sequences"]
-corner_sequences = f2l_data["corner_sequences"]
-
-with open('oll_sequence_data.json', 'r') as f:
-    oll_sequences = json.load(f)
-
-with open('pll_sequence_data.json', 'r') as f:
-    pll_sequences = json.load(f)
+# coordinates, simplify, white_cross, f2l_table and last_layer build their
+# tables when imported, so they are imported where first used: importing
+# solver stays fast, and a worker pays for them in its warm up solve
+# pylint: disable=import-outside-toplevel
 
 class Solver:
     """
     Class to solve a rubiks cube puzzle
     """
 
-    def __init__(self, cube=None):
+    def __init__(self, cube=None, cache=None):
         """
         Initialize the solver with a cube
+        Parameters:
+        - cube: The cube to solve (default is a new 3x3 Cube).
+        - cache: A SolutionCache that solve() looks states up in (optional).
         """
         if cube is None:
             cube = Cube(size=3)
         if not isinstance(cube, Cube):
             raise TypeError("cube must be a Cube")
         self.cube = cube
+        self.cache = cache
+        # seconds each phase of the last solve() took, empty on a cache hit
+        self.timings = {}
 
     def orient_cube(self):
         """
@@ -388,6 +391,19 @@ class Solver:
 
 
     def cross(self):
+        """
+        Solve the white cross on the up face with the fewest moves,
+        by walking down the white_cross distance table.
+        """
+        self.orient_cube()
+        from white_cross import optimal_cross
+
+        moves = optimal_cross(self.cube)
+        if moves:
+            self.cube.sequence(" ".join(moves))
+        return self._check_white_cross()
+
+    def cross_iterative(self):
         """
         2nd attempt to solve the cross on the first layer
         FIXME:
@@ -625,6 +641,8 @@ class Solver:
             solver.py:609:4: R0912: Too many branches (23/12) (too-many-branches)
             solver.py:609:4: R0915: Too many statements (68/50) (too-many-statements)
         """
+        edge_sequences = ALGORITHMS["f2l"]["edge_sequences"]
+        corner_sequences = ALGORITHMS["f2l"]["corner_sequences"]
         if "D" in corner.position:
             logging.debug("Corner %s is in the D layer", corner)
             while corner.position != "DFR":
@@ -639,7 +657,7 @@ class Solver:
                 edge.position in edge_sequences,
             )
             if edge.position in edge_sequences:
-                self.cube.sequence(edge_sequences[edge.position])
+                self.cube.run(ALGORITHMS.program(edge_sequences[edge.position]))
             logging.debug("Edge %s", edge)
             if corner.alignment() == 3:
                 if self.cube.get_sticker("D", cubie=corner) == self.cube.face_color(
@@ -688,8 +706,10 @@ class Solver:
                             condition in corner_sequences["D"]["W"][edge.position],
                         )
                         if condition in corner_sequences["D"]["W"][edge.position]:
-                            self.cube.sequence(
-                                corner_sequences["D"]["W"][edge.position][condition]
+                            self.cube.run(
+                                ALGORITHMS.program(
+                                    corner_sequences["D"]["W"][edge.position][condition]
+                                )
                             )
                         else:
                             return True
@@ -719,7 +739,7 @@ class Solver:
                 edge.position in edge_sequences,
             )
             if edge.position in edge_sequences:
-                self.cube.sequence(edge_sequences[edge.position])
+                self.cube.run(ALGORITHMS.program(edge_sequences[edge.position]))
             logging.debug("Edge %s", edge)
             front_color = self.cube.get_sticker("F", 4)
             corner_up_color = self.cube.get_sticker("U", cubie=corner)
@@ -773,11 +793,24 @@ class Solver:
                     edge,
                     sequence,
                 )
-                self.cube.sequence(sequence)
+                self.cube.run(ALGORITHMS.program(sequence))
                 # print_color_cube(cube)
         return False
 
     def f2l(self):
+        """
+        Solve the first two layers with one f2l_table lookup per pair,
+        once the white cross is solved.
+        """
+        self.orient_cube()
+        from f2l_table import solve_f2l
+
+        moves = solve_f2l(self.cube)
+        if moves:
+            self.cube.sequence(" ".join(moves))
+        return self._f2l_is_solved()
+
+    def f2l_iterative(self):
         """
         Solve the first two layers
         """
@@ -827,59 +860,18 @@ class Solver:
                 return False
         return True
 
-    def _oll_get_state(self):
-        """
-        Get the state of the last layer
-        """
-        # Implement the OLL state detection logic here
-        state = str(self.cube)
-        for color in "RGBOW":
-            state = state.replace(color, "_")
-        return state
-
     def oll(self):
         """
-        Solve the orientation of the last layer
+        Solve the orientation of the last layer with one last_layer lookup,
+        the generated OLL table covers every orientation.
         """
         self.invert_cube()
-        state = self._oll_get_state()
-        sentinel = 0
-        while state not in oll_sequences and sentinel < 5:
-            sentinel += 1
-            logging.debug("OLL state (%d): %s", sentinel, state)
-            self.cube.rotate_cube(axis='y')
-            state = self._oll_get_state()
-            
-        if state in oll_sequences:
-            logging.debug("OLL sequence for state 1 %s: %s", state, oll_sequences[state])
-            self.cube.sequence(oll_sequences[state])
-        else:
-            logging.debug("No OLL sequence found for state %s.", state)
-            sentinel = 0
-            while state not in oll_sequences and sentinel < 5:
-                sentinel += 1
-                self.cube.sequence("F R U R' U' F'")
-                state = self._oll_get_state()
-            if state in oll_sequences:
-                logging.debug("OLL sequence for state 2 %s: %s", state, oll_sequences[state])
-                self.cube.sequence(oll_sequences[state])
-            else:
-                sentinel = 0
-                while state not in oll_sequences and sentinel < 5:
-                    sentinel += 1
-                    logging.debug("OLL state (%d): %s", sentinel, state)
-                    self.cube.rotate_cube(axis='y')
-                    state = self._oll_get_state()
-                    sentinel_2 = 0
-                    while state not in oll_sequences and sentinel_2 < 5:
-                        sentinel_2 += 1
-                        self.cube.sequence("F R U R' U' F'")
-                        state = self._oll_get_state()
-                if state in oll_sequences:
-                    logging.debug("OLL sequence for state 3 %s: %s", state, oll_sequences[state])
-                    self.cube.sequence(oll_sequences[state])
-                else:
-                    logging.debug("Giving up on OLL sequence finding.")
+        from last_layer import recognize_oll
+
+        sequence = recognize_oll(self.cube)
+        if sequence:
+            self.cube.run(ALGORITHMS.program(sequence))
+            self.invert_cube()
         return self._oll_is_solved()
 
     def yellow_cross(self):
@@ -940,9 +932,26 @@ class Solver:
         return self._pll_correct_count() == 12
         
     def pll(self):
+        """
+        Solve the permutation of the last layer with one last_layer lookup,
+        falling back to pll_iterative for cases not in the index.
+        """
+        self.invert_cube()
+        from last_layer import recognize_pll
+
+        sequence = recognize_pll(self.cube)
+        if sequence is None:
+            return self.pll_iterative()
+        if sequence:
+            self.cube.run(ALGORITHMS.program(sequence))
+            self.invert_cube()
+        return None
+
+    def pll_iterative(self):
         """
         Solve the permutation of the last layer
         """
+        pll_sequences = ALGORITHMS["pll"]
         self.orient_cube()
         self.invert_cube()
         # print_color_cube(self.cube)
@@ -970,23 +979,98 @@ class Solver:
         state = self._pll_get_state()
         if state in pll_sequences:
             print(f"PLL sequence for state {state}: {pll_sequences[state]}")
-            self.cube.sequence(pll_sequences[state])
+            self.cube.run(ALGORITHMS.program(pll_sequences[state]))
         if self._pll_is_solved():
             print("PLL is solved.")
             return None
         print(f"pll state: {self._pll_get_state()}")
         return None
 
-    def solve(self):
+    def solve(self, dry_run=False):
         """
-        Solve the cube
+        Solve the cube, recording every move it takes.
+        Parameters:
+        - dry_run: solve a copy of the cube and leave self.cube as it is
+          (default is False).
+        Returns a dict with:
+        - moves: the whole solution as a sequence string,
+        - quarter_turns: the number of quarter turn face and slice moves,
+        - half_turns: the number of half turn face and slice moves,
+        - phases: the moves of each phase (cross, f2l, oll, pll).
+        Whole cube rotations are kept in the sequences but not counted,
+        and every sequence is simplified, so the checks the phases make by
+        turning the cube back and forth cancel out.
+        With a cache, a state solved before (or symmetric to one) is answered
+        from the cache and the cached moves are applied to the cube.
+        The seconds each phase took are left in self.timings.
         """
-        # Implement the solving algorithm here
-        self.cross()
-        self.f2l()
-        self.oll()
-        self.pll()
-        self.yellow_cross()
+        key = None
+        self.timings = {}
+        if self.cache is not None:
+            key = self.cache.key(self.cube)
+            solution = self.cache.get(key)
+            if solution is not None:
+                if not dry_run:
+                    self.cube.sequence(solution["moves"])
+                return solution
+        solution = self._solve(dry_run)
+        if key is not None:
+            self.cache.put(key, solution)
+        return solution
+
+    def _solve(self, dry_run):
+        """
+        Solve the cube phase by phase, see solve().
+        """
+        from simplify import simplify_sequence
+
+        cube = self.cube
+        if dry_run:
+            self.cube = cube.copy()
+        phases = {}
+        try:
+            for phase, steps in (
+                ("cross", (self.cross,)),
+                ("f2l", (self.f2l,)),
+                ("oll", (self.oll,)),
+                ("pll", (self.pll, self.yellow_cross)),
+            ):
+                start = perf_counter()
+                self.cube.start_recording()
+                for step in steps:
+                    step()
+                moves = format_moves(self.cube.stop_recording())
+                phases[phase] = simplify_sequence(moves)
+                self.timings[phase] = perf_counter() - start
+        finally:
+            self.cube.stop_recording()
+            self.cube = cube
+        moves = simplify_sequence(" ".join(phases.values()))
+        turns = [move for move in moves.split() if move[0] not in "xyzXYZ"]
+        half_turns = sum(1 for move in turns if "2" in move)
+        return {
+            "moves": moves,
+            "quarter_turns": len(turns) - half_turns,
+            "half_turns": half_turns,
+            "phases": phases,
+        }
+
+
+def solve_state(state):
+    """
+    Solve a 54 character state string with Solver.solve().
+    Raises ValueError for strings that are not a solvable 3x3.
+    """
+    if not isinstance(state, str) or len(state) != 54:
+        raise ValueError("state must be a 54 character string")
+    from coordinates import check_solvable, oriented_codes
+
+    cube = Cube(state=state)
+    codes, _ = oriented_codes(cube)
+    check_solvable(codes)
+    # the last layer steps print what they do
+    with contextlib.redirect_stdout(io.StringIO()):
+        return Solver(cube).solve()
 
 
 if __name__ == "__main__":
@@ -0,0 +1,348 @@
+"""
+Solver benchmark harness.
+Runs a solver over a seeded scramble corpus (see scramble_corpus.py) across
+a process pool and reports, as json so runs can be compared:
+  - solves per second and the success rate,
+  - p50, p95 and p99 latency of every phase and of the whole solve,
+  - a histogram of the number of moves of the solutions.
+Solvers, by SOLVERS name:
+  - solver: Solver.solve() of this package, phases cross, f2l, oll and pll,
+  - legacy: Cube.solve() of ../cube/cube.py, its steps as phases,
+  - cube2: Cube.solve() of ../cube/cube2.py, the same steps.
+The legacy cubes count their face and slice turns, leaving out the turns
+their whole cube rotations are made of. A solve that raises one of
+SOLVE_ERRORS or reports a failed step is a failure, and is left out of the
+latency and move stats.
+A corpus file of scramble_corpus.py can be replayed instead with --corpus,
+its first --count scrambles are solved.
+Run from the cube_2025 directory:
+    python solver_benchmark.py [--solver NAME] [--count N] [--seed N]
+        [--corpus PATH] [--workers N] [--output PATH]
+"""
+
+import argparse
+import contextlib
+import importlib.util
+import io
+import json
+import os
+from collections import Counter
+from functools import lru_cache
+from statistics import mean
+from time import perf_counter
+from algorithms import DATA_DIR
+from benchmark import percentile
+from cube import Cube
+from scramble_corpus import ScrambleCorpus, generate_corpus
+from solver import Solver
+from worker_pool import warm_pool
+
+LEGACY_DIR = os.path.join(os.path.dirname(DATA_DIR), "cube")
+# the steps of the legacy Cube.solve(), in order
+LEGACY_STEPS = (
+    "solve_white_cross",
+    "solve_white_corners",
+    "solve_second_layer",
+    "solve_yellow_cross",
+    "solve_yellow_edges",
+    "solve_yellow_corners",
+    "orient_yellow_corners",
+)
+PERCENTILES = (50, 95, 99)
+# what the solvers raise on states they can not solve, counted as failures:
+# this package raises ValueError, the legacy cubes fail their lookups
+SOLVE_ERRORS = (ValueError, KeyError, IndexError)
+# scrambles sent to a worker at a time
+CHUNK_SIZE = 16
+
+
+@lru_cache(maxsize=None)
+def legacy_module(name):
+    """
+    Import a module of the legacy cube directory by file, under another name,
+    as it would clash with this package's cube module.
+    """
+    spec = importlib.util.spec_from_file_location(
+        f"legacy_{name}", os.path.join(LEGACY_DIR, f"{name}.py")
+    )
+    module = importlib.util.module_from_spec(spec)
+    spec.loader.exec_module(module)
+    return module
+
+
+class TurnCounter:
+    """
+    Count the face and slice turns of a legacy cube, leaving out the turns
+    its whole cube rotations are made of.
+    """
+
+    def __init__(self, cube):
+        """
+        Start counting the turns of a legacy cube.
+        """
+        self.turns = 0
+        self._rotations = 0
+        self._rotate = cube.rotate
+        cube.rotate = self.rotate
+        cube.rotate_cube = self._whole_cube(cube.rotate_cube)
+        cube.tilt_cube = self._whole_cube(cube.tilt_cube)
+
+    def rotate(self, face, clockwise=True):
+        """
+        Turn a face or slice, counting it unless a rotation is under way.
+        """
+        if not self._rotations:
+            self.turns += 1
+        self._rotate(face, clockwise)
+
+    def _whole_cube(self, rotation):
+        """
+        Wrap a whole cube rotation so the turns it makes are not counted.
+        """
+
+        def rotate(clockwise=True):
+            self._rotations += 1
+            try:
+                rotation(clockwise)
+            finally:
+                self._rotations -= 1
+
+        return rotate
+
+
+def _result(phases, moves=None, error=None):
+    """
+    Result of one solve: its phase timings, move count and error, if any.
+    """
+    return {"ok": error is None, "phases": phases, "moves": moves, "error": error}
+
+
+def solve_current(scramble):
+    """
+    Scramble a cube and solve it with Solver.solve().
+    """
+    cube = Cube()
+    cube.sequence(scramble)
+    solver = Solver(cube)
+    solution = solver.solve()
+    solver.orient_cube()
+    if not solver.cube.is_solved():
+        return _result(solver.timings, error="not solved")
+    turns = solution["quarter_turns"] + solution["half_turns"]
+    return _result(solver.timings, turns)
+
+
+def solve_legacy(name, scramble):
+    """
+    Scramble a legacy cube and solve it step by step, like its Cube.solve().
+    """
+    cube = legacy_module(name).Cube()
+    for move in scramble.split():
+        for _ in range(2 if move.endswith("2") else 1):
+            cube.rotate(move[0], clockwise=not move.endswith("'"))
+    counter = TurnCounter(cube)
+    phases = {}
+    for step in LEGACY_STEPS:
+        start = perf_counter()
+        solved = getattr(cube, step)()
+        phases[step] = perf_counter() - start
+        if not solved:
+            return _result(phases, error=f"{step} failed")
+    return _result(phases, counter.turns)
+
+
+# solver name -> function(scramble) returning a _result
+SOLVERS = {
+    "solver": solve_current,
+    "legacy": lambda scramble: solve_legacy("cube", scramble),
+    "cube2": lambda scramble: solve_legacy("cube2", scramble),
+}
+
+
+def solve_chunk(solver, chunk):
+    """
+    Solve a list of scrambles in a worker, timing every solve.
+    SOLVE_ERRORS are failures, any other exception is a bug and is raised
+    with the scramble that caused it.
+    """
+    results = []
+    for scramble in chunk:
+        start = perf_counter()
+        # the solvers print what they do
+        with contextlib.redirect_stdout(io.StringIO()):
+            try:
+                result = SOLVERS[solver](scramble)
+            except SOLVE_ERRORS as error:
+                result = _result({}, error=f"{type(error).__name__}: {error}")
+            except Exception as error:
+                error.add_note(f"{solver} solving {scramble!r}")
+                raise
+        result["seconds"] = perf_counter() - start
+        results.append(result)
+    return results
+
+
+def warm_up(solver):
+    """
+    Solve one scramble, so a worker has the tables loaded before timing.
+    """
+    solve_chunk(solver, [sequence for sequence, _ in generate_corpus(1, seed=-1)])
+
+
+def _latency(seconds):
+    """
+    Percentiles, mean and max of a list of durations, in ms.
+    """
+    milliseconds = [1000 * value for value in seconds]
+    stats = {
+        f"p{percent}": percentile(milliseconds, percent) for percent in PERCENTILES
+    }
+    stats["mean"] = mean(milliseconds)
+    stats["max"] = max(milliseconds)
+    return stats
+
+
+def summarize(results):
+    """
+    Stats of a list of solve results, see run_benchmark().
+    """
+    succeeded = [result for result in results if result["ok"]]
+    report = {
+        "solves": len(results),
+        "succeeded": len(succeeded),
+        "success_rate": len(succeeded) / len(results) if results else 0.0,
+        "failures": dict(
+            Counter(result["error"] for result in results if not result["ok"])
+        ),
+        "latency_ms": {},
+        "moves": {},
+    }
+    if not succeeded:
+        return report
+    report["latency_ms"]["total"] = _latency(
+        [result["seconds"] for result in succeeded]
+    )
+    for phase in succeeded[0]["phases"]:
+        report["latency_ms"][phase] = _latency(
+            [result["phases"][phase] for result in succeeded]
+        )
+    moves = [result["moves"] for result in succeeded]
+    report["moves"] = {
+        "mean": mean(moves),
+        "min": min(moves),
+        "max": max(moves),
+        **{f"p{percent}": percentile(moves, percent) for percent in PERCENTILES},
+        "histogram": {
+            str(count): number for count, number in sorted(Counter(moves).items())
+        },
+    }
+    return report
+
+
+def run_benchmark(
+    solver="solver", count=100, seed=0, moves=20, workers=None, corpus_path=None
+):
+    """
+    Solve a seeded scramble corpus with a solver across worker processes.
+    With corpus_path, the first count scrambles of that corpus file are
+    solved instead, and the seed and moves are those of the file.
+    Returns a report dict: the solver, the corpus, the number of workers,
+    the seconds the solves took once the workers were warm, the solves per
+    second, and the stats of summarize().
+    """
+    if solver not in SOLVERS:
+        raise ValueError(f"Invalid solver {solver}: {list(SOLVERS)}")
+    if corpus_path is None:
+        corpus = [sequence for sequence, _ in generate_corpus(count, seed, moves)]
+    else:
+        corpus_file = ScrambleCorpus(corpus_path)
+        corpus = list(corpus_file.sequences(count))
+        count, seed, moves = len(corpus), corpus_file.seed, corpus_file.moves
+    corpus_info = {"count": count, "seed": seed, "moves": moves}
+    if corpus_path is not None:
+        corpus_info["path"] = corpus_path
+    workers = workers or os.cpu_count() or 1
+    chunks = [
+        corpus[start : start + CHUNK_SIZE] for start in range(0, count, CHUNK_SIZE)
+    ]
+    # every worker is warm before the timing starts
+    with warm_pool(workers, warm_up, (solver,)) as executor:
+        start = perf_counter()
+        results = [
+            result
+            for chunk in executor.map(solve_chunk, [solver] * len(chunks), chunks)
+            for result in chunk
+        ]
+        seconds = perf_counter() - start
+    return {
+        "solver": solver,
+        "corpus": corpus_info,
+        "workers": workers,
+        "seconds": seconds,
+        "solves_per_second": count / seconds if seconds else 0.0,
+        **summarize(results),
+    }
+
+
+def write_report(report, path):
+    """
+    Write a report as json, replacing the old file in one step.
+    """
+    with open(path + ".tmp", "w", encoding="utf-8") as file:
+        json.dump(report, file, indent=4)
+    os.replace(path + ".tmp", path)
+
+
+def print_report(report):
+    """
+    Print a report as a table.
+    """
+    print(
+        f"{report['solver']}: {report['solves']} solves on {report['workers']} "
+        f"workers in {report['seconds']:.2f} s, "
+        f"{report['solves_per_second']:.1f} solves/s, "
+        f"{100 * report['success_rate']:.1f}% solved"
+    )
+    for error, number in report["failures"].items():
+        print(f"  {number} failed: {error}")
+    header = "".join(f"{f'p{percent} ms':>12}" for percent in PERCENTILES)
+    print(f"{'phase':<24}{header}")
+    for phase, stats in report["latency_ms"].items():
+        print(
+            f"{phase:<24}"
+            + "".join(f"{stats[f'p{percent}']:>12.2f}" for percent in PERCENTILES)
+        )
+    if report["moves"]:
+        stats = report["moves"]
+        print(
+            f"moves: mean {stats['mean']:.1f}, min {stats['min']}, max {stats['max']}"
+        )
+        # bars of at most 50 characters
+        scale = max(1, max(stats["histogram"].values()) / 50)
+        for count, number in stats["histogram"].items():
+            print(f"{count:>5} {'#' * round(number / scale):<50} {number}")
+
+
+def main():
+    """
+    Benchmark a solver, print the report and optionally write it as json.
+    """
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument("--solver", choices=list(SOLVERS), default="solver")
+    parser.add_argument("--count", type=int, default=100, help="scrambles to solve")
+    parser.add_argument("--seed", type=int, default=0, help="corpus seed")
+    parser.add_argument("--moves", type=int, default=20, help="moves per scramble")
+    parser.add_argument("--corpus", default=None, help="corpus file to replay")
+    parser.add_argument("--workers", type=int, default=None, help="worker processes")
+    parser.add_argument("--output", default=None, help="json file to write")
+    args = parser.parse_args()
+    report = run_benchmark(
+        args.solver, args.count, args.seed, args.moves, args.workers, args.corpus
+    )
+    print_report(report)
+    if args.output:
+        write_report(report, args.output)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,145 @@
+"""
+Packed integer encoding of cube states.
+A state is given as slot codes (see `cube.SLOTS`):
+slot i holds `piece * 3 + orientation`.
+The corner permutation, corner twist, edge permutation, edge flip and center
+permutation are each ranked into a small integer and mixed into one number:
+    3x3: ((((centers * 8! + corners) * 3^8 + twist) * 12! + edges) * 2^12 + flip)
+    2x2: corners * 3^8 + twist
+Every code list maps to a distinct integer, so the encoding also covers states
+that can not be reached by moves (like a single twisted corner).
+"""
+
+from math import factorial
+
+CORNER_COUNT = 8
+EDGE_COUNT = 12
+CENTER_COUNT = 6
+_EDGE_START = CORNER_COUNT
+_CENTER_START = CORNER_COUNT + EDGE_COUNT
+_SLOT_COUNT = _CENTER_START + CENTER_COUNT
+
+# number of distinct values of each part, by cube size, most significant first
+_RADIXES = {
+    2: (factorial(CORNER_COUNT), 3**CORNER_COUNT),
+    3: (
+        factorial(CENTER_COUNT),
+        factorial(CORNER_COUNT),
+        3**CORNER_COUNT,
+        factorial(EDGE_COUNT),
+        2**EDGE_COUNT,
+    ),
+}
+STATE_LIMIT = {size: 1 for size in _RADIXES}
+for _size, _radixes in _RADIXES.items():
+    for _radix in _radixes:
+        STATE_LIMIT[_size] *= _radix
+# fixed width of to_bytes(), by cube size
+STATE_BYTES = {
+    size: (limit - 1).bit_length() // 8 + 1 for size, limit in STATE_LIMIT.items()
+}
+SIZE_BY_BYTES = {width: size for size, width in STATE_BYTES.items()}
+
+
+def rank_permutation(permutation):
+    """
+    Lehmer rank of a permutation of range(n), 0 <= rank < n!.
+    """
+    rank = 0
+    count = len(permutation)
+    for index, value in enumerate(permutation):
+        smaller = sum(1 for later in permutation[index + 1 :] if later < value)
+        rank = rank * (count - index) + smaller
+    return rank
+
+
+def unrank_permutation(rank, count):
+    """
+    Inverse of rank_permutation(): the permutation of range(count) with this rank.
+    """
+    digits = []
+    for base in range(1, count + 1):
+        rank, digit = divmod(rank, base)
+        digits.append(digit)
+    remaining = list(range(count))
+    return [remaining.pop(digit) for digit in reversed(digits)]
+
+
+def rank_orientation(orientations, modulus):
+    """
+    Base `modulus` number with the first orientation as the most significant digit.
+    """
+    rank = 0
+    for orientation in orientations:
+        rank = rank * modulus + orientation
+    return rank
+
+
+def unrank_orientation(rank, modulus, count):
+    """
+    Inverse of rank_orientation().
+    """
+    orientations = [0] * count
+    for index in range(count - 1, -1, -1):
+        rank, orientations[index] = divmod(rank, modulus)
+    return orientations
+
+
+def encode_codes(codes, size=3):
+    """
+    Pack a list of slot codes into an integer below STATE_LIMIT[size].
+    Only the corner slots are used for a 2x2.
+    """
+    if size not in _RADIXES:
+        raise ValueError(f"Invalid cube size {size}")
+    corners = codes[:_EDGE_START]
+    parts = [
+        rank_permutation([code // 3 for code in corners]),
+        rank_orientation([code % 3 for code in corners], 3),
+    ]
+    if size == 3:
+        edges = codes[_EDGE_START:_CENTER_START]
+        centers = codes[_CENTER_START:_SLOT_COUNT]
+        parts = [
+            rank_permutation([code // 3 - _CENTER_START for code in centers]),
+            *parts,
+            rank_permutation([code // 3 - _EDGE_START for code in edges]),
+            rank_orientation([code % 3 for code in edges], 2),
+        ]
+    value = 0
+    for part, radix in zip(parts, _RADIXES[size]):
+        value = value * radix + part
+    return value
+
+
+def decode_codes(value, size=3):
+    """
+    Inverse of encode_codes(): the full list of slot codes for a packed state.
+    Slots a 2x2 does not use hold their solved codes.
+    """
+    if size not in _RADIXES:
+        raise ValueError(f"Invalid cube size {size}")
+    if not 0 <= value < STATE_LIMIT[size]:
+        raise ValueError(f"Invalid packed state {value} for size {size}")
+    parts = []
+    for radix in reversed(_RADIXES[size]):
+        value, part = divmod(value, radix)
+        parts.append(part)
+    parts.reverse()
+    codes = [slot * 3 for slot in range(_SLOT_COUNT)]
+    if size == 3:
+        centers, corners, twist, edges, flip = parts
+        edge_pieces = unrank_permutation(edges, EDGE_COUNT)
+        edge_flips = unrank_orientation(flip, 2, EDGE_COUNT)
+        for index, (piece, orientation) in enumerate(zip(edge_pieces, edge_flips)):
+            codes[_EDGE_START + index] = (_EDGE_START + piece) * 3 + orientation
+        center_pieces = unrank_permutation(centers, CENTER_COUNT)
+        for index, piece in enumerate(center_pieces):
+            codes[_CENTER_START + index] = (_CENTER_START + piece) * 3
+    else:
+        corners, twist = parts
+    corner_pieces = unrank_permutation(corners, CORNER_COUNT)
+    corner_twists = unrank_orientation(twist, 3, CORNER_COUNT)
+    for index, (piece, orientation) in enumerate(zip(corner_pieces, corner_twists)):
+        codes[index] = piece * 3 + orientation
+    return codes
@@ -0,0 +1,277 @@
+"""
+Symmetries of the cube.
+The cube has 48 spatial symmetries: the 24 whole cube rotations, each with
+or without a mirror in the plane between L and R. A symmetry is kept as a
+permutation of the 54 stickers of a 3x3 cube, SYMMETRIES[s][sticker] being
+where the sticker ends up.
+Applying a symmetry to a state moves its stickers; a move sequence that
+solves the moved state solves the original state once every move is mapped
+back through the symmetry (map_sequence), because symmetries take faces to
+faces.
+For slot codes (see cube.SLOTS) a symmetry is applied as a conjugation: the
+stickers move and every color follows its face, so the result is again a
+state of a cube in its home colors. canonicalize() reduces a cube to the
+smallest encode_codes() value over the 48 conjugations, and optionally the
+24 color schemes a cube can be recolored with as well.
+"""
+
+from cube import (
+    FRAMES,
+    MOVE_TABLES,
+    SLOT_FACES,
+    SLOT_INDEX,
+    SLOTS,
+    SOLVED_CODES,
+    format_moves,
+    parse_sequence,
+)
+from array_cube import FACELETS
+from state_encoding import encode_codes
+
+# (slot, sticker index in SLOT_FACES) of every sticker of a 3x3 state string
+STICKERS = FACELETS[3]
+STICKER_INDEX = {sticker: index for index, sticker in enumerate(STICKERS)}
+MIRROR_FACES = {"L": "R", "R": "L"}
+
+
+def table_stickers(table):
+    """
+    Sticker permutation of a move table: the piece leaving slot s for
+    destination d shows sticker k of s on sticker k - twist[d] of d.
+    """
+    stickers = []
+    for slot, index in STICKERS:
+        dest = table.destination[slot]
+        stickers.append(
+            STICKER_INDEX[(dest, (index - table.twist[dest]) % len(SLOTS[slot]))]
+        )
+    return tuple(stickers)
+
+
+def _mirror_stickers():
+    """
+    Sticker permutation of the mirror that swaps L and R.
+    """
+    by_faces = {frozenset(faces): slot for slot, faces in enumerate(SLOT_FACES)}
+    stickers = []
+    for slot, index in STICKERS:
+        faces = [MIRROR_FACES.get(face, face) for face in SLOT_FACES[slot]]
+        mirrored = by_faces[frozenset(faces)]
+        stickers.append(
+            STICKER_INDEX[(mirrored, SLOT_FACES[mirrored].index(faces[index]))]
+        )
+    return tuple(stickers)
+
+
+def _compose(first, second):
+    """
+    Sticker permutation of `first` followed by `second`.
+    """
+    return tuple(second[sticker] for sticker in first)
+
+
+def _inverse(permutation):
+    """
+    Sticker permutation that undoes `permutation`.
+    """
+    inverse = [0] * len(permutation)
+    for sticker, dest in enumerate(permutation):
+        inverse[dest] = sticker
+    return tuple(inverse)
+
+
+ROTATIONS = tuple(table_stickers(frame) for frame in FRAMES)
+MIRROR = _mirror_stickers()
+# rotations first, the identity being symmetry 0, then the mirrored rotations
+SYMMETRIES = ROTATIONS + tuple(_compose(MIRROR, rotation) for rotation in ROTATIONS)
+SYMMETRY_INDEX = {symmetry: index for index, symmetry in enumerate(SYMMETRIES)}
+SYMMETRY_INVERSES = tuple(SYMMETRY_INDEX[_inverse(s)] for s in SYMMETRIES)
+# sticker permutation of every move target -> (target, clockwise)
+MOVE_BY_STICKERS = {
+    table_stickers(table): move for move, table in MOVE_TABLES.items()
+}
+
+
+def _build_move_maps():
+    """
+    MOVE_MAPS[s][(target, clockwise)]: the move that has the same effect on a
+    state as `target` has on the state moved by symmetry s.
+    """
+    maps = []
+    for symmetry in SYMMETRIES:
+        inverse = _inverse(symmetry)
+        maps.append(
+            {
+                move: MOVE_BY_STICKERS[
+                    _compose(_compose(symmetry, table_stickers(table)), inverse)
+                ]
+                for move, table in MOVE_TABLES.items()
+            }
+        )
+    return tuple(maps)
+
+
+MOVE_MAPS = _build_move_maps()
+
+
+# for every symmetry, the index each sticker of a moved 3x3 state string is
+# read from (a 2x2 state string does not list every sticker)
+STATE_SYMMETRIES = tuple(_inverse(symmetry) for symmetry in SYMMETRIES)
+
+
+def apply_symmetry(state, symmetry):
+    """
+    Move the stickers of a 3x3 state string by a symmetry.
+    """
+    return "".join([state[index] for index in STATE_SYMMETRIES[symmetry]])
+
+
+def map_sequence(sequence, symmetry):
+    """
+    Map a sequence for the state moved by `symmetry` back to the state.
+    map_sequence(sequence, SYMMETRY_INVERSES[symmetry]) maps the other way.
+    """
+    moves = MOVE_MAPS[symmetry]
+    mapped = []
+    for target, clockwise, count in parse_sequence(sequence):
+        target, clockwise = moves[(target, clockwise)]
+        mapped.append((target, clockwise, count))
+    return format_moves(mapped)
+
+
+def _face_map(symmetry):
+    """
+    Face each face is taken to by a sticker permutation, read from the centers.
+    """
+    return {
+        face: SLOTS[STICKERS[symmetry[STICKER_INDEX[(SLOT_INDEX[face], 0)]]][0]]
+        for face in SLOTS
+        if len(face) == 1
+    }
+
+
+FACE_MAPS = tuple(_face_map(symmetry) for symmetry in SYMMETRIES)
+_PIECE_BY_FACES = {frozenset(faces): piece for piece, faces in enumerate(SLOT_FACES)}
+
+
+def _recolor(code, face_map):
+    """
+    Recolor a piece so that every sticker shows the color of face_map[face].
+    Returns (the recolored piece, the sticker of it that shows the color
+    sticker `orientation` of the code showed).
+    """
+    piece, orientation = divmod(code, 3)
+    faces = SLOT_FACES[piece]
+    recolored = _PIECE_BY_FACES[frozenset(face_map[face] for face in faces)]
+    return recolored, SLOT_FACES[recolored].index(face_map[faces[orientation]])
+
+
+def _build_conjugations():
+    """
+    CONJUGATIONS[s] = (destination, codes): conjugating by symmetry s moves
+    the code in slot i to slot destination[i], as codes[i][code].
+    """
+    conjugations = []
+    for symmetry, face_map in zip(SYMMETRIES, FACE_MAPS):
+        destination = []
+        codes = []
+        for slot, faces in enumerate(SLOT_FACES):
+            dest, index = STICKERS[symmetry[STICKER_INDEX[(slot, 0)]]]
+            destination.append(dest)
+            slot_codes = []
+            for code in range(3 * len(SLOTS)):
+                if code % 3 >= len(SLOT_FACES[code // 3]):
+                    slot_codes.append(None)
+                    continue
+                piece, shown = _recolor(code, face_map)
+                slot_codes.append(piece * 3 + (shown - index) % len(faces))
+            codes.append(tuple(slot_codes))
+        conjugations.append((tuple(destination), tuple(codes)))
+    return tuple(conjugations)
+
+
+def _build_recolorings():
+    """
+    RECOLORINGS[r][code]: the code a piece shows once the cube is recolored
+    with the color scheme turned by rotation r (the first 24 symmetries).
+    """
+    recolorings = []
+    for face_map in FACE_MAPS[: len(ROTATIONS)]:
+        recolored = []
+        for code in range(3 * len(SLOTS)):
+            if code % 3 >= len(SLOT_FACES[code // 3]):
+                recolored.append(None)
+                continue
+            piece, shown = _recolor(code, face_map)
+            recolored.append(piece * 3 + shown)
+        recolorings.append(tuple(recolored))
+    return tuple(recolorings)
+
+
+CONJUGATIONS = _build_conjugations()
+RECOLORINGS = _build_recolorings()
+CENTER_SLOTS = tuple(slot for slot, faces in enumerate(SLOT_FACES) if len(faces) == 1)
+
+
+def _build_home_recolorings():
+    """
+    HOME_RECOLORINGS[center codes]: the recoloring that turns the codes of
+    the center slots into the home centers.
+    """
+    home = {}
+    for recoloring, recolored in enumerate(RECOLORINGS):
+        inverse = {new: code for code, new in enumerate(recolored) if new is not None}
+        centers = tuple(inverse[SOLVED_CODES[slot]] for slot in CENTER_SLOTS)
+        home[centers] = recoloring
+    return home
+
+
+HOME_RECOLORINGS = _build_home_recolorings()
+
+
+def conjugate_codes(codes, symmetry, recoloring=0):
+    """
+    Slot codes of a state conjugated by a symmetry, then recolored by one
+    of the 24 color schemes.
+    """
+    destination, slot_codes = CONJUGATIONS[symmetry]
+    recolored = RECOLORINGS[recoloring]
+    conjugated = [0] * len(codes)
+    for slot, code in enumerate(codes):
+        conjugated[destination[slot]] = recolored[slot_codes[slot][code]]
+    return conjugated
+
+
+def canonical_codes(codes, size=3, colors=False):
+    """
+    Representative of a state under the 48 symmetries and, with colors=True,
+    the 24 color schemes.
+    Returns (encoding, symmetry, recoloring): the smallest encode_codes()
+    value and the transform that gives it, see conjugate_codes().
+    The centers are the most significant part of a 3x3 encoding, so for a
+    3x3 only the recoloring that brings the centers home is tried.
+    """
+    best = None
+    for symmetry in range(len(SYMMETRIES)):
+        recolorings = range(len(RECOLORINGS) if colors else 1)
+        if colors and size == 3:
+            conjugated = conjugate_codes(codes, symmetry)
+            centers = tuple(conjugated[slot] for slot in CENTER_SLOTS)
+            if centers in HOME_RECOLORINGS:
+                recolorings = (HOME_RECOLORINGS[centers],)
+        for recoloring in recolorings:
+            encoding = encode_codes(
+                conjugate_codes(codes, symmetry, recoloring), size
+            )
+            if best is None or encoding < best[0]:
+                best = (encoding, symmetry, recoloring)
+    return best
+
+
+def canonicalize(cube, colors=False):
+    """
+    Representative of a cube state, see canonical_codes().
+    A sequence that solves the representative solves the cube once it is
+    mapped with map_sequence(sequence, symmetry).
+    """
+    return canonical_codes(cube.slot_codes(), cube.size, colors)
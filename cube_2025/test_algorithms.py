@@ -0,0 +1,94 @@
+"""
+Unit tests for the algorithm library
+"""
+
+import json
+import os
+import shutil
+import tempfile
+import unittest
+from algorithms import ALGORITHM_FILES, DATA_DIR, AlgorithmLibrary
+from array_cube import ArrayCube
+from cube import Cube
+
+
+class TestAlgorithms(unittest.TestCase):
+    """
+    Unit test cases for the algorithm library.
+    """
+
+    def setUp(self):
+        """
+        Copy the json files to a scratch directory.
+        """
+        self.directory = tempfile.mkdtemp()
+        for filename in ALGORITHM_FILES.values():
+            shutil.copy(os.path.join(DATA_DIR, filename), self.directory)
+        self.cache_path = os.path.join(self.directory, "algorithms.pickle")
+
+    def tearDown(self):
+        shutil.rmtree(self.directory)
+
+    def test_lazy_load(self):
+        """
+        Validates that nothing is read before first use and that every
+        stored sequence is compiled.
+        """
+        library = AlgorithmLibrary(self.directory, self.cache_path)
+        self.assertFalse(os.path.exists(self.cache_path))
+        sequences = library["f2l"]["edge_sequences"]
+        self.assertTrue(os.path.exists(self.cache_path))
+        self.assertIn("FL", sequences)
+        for name in ALGORITHM_FILES:
+            for sequence in library[name].values():
+                if isinstance(sequence, str):
+                    self.assertEqual(library.program(sequence).sequence, sequence)
+
+    def test_cache(self):
+        """
+        Validates that a new library reads the cache, and that the cache is
+        rebuilt when a json file changes.
+        """
+        AlgorithmLibrary(self.directory, self.cache_path).load()
+        library = AlgorithmLibrary(self.directory, None)
+        library.load()
+        count = len(library)
+        cached = AlgorithmLibrary(self.directory, self.cache_path)
+        self.assertEqual(len(cached), count)
+        path = os.path.join(self.directory, ALGORITHM_FILES["pll"])
+        with open(path, "w", encoding="utf-8") as file:
+            json.dump({"case": "R U R' U' L' B2"}, file)
+        changed = AlgorithmLibrary(self.directory, self.cache_path)
+        self.assertEqual(changed["pll"], {"case": "R U R' U' L' B2"})
+        self.assertEqual(len(changed), len(AlgorithmLibrary(self.directory, None)))
+
+    def test_validation(self):
+        """
+        Validates that bad sequences and bad data are refused.
+        """
+        path = os.path.join(self.directory, ALGORITHM_FILES["oll"])
+        for data in ({"case": "R U Q"}, {"case": ["R", "U"]}):
+            with open(path, "w", encoding="utf-8") as file:
+                json.dump(data, file)
+            with self.assertRaises(ValueError):
+                AlgorithmLibrary(self.directory, self.cache_path).load()
+
+    def test_run(self):
+        """
+        Validates that running a program matches applying its sequence,
+        and that it is recorded.
+        """
+        library = AlgorithmLibrary(self.directory, None)
+        program = library.program("R U R' U' y' M2")
+        for cube_class in (Cube, ArrayCube):
+            cube = cube_class()
+            cube.start_recording()
+            cube.run(program)
+            self.assertEqual(cube.stop_recording(), list(program.moves))
+            expected = cube_class()
+            expected.sequence(program.sequence)
+            self.assertEqual(str(cube), str(expected))
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,221 @@
+"""
+Unit tests for the ArrayCube class
+"""
+
+import unittest
+import logging
+from random import choice
+from cube import Cube
+from array_cube import ArrayCube
+from solver import Solver
+from test_cube import test_states
+
+# Enable debug logging
+logging.basicConfig(
+    level=logging.INFO, format="%(asctime)s - %(levelname)s - %(message)s"
+)
+
+ITERATIONS = 200
+
+MOVES = "UDLRFBMESxyzudlrfb"
+
+
+def random_sequence(length=30, moves=MOVES):
+    """
+    Build a random sequence string from the given move targets.
+    """
+    return " ".join(choice(moves) + choice(["", "'", "2"]) for _ in range(length))
+
+
+class TestArrayCube(unittest.TestCase):
+    """
+    Unit test cases for the ArrayCube class.
+    """
+
+    def test_default_initialization(self):
+        """
+        Validates that a new ArrayCube is a solved 3x3.
+        """
+        cube = ArrayCube()
+        self.assertEqual(cube.size, 3)
+        self.assertTrue(cube.is_solved())
+        self.assertEqual(str(cube), test_states["init"])
+        self.assertEqual(len(cube.cubies), 26)
+        self.assertEqual(len(ArrayCube(size=2).cubies), 8)
+
+    def test_single_moves(self):
+        """
+        Validates every face and whole cube rotation against the known states.
+        """
+        cube = ArrayCube()
+        for axis in "XYZ":
+            cube.rotate_cube(axis=axis, clockwise=True)
+            self.assertEqual(str(cube), test_states[axis])
+            cube.rotate_cube(axis=axis, clockwise=False)
+            self.assertEqual(str(cube), test_states["init"])
+        for face in "UDFBLR":
+            cube.rotate_face(face, clockwise=True)
+            self.assertEqual(str(cube), test_states[face])
+            cube.rotate_face(face, clockwise=False)
+            self.assertTrue(cube.is_solved())
+
+    def test_matches_cube(self):
+        """
+        Validates that random sequences give the same stickers and cubies
+        as the Cube class.
+        """
+        for _ in range(ITERATIONS):
+            sequence = random_sequence()
+            cube = Cube()
+            array_cube = ArrayCube()
+            cube.sequence(sequence)
+            array_cube.sequence(sequence)
+            self.assertEqual(str(array_cube), str(cube), sequence)
+            self.assertEqual(array_cube.is_solved(), cube.is_solved())
+            for cubie in cube:
+                view = array_cube.get_cubie(cubie.position)
+                self.assertEqual(view.color, cubie.color)
+                self.assertEqual(view.orientation, cubie.orientation)
+
+    def test_matches_cube_2x2(self):
+        """
+        Validates 2x2 face moves against the Cube class.
+        """
+        cube = Cube(size=2)
+        array_cube = ArrayCube(size=2)
+        sequence = random_sequence(moves="UDLRFBxyz", length=ITERATIONS)
+        cube.sequence(sequence)
+        array_cube.sequence(sequence)
+        self.assertEqual(str(array_cube), str(cube))
+
+    def test_load(self):
+        """
+        Validates loading state strings and cubie lists.
+        """
+        for _ in range(ITERATIONS):
+            cube = Cube()
+            cube.sequence(random_sequence())
+            self.assertEqual(str(ArrayCube(state=str(cube))), str(cube))
+            self.assertEqual(str(ArrayCube(cubies=cube.cubies)), str(cube))
+        with self.assertRaises(ValueError):
+            ArrayCube(state=test_states["crosses"].replace("W", "Y"))
+
+    def test_set_sticker(self):
+        """
+        Validates repainting stickers against the Cube class.
+        """
+        cube = Cube()
+        array_cube = ArrayCube()
+        cube.sequence("Y")
+        array_cube.sequence("Y")
+        # swap the F and R colors of the UF and UR edges, a sticker at a time
+        front, right = cube.get_sticker("F", 1), cube.get_sticker("R", 1)
+        for face, color in (("F", right), ("R", front)):
+            cube.set_sticker(face, 1, color)
+            array_cube.set_sticker(face, 1, color)
+        self.assertEqual(str(array_cube), str(cube))
+        self.assertEqual(hash(array_cube), hash(cube))
+        self.assertEqual(array_cube.get_cubie("UF").color, cube.get_cubie("UF").color)
+        with self.assertRaises(ValueError):
+            array_cube.set_sticker("F", 1, array_cube.get_sticker("U", 7))
+
+    def test_state_hash(self):
+        """
+        Validates that both engines agree on state hashes and equality.
+        """
+        for _ in range(ITERATIONS):
+            sequence = random_sequence()
+            cube = Cube()
+            array_cube = ArrayCube()
+            cube.sequence(sequence)
+            array_cube.sequence(sequence)
+            self.assertEqual(hash(array_cube), hash(cube))
+            self.assertEqual(array_cube, cube)
+            self.assertEqual(array_cube, ArrayCube(state=str(cube)))
+            self.assertEqual(hash(array_cube), hash(ArrayCube(state=str(cube))))
+
+    def test_copy_snapshot_restore(self):
+        """
+        Validates copy(), snapshot() and restore().
+        """
+        cube = ArrayCube()
+        cube.sequence(random_sequence())
+        state = str(cube)
+        cubie = cube.get_cubie("UFR")
+        clone = cube.copy()
+        clone.rotate_face("R")
+        self.assertEqual(str(cube), state)
+        self.assertIs(clone.get_cubie(clone.cubies[0].position).cube, clone)
+        snapshot = cube.snapshot()
+        cube.sequence(random_sequence())
+        cube.restore(snapshot)
+        self.assertEqual(str(cube), state)
+        self.assertEqual(cube, ArrayCube(state=state))
+        self.assertIs(cube.get_cubie("UFR"), cubie)
+
+    def test_packed_encoding(self):
+        """
+        Validates that both engines pack states the same way.
+        """
+        for _ in range(ITERATIONS):
+            sequence = random_sequence()
+            cube = Cube()
+            array_cube = ArrayCube()
+            cube.sequence(sequence)
+            array_cube.sequence(sequence)
+            self.assertEqual(array_cube.to_bytes(), cube.to_bytes())
+            self.assertEqual(ArrayCube.from_bytes(cube.to_bytes()), array_cube)
+        cube = ArrayCube(size=2)
+        cube.sequence(random_sequence(moves="UDLRFB"))
+        self.assertEqual(str(ArrayCube.from_bytes(cube.to_bytes())), str(cube))
+
+    def test_recording(self):
+        """
+        Validates that both engines record the same moves.
+        """
+        moves = []
+        for cube in (Cube(), ArrayCube()):
+            cube.start_recording()
+            cube.rotate_face("F", clockwise=False)
+            cube.rotate_slice("E")
+            cube.rotate_cube(axis="z")
+            cube.sequence("U2 r' x")
+            moves.append(cube.stop_recording())
+        self.assertEqual(moves[0], moves[1])
+        self.assertEqual(len(moves[0]), 6)
+
+    def test_cubie_views(self):
+        """
+        Validates that cubies follow their piece through moves.
+        """
+        cube = ArrayCube()
+        cubie = cube.get_cubie("UFR")
+        cube.rotate_face("U", clockwise=True)
+        self.assertEqual(cubie.position, "UFL")
+        self.assertIs(cube.get_cubie("UFL"), cubie)
+        cube.rotate_face("U", clockwise=False)
+        self.assertEqual(cubie.position, "UFR")
+        cubie.orientation = 1
+        self.assertFalse(cube.is_solved())
+        cubie.orientation = 0
+        self.assertTrue(cube.is_solved())
+
+    def test_solver(self):
+        """
+        Validates that the solver makes the same moves on both engines.
+        """
+        for _ in range(10):
+            sequence = random_sequence(moves="UDLRFB", length=20)
+            cube = Cube()
+            array_cube = ArrayCube()
+            cube.sequence(sequence)
+            array_cube.sequence(sequence)
+            for solver in (Solver(cube), Solver(array_cube)):
+                solver.cross()
+                solver.f2l()
+                solver.oll()
+            self.assertEqual(str(array_cube), str(cube))
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,99 @@
+"""
+Unit tests for the BatchCube class
+"""
+
+import unittest
+from array_cube import ArrayCube
+from batch_cube import BatchCube, sequence_permutation
+from test_array_cube import random_sequence
+
+ITERATIONS = 100
+
+
+class TestBatchCube(unittest.TestCase):
+    """
+    Unit test cases for the BatchCube class.
+    """
+
+    def test_string_round_trip(self):
+        """
+        Validates converting state strings to a batch and back.
+        """
+        states = []
+        for _ in range(ITERATIONS):
+            cube = ArrayCube()
+            cube.sequence(random_sequence())
+            states.append(str(cube))
+        batch = BatchCube.from_strings(states)
+        self.assertEqual(len(batch), ITERATIONS)
+        self.assertEqual(batch.to_strings(), states)
+        with self.assertRaises(ValueError):
+            BatchCube.from_strings(["WWW"])
+        with self.assertRaises(ValueError):
+            BatchCube.from_strings([states[0].replace("W", "X")])
+
+    def test_from_codes(self):
+        """
+        Validates building a batch from slot codes against ArrayCube.
+        """
+        cubes = []
+        for _ in range(ITERATIONS):
+            cube = ArrayCube()
+            cube.sequence(random_sequence())
+            cubes.append(cube)
+        batch = BatchCube.from_codes([cube.slot_codes() for cube in cubes])
+        self.assertEqual(batch.to_strings(), [str(cube) for cube in cubes])
+        with self.assertRaises(ValueError):
+            BatchCube.from_codes([[0] * 20])
+
+    def test_sequence(self):
+        """
+        Validates that a sequence applied to a batch matches ArrayCube.
+        """
+        cubes = []
+        for _ in range(ITERATIONS):
+            cube = ArrayCube()
+            cube.sequence(random_sequence())
+            cubes.append(cube)
+        batch = BatchCube.from_strings(str(cube) for cube in cubes)
+        sequence = random_sequence()
+        batch.sequence(sequence)
+        for cube in cubes:
+            cube.sequence(sequence)
+        self.assertEqual(batch.to_strings(), [str(cube) for cube in cubes])
+        # the cached permutation is shared, so it can not be written through
+        with self.assertRaises(ValueError):
+            sequence_permutation(sequence)[0] = 0
+
+    def test_scramble(self):
+        """
+        Validates that the returned move lists replay to the scrambled states.
+        """
+        batch = BatchCube(ITERATIONS)
+        self.assertTrue(batch.is_solved().all())
+        move_ids = batch.scramble(moves=20, rng=0)
+        self.assertEqual(move_ids.shape, (ITERATIONS, 20))
+        self.assertFalse(batch.is_solved().any())
+        sequences = BatchCube.move_strings(move_ids)
+        for sequence, state in zip(sequences, batch.to_strings()):
+            cube = ArrayCube()
+            cube.sequence(sequence)
+            self.assertEqual(str(cube), state)
+        # the same seed scrambles the same way
+        again = BatchCube(ITERATIONS)
+        again.scramble(moves=20, rng=0)
+        self.assertEqual(again.to_strings(), batch.to_strings())
+
+    def test_is_solved(self):
+        """
+        Validates the vectorized solved check.
+        """
+        batch = BatchCube(4)
+        batch.facelets[1:] = batch[1:].facelets[:, ::-1]
+        self.assertEqual(batch.is_solved().tolist(), [True, False, False, False])
+        batch.sequence("R U R' U' U R U' R'")
+        self.assertTrue(batch[0].is_solved()[0])
+
+
+if __name__ == "__main__":
+    unittest.main()
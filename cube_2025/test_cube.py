@@ -4,7 +4,8 @@ Unit tests for the Cube class
 
 import unittest
 import logging
-from cube import Cube
+from array_cube import ArrayCube
+from cube import Cube, compile_sequence, format_moves
 
 # Enable debug logging
 logging.basicConfig(
@@ -253,6 +254,19 @@ class TestCube(unittest.TestCase):
             # Check if the cube returns to the initial state
             self.assertEqual(str(cube), test_states["init"])
 
+    def test_invalid_rotation(self):
+        """
+        Validates that unknown axes and slices raise ValueError on both engines.
+        """
+        for cube in (Cube(), ArrayCube()):
+            for axis in ("", "XY", "W"):
+                with self.assertRaises(ValueError):
+                    cube.rotate_cube(axis=axis)
+            for cube_slice in ("", "ME", "U"):
+                with self.assertRaises(ValueError):
+                    cube.rotate_slice(cube_slice)
+            self.assertTrue(cube.is_solved())
+
     def test_face_rotation(self):
         """
         Test the rotation of the cube faces.
@@ -294,6 +308,209 @@ class TestCube(unittest.TestCase):
         # Check if the cube returns to the initial state
         self.assertEqual(str(cube), initial_state)
 
+    def test_position_index(self):
+        """
+        Test the position index kept by Cubie.rotate.
+        Validates that get_cubie and get_cubies agree with the cubie positions
+        after scrambling with every kind of move.
+        """
+        cube = Cube(size=3, debug=True)
+        cube.scramble()
+        cube.sequence("M E S x y z u d l r f b")
+        self.assertEqual(len(cube.position_index), len(cube.cubies))
+        for cubie in cube.cubies:
+            self.assertIs(cube.get_cubie(cubie.position), cubie)
+        for face in "UDLRFB":
+            self.assertEqual(
+                set(cube.get_cubies(face_filter=[face])),
+                {cubie for cubie in cube.cubies if face in cubie.position},
+            )
+        positions = ["UFR", "UF", "U"]
+        self.assertEqual(
+            [cubie.position for cubie in cube.get_cubies(position_filter=positions)],
+            positions,
+        )
+
+    def test_compiled_sequence(self):
+        """
+        Test sequences applied through compiled move tables.
+        Validates that a compiled sequence matches applying each move in turn,
+        and that repeated sequences come from the cache.
+        """
+        sequence = "R U R' U' M2 E' S x y' z2 u d' l r2 f b'"
+        cube = Cube(size=3, debug=True)
+        cube.sequence(sequence)
+        step_cube = Cube(size=3, debug=True)
+        for move in sequence.split():
+            for _ in range(2 if "2" in move else 1):
+                clockwise = "'" not in move
+                if move[0] in "UDLRFB":
+                    step_cube.rotate_face(move[0], clockwise=clockwise)
+                elif move[0] in "MES":
+                    step_cube.rotate_slice(move[0], clockwise=clockwise)
+                elif move[0] in "xyz":
+                    step_cube.rotate_cube(axis=move[0].upper(), clockwise=clockwise)
+                else:
+                    step_cube.sequence(move[0] + ("" if clockwise else "'"))
+        self.assertEqual(str(cube), str(step_cube))
+        for cubie in cube.cubies:
+            self.assertIs(cube.get_cubie(cubie.position), cubie)
+        self.assertIs(compile_sequence(sequence), compile_sequence(sequence))
+        # (R U R' U') six times is the identity
+        cube.sequence("(R U R' U') [R U R' U'] {R U R' U'}")
+        cube.sequence("R,U,R',U',R,U,R',U',R,U,R',U'")
+        cube.sequence("U2' U2")
+        self.assertEqual(str(cube), str(step_cube))
+        with self.assertRaises(ValueError):
+            cube.sequence("R Q")
+        self.assertEqual(str(cube), str(step_cube))
+
+    def test_state_hash(self):
+        """
+        Test the incrementally updated state hash.
+        Validates that every kind of move keeps the hash equal to a full rehash,
+        and that equal states hash and compare equal.
+        """
+        cube = Cube(size=3, debug=True)
+        cube.scramble()
+        for cube_slice in "MES":
+            cube.rotate_slice(cube_slice, clockwise=True)
+        cube.rotate_cube(axis="X", clockwise=False)
+        cube.sequence("u d' l r2 f b'")
+        state_hash = cube.state_hash
+        cube.rehash()
+        self.assertEqual(cube.state_hash, state_hash)
+        loaded = Cube(state=str(cube))
+        self.assertEqual(hash(loaded), hash(cube))
+        self.assertEqual(loaded, cube)
+        self.assertEqual(len({cube: 1, loaded: 2}), 1)
+        # a mirror image has corners no cube has
+        mirrored = str(cube).translate(str.maketrans("GB", "BG"))
+        with self.assertRaises(ValueError):
+            Cube(state=mirrored)
+        loaded.rotate_face("U")
+        self.assertNotEqual(loaded, cube)
+        self.assertFalse(cube.is_solved())
+        cube.reset()
+        cube.sequence("R U R' U' U R U' R'")
+        self.assertTrue(cube.is_solved())
+        self.assertEqual(cube, Cube())
+
+    def test_orientation_frame(self):
+        """
+        Test the orientation frame kept for whole cube rotations.
+        Validates that rotations move no cubies, that moves and sticker
+        queries go through the frame, and that equal states still hash equal.
+        """
+        cube = Cube(size=3, debug=True)
+        cube.scramble()
+        home = [(cubie.home_position, cubie.home_orientation) for cubie in cube]
+        cube.sequence("x y2 z'")
+        self.assertNotEqual(cube.frame, 0)
+        self.assertEqual(
+            [(cubie.home_position, cubie.home_orientation) for cubie in cube], home
+        )
+        cube.sequence("R U' M2 f")
+        for cubie in cube.cubies:
+            self.assertIs(cube.get_cubie(cubie.position), cubie)
+        loaded = Cube(state=str(cube))
+        self.assertEqual(loaded.frame, 0)
+        self.assertEqual(hash(loaded), hash(cube))
+        self.assertEqual(loaded, cube)
+        self.assertEqual(Cube.from_int(cube.to_int()), cube)
+        state_hash = cube.state_hash
+        cube.rehash()
+        self.assertEqual(cube.state_hash, state_hash)
+        for size in (2, 3):
+            cube = Cube(size=size)
+            cube.sequence("x y R U R' U' y' x'")
+            self.assertEqual(cube.frame, 0)
+            self.assertFalse(cube.is_solved())
+            cube.sequence("x y U R U' R' y' x'")
+            self.assertTrue(cube.is_solved())
+            cube.rotate_cube(axis="Z")
+            self.assertFalse(cube.is_solved())
+            cube.rotate_cube(axis="Z", clockwise=False)
+            self.assertTrue(cube.is_solved())
+
+    def test_recording(self):
+        """
+        Test that moves are recorded between start_recording and
+        stop_recording, and that the recording replays.
+        """
+        cube = Cube()
+        cube.rotate_face("R")
+        cube.start_recording()
+        cube.rotate_face("U", clockwise=False)
+        cube.rotate_slice("M")
+        cube.rotate_cube(axis="x")
+        cube.sequence("R2, f' (y')")
+        moves = cube.stop_recording()
+        self.assertIsNone(cube.recording)
+        self.assertEqual(format_moves(moves), "U' M X R2 f' Y'")
+        cube.rotate_face("D")
+        self.assertEqual(len(moves), 6)
+        replay = Cube()
+        replay.rotate_face("R")
+        replay.sequence(format_moves(moves))
+        replay.rotate_face("D")
+        self.assertEqual(str(replay), str(cube))
+        self.assertEqual(cube.stop_recording(), [])
+
+    def test_copy_snapshot_restore(self):
+        """
+        Test copy(), snapshot() and restore().
+        Validates that copies are independent and that restore keeps
+        the cubie objects callers hold.
+        """
+        cube = Cube(size=3, debug=True)
+        cube.scramble()
+        state = str(cube)
+        clone = cube.copy()
+        self.assertEqual(clone, cube)
+        self.assertEqual(hash(clone), hash(cube))
+        clone.rotate_face("R")
+        self.assertEqual(str(cube), state)
+        self.assertNotEqual(clone, cube)
+        for cubie in clone.cubies:
+            self.assertIs(cubie.cube, clone)
+            self.assertIs(clone.get_cubie(cubie.position), cubie)
+        cubie = cube.get_cubie("UFR")
+        snapshot = cube.snapshot()
+        cube.sequence("R U R' U' F2 M x")
+        cube.reset()
+        cube.restore(snapshot)
+        self.assertEqual(str(cube), state)
+        self.assertIs(cube.get_cubie("UFR"), cubie)
+        state_hash = cube.state_hash
+        cube.rehash()
+        self.assertEqual(cube.state_hash, state_hash)
+
+    def test_packed_encoding(self):
+        """
+        Test to_int(), to_bytes() and from_bytes().
+        Validates round trips for both sizes and that different states
+        give different encodings.
+        """
+        self.assertEqual(Cube().to_int(), 0)
+        self.assertEqual(len(Cube().to_bytes()), 10)
+        self.assertEqual(len(Cube(size=2).to_bytes()), 4)
+        seen = {}
+        for size in (2, 3):
+            for _ in range(50):
+                cube = Cube(size=size)
+                cube.sequence("x y' M")
+                cube.scramble()
+                data = cube.to_bytes()
+                clone = Cube.from_bytes(data)
+                self.assertEqual(clone.size, size)
+                self.assertEqual(str(clone), str(cube))
+                self.assertEqual(clone, cube)
+                self.assertEqual(Cube.from_int(cube.to_int(), size), cube)
+                self.assertEqual(seen.setdefault(data, str(cube)), str(cube))
+        with self.assertRaises(ValueError):
+            Cube.from_bytes(b"\x00" * 7)
+
     # def test_representation(self):
     #     """
     #     Test the string representation of the Cube class.
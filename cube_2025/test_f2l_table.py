@@ -0,0 +1,80 @@
+"""
+Unit tests for the F2L pair table
+"""
+
+import unittest
+from cube import SOLVED_CODES, Cube, compile_sequence
+from array_cube import ArrayCube
+from coordinates import EDGE_START
+from f2l_table import (
+    F2L_SLOTS,
+    all_cases,
+    case_codes,
+    case_key,
+    f2l_table,
+    search_case,
+    solve_f2l,
+)
+from solver import Solver
+from white_cross import CROSS_EDGES
+
+ITERATIONS = 20
+
+
+class TestF2LTable(unittest.TestCase):
+    """
+    Unit test cases for the F2L pair table.
+    """
+
+    def test_table(self):
+        """
+        Validates that every case is in the table and its sequence inserts
+        the pair, keeping the cross and the slots the pair is not in.
+        """
+        table = f2l_table()
+        self.assertEqual(len(table), 384)
+        for case in all_cases():
+            codes = compile_sequence(table[case_key(case)]).apply(case_codes(case))
+            kept = [EDGE_START + edge for edge in CROSS_EDGES]
+            for corner, edge in F2L_SLOTS:
+                if corner != case[0] and edge != case[2]:
+                    kept.extend((corner, edge))
+            for slot in kept:
+                self.assertEqual(codes[slot], SOLVED_CODES[slot], case_key(case))
+
+    def test_search(self):
+        """
+        Validates that stored sequences are as short as a fresh search.
+        """
+        table = f2l_table()
+        for case in ((5, 0, 17, 0), (1, 1, 17, 1), (6, 2, 12, 1), (0, 1, 18, 0)):
+            self.assertEqual(
+                len(search_case(case)), len(table[case_key(case)].split())
+            )
+
+    def test_solve_f2l(self):
+        """
+        Validates that one lookup per pair solves F2L after the cross.
+        """
+        for cube_class in (Cube, ArrayCube):
+            for _ in range(ITERATIONS):
+                solver = Solver(cube_class())
+                solver.cube.scramble()
+                solver.cross()
+                moves = solve_f2l(solver.cube)
+                self.assertLessEqual(len(moves), 4 * 9)
+                solver.cube.sequence(" ".join(moves))
+                self.assertTrue(solver._f2l_is_solved())  # pylint: disable=protected-access
+
+    def test_cross_required(self):
+        """
+        Validates that F2L is refused without the white cross.
+        """
+        cube = Cube()
+        cube.sequence("U R")
+        with self.assertRaises(ValueError):
+            solve_f2l(cube)
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,102 @@
+"""
+Unit tests for the TwoPhaseSolver class
+"""
+
+import tempfile
+import unittest
+from random import choice
+from unittest.mock import patch
+from cube import Cube
+from array_cube import ArrayCube
+from coordinates import FACE_MOVES
+from kociemba_solver import TwoPhaseSolver
+
+
+class TestTwoPhaseSolver(unittest.TestCase):
+    """
+    Unit test cases for the TwoPhaseSolver class.
+    """
+
+    @classmethod
+    def setUpClass(cls):
+        cls.table_dir = tempfile.TemporaryDirectory()
+        cls.solver = TwoPhaseSolver(cls.table_dir.name)
+
+    @classmethod
+    def tearDownClass(cls):
+        cls.table_dir.cleanup()
+
+    def test_solved(self):
+        """
+        Validates that a solved cube needs no moves.
+        """
+        self.assertEqual(self.solver.solve(Cube()), "")
+
+    def test_random(self):
+        """
+        Validates that random scrambles are solved within the length budget.
+        """
+        for _ in range(5):
+            scramble = " ".join(choice(FACE_MOVES) for _ in range(25))
+            for cube_class in (Cube, ArrayCube):
+                cube = cube_class()
+                cube.sequence(scramble)
+                solution = self.solver.solve(cube, max_length=26)
+                self.assertLessEqual(len(solution.split()), 26)
+                cube.sequence(solution)
+                self.assertTrue(cube.is_solved(), scramble)
+
+    def test_phase2_only(self):
+        """
+        Validates that cubes already in G1 are solved by phase 2 alone.
+        """
+        cube = Cube()
+        cube.sequence("U R2 F2 D' L2")
+        solution = self.solver.solve(cube, max_length=5)
+        self.assertEqual(solution, "L2 D F2 R2 U'")
+        self.assertEqual(self.solver.stats["phase2_searches"], 1)
+
+    def test_rotated(self):
+        """
+        Validates that rotated cubes are turned back first.
+        """
+        cube = Cube()
+        cube.sequence("z R U F' D2 B")
+        solution = self.solver.solve(cube)
+        cube.sequence(solution)
+        self.assertTrue(cube.is_solved())
+
+    def test_timeout(self):
+        """
+        Validates that a timeout returns the best solution found so far.
+        """
+        cube = Cube()
+        cube.sequence(" ".join(choice(FACE_MOVES) for _ in range(25)))
+        solution = self.solver.solve(cube, max_length=0, timeout=0.2)
+        self.assertLess(self.solver.stats["seconds"], 5)
+        cube.sequence(solution)
+        self.assertTrue(cube.is_solved())
+
+    def test_no_solution(self):
+        """
+        Validates that a search finding nothing returns None.
+        """
+        cube = Cube()
+        cube.sequence("R U F")
+        with patch("kociemba_solver.PHASE1_DEPTH", -1):
+            self.assertIsNone(self.solver.solve(cube))
+        self.assertIsNone(self.solver.stats["length"])
+
+    def test_unsolvable(self):
+        """
+        Validates that impossible states are rejected.
+        """
+        cube = Cube()
+        cube.get_cubie("UF").orientation = 1
+        cube.rehash()
+        with self.assertRaises(ValueError):
+            self.solver.solve(cube)
+
+
+if __name__ == "__main__":
+    unittest.main()
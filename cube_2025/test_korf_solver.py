@@ -0,0 +1,117 @@
+"""
+Unit tests for the KorfSolver class
+"""
+
+import tempfile
+import unittest
+from random import choice
+from cube import SOLVED_CODES, Cube
+from array_cube import ArrayCube
+from coordinates import FACE_MOVE_TABLES, FACE_MOVES, check_solvable
+from korf_solver import KorfSolver
+
+# small edge patterns keep the tables quick to build for tests
+TEST_PATTERNS = ((0, 1, 2, 3), (4, 5, 6, 7), (8, 9, 10, 11))
+# a scrambled state with one wrong sticker, so one cubie shows up twice
+DUPLICATED_CUBIE = "GOBGWBRGYWBGBYGBORWWYRGROWGOOYYBYYWWBYGWRROYROGROOBBWW"
+
+
+class TestKorfSolver(unittest.TestCase):
+    """
+    Unit test cases for the KorfSolver class.
+    """
+
+    @classmethod
+    def setUpClass(cls):
+        cls.table_dir = tempfile.TemporaryDirectory()
+        cls.solver = KorfSolver(
+            cls.table_dir.name, corners=False, edge_patterns=TEST_PATTERNS
+        )
+        # exact distances of every state within three moves
+        cls.distances = {tuple(SOLVED_CODES): 0}
+        frontier = [list(SOLVED_CODES)]
+        for depth in range(1, 4):
+            next_frontier = []
+            for codes in frontier:
+                for table in FACE_MOVE_TABLES:
+                    moved = table.apply(codes)
+                    if tuple(moved) not in cls.distances:
+                        cls.distances[tuple(moved)] = depth
+                        next_frontier.append(moved)
+            frontier = next_frontier
+
+    @classmethod
+    def tearDownClass(cls):
+        cls.solver.close()
+        cls.table_dir.cleanup()
+
+    def test_solved(self):
+        """
+        Validates that a solved cube needs no moves.
+        """
+        self.assertEqual(self.solver.solve(Cube()), [])
+
+    def test_optimal(self):
+        """
+        Validates that solutions solve the cube and are as short as
+        a breadth first search finds.
+        """
+        for _ in range(10):
+            sequence = " ".join(choice(FACE_MOVES) for _ in range(4))
+            cube = ArrayCube()
+            cube.sequence(sequence)
+            solution = self.solver.solve(cube)
+            self.assertLessEqual(len(solution), 4)
+            distance = self.distances.get(tuple(cube.codes), 4)
+            self.assertEqual(len(solution), distance, sequence)
+            cube.sequence(" ".join(solution))
+            self.assertTrue(cube.is_solved(), sequence)
+
+    def test_rotated(self):
+        """
+        Validates that rotated cubes are turned back first.
+        """
+        cube = Cube()
+        cube.sequence("x y R U2 F'")
+        solution = self.solver.solve(cube)
+        cube.sequence(" ".join(solution))
+        self.assertTrue(cube.is_solved())
+        self.assertEqual(len([move for move in solution if move[0] in "XYZ"]), 2)
+
+    def test_stats(self):
+        """
+        Validates the search statistics.
+        """
+        cube = Cube()
+        cube.sequence("R U F")
+        self.solver.solve(cube)
+        stats = self.solver.stats
+        self.assertEqual(stats["nodes"], sum(stats["nodes_per_depth"]))
+        self.assertGreater(stats["nodes"], 0)
+        self.assertGreaterEqual(stats["nodes_per_second"], 0)
+        self.assertIsNone(self.solver.solve(cube, max_depth=2))
+
+    def test_unsolvable(self):
+        """
+        Validates that impossible states are rejected.
+        """
+        cube = Cube()
+        cube.get_cubie("UFR").orientation = 1
+        cube.rehash()
+        with self.assertRaises(ValueError):
+            self.solver.solve(cube)
+        with self.assertRaises(ValueError):
+            self.solver.solve(Cube(size=2))
+        # one wrong sticker gives two slots the same cubie
+        codes = list(SOLVED_CODES)
+        codes[1] = codes[0]
+        with self.assertRaises(ValueError):
+            check_solvable(codes)
+        with self.assertRaises(ValueError):
+            self.solver.solve(Cube(state=DUPLICATED_CUBIE))
+        with self.assertRaises(ValueError):
+            KorfSolver(self.table_dir.name, corners=False, edge_patterns=((0, 1),))
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,91 @@
+"""
+Unit tests for last layer recognition
+"""
+
+import unittest
+from random import choice
+from cube import Cube
+from array_cube import ArrayCube
+from last_layer import (
+    AUFS,
+    SOLVED_KEY,
+    YELLOW_UP,
+    last_layer_index,
+    recognize_oll,
+    recognize_pll,
+)
+from solver import Solver
+
+ITERATIONS = 20
+
+
+class TestLastLayer(unittest.TestCase):
+    """
+    Unit test cases for last layer recognition.
+    """
+
+    def test_index(self):
+        """
+        Validates that every orientation and permutation case is indexed.
+        """
+        oll, pll = last_layer_index()
+        self.assertEqual(len(oll), 216)
+        self.assertEqual(len(pll), 288)
+        self.assertEqual(pll[SOLVED_KEY], "")
+        self.assertEqual(len(SOLVED_KEY), 20)
+
+    def test_random_cases(self):
+        """
+        Validates that last layers mixed with indexed sequences are
+        recognized and solved, without moving the cube.
+        """
+        oll, pll = last_layer_index()
+        for _ in range(ITERATIONS):
+            solver = Solver(ArrayCube())
+            solver.cube.sequence(YELLOW_UP)
+            for _ in range(3):
+                solver.cube.sequence(choice(list(oll.values()) + list(pll.values())))
+                solver.invert_cube()
+            solver.cube.sequence(choice(AUFS))
+            solver.cube.sequence(recognize_oll(solver.cube))
+            solver.invert_cube()
+            self.assertTrue(solver._oll_is_solved())  # pylint: disable=protected-access
+            state = str(solver.cube)
+            sequence = recognize_pll(solver.cube)
+            self.assertEqual(str(solver.cube), state)
+            solver.cube.sequence(sequence)
+            self.assertTrue(_oriented_solved(solver))
+
+    def test_solve(self):
+        """
+        Validates that one lookup each solves the last layer after F2L,
+        without moving the cube.
+        """
+        for cube_class in (Cube, ArrayCube):
+            for _ in range(ITERATIONS):
+                solver = Solver(cube_class())
+                solver.cube.scramble()
+                solver.cross()
+                solver.f2l()
+                solver.invert_cube()
+                state = str(solver.cube)
+                sequence = recognize_oll(solver.cube)
+                self.assertEqual(str(solver.cube), state)
+                solver.cube.sequence(sequence)
+                solver.invert_cube()
+                self.assertTrue(solver._oll_is_solved())  # pylint: disable=protected-access
+                sequence = recognize_pll(solver.cube)
+                solver.cube.sequence(sequence)
+                self.assertTrue(_oriented_solved(solver))
+
+
+def _oriented_solved(solver):
+    """
+    Whether the cube is solved once it is held in the standard orientation.
+    """
+    solver.orient_cube()
+    return solver.cube.is_solved()
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,99 @@
+"""
+Unit tests for the batch mode of the command line interface
+"""
+
+import io
+import json
+import os
+import tempfile
+import unittest
+from cube import Cube
+from main import run_batch, solve_line, solve_lines
+from solve_server import scrambled_states
+from solver import Solver
+from test_korf_solver import DUPLICATED_CUBIE
+
+
+class FlushCounter(io.StringIO):
+    """
+    A string buffer recording how many lines were written at each flush.
+    """
+
+    def __init__(self):
+        super().__init__()
+        self.flushed = []
+
+    def flush(self):
+        self.flushed.append(self.getvalue().count("\n"))
+        super().flush()
+
+
+class TestBatch(unittest.TestCase):
+    """
+    Unit test cases for the batch mode.
+    """
+
+    def test_solve_line(self):
+        """
+        Validates that states and scramble sequences are solved, and that
+        bad lines give errors.
+        """
+        state = scrambled_states(1)[0]
+        for line in (state, "R U R' U' F2 D"):
+            result = solve_line(line)
+            cube = Cube(state=state) if line == state else Cube()
+            if line != state:
+                cube.sequence(line)
+            solver = Solver(cube)
+            solver.cube.sequence(result["moves"])
+            solver.orient_cube()
+            self.assertTrue(solver.cube.is_solved())
+            self.assertGreater(result["turns"], 0)
+            self.assertGreaterEqual(result["ms"], 0)
+        for line in ("R U Q", "W" * 54):
+            self.assertIn("error", solve_line(line))
+
+    def test_jobs_keep_order(self):
+        """
+        Validates that worker processes give the results in input order.
+        """
+        lines = scrambled_states(9, seed=2) + ["R U Q"]
+        expected = [solve_line(line) for line in lines]
+        results = list(solve_lines(lines, jobs=2, chunk_size=2))
+        for result in expected + results:
+            result.pop("ms", None)
+        self.assertEqual(results, expected)
+
+    def test_run_batch(self):
+        """
+        Validates one output line per non empty input line.
+        """
+        with tempfile.TemporaryDirectory() as directory:
+            path = os.path.join(directory, "scrambles.txt")
+            with open(path, "w", encoding="utf-8") as file:
+                file.write("R U\n\n  F2 D'  \n")
+            output = FlushCounter()
+            run_batch(path, output=output)
+        results = [json.loads(line) for line in output.getvalue().splitlines()]
+        self.assertEqual([result["turns"] > 0 for result in results], [True, True])
+        self.assertEqual(output.flushed, [1, 2])
+
+    def test_run_batch_corrupted(self):
+        """
+        Validates that a state with a wrong sticker gets an error line and
+        the lines after it are still solved.
+        """
+        with tempfile.TemporaryDirectory() as directory:
+            path = os.path.join(directory, "states.txt")
+            with open(path, "w", encoding="utf-8") as file:
+                file.write(f"{DUPLICATED_CUBIE}\nR U\n")
+            output = io.StringIO()
+            run_batch(path, output=output)
+        results = [json.loads(line) for line in output.getvalue().splitlines()]
+        self.assertEqual(len(results), 2)
+        self.assertIn("repeated", results[0]["error"])
+        self.assertGreater(results[1]["turns"], 0)
+
+
+if __name__ == "__main__":
+    unittest.main()
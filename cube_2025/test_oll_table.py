@@ -0,0 +1,66 @@
+"""
+Unit tests for the OLL table generator
+"""
+
+import unittest
+from algorithms import ALGORITHMS
+from cube import SOLVED_CODES
+from last_layer import ORIENTED_KEY, case_codes, last_layer_key, orientation_key
+from oll_table import (
+    BackwardSearch,
+    check_sequence,
+    held_sequence,
+    oll_case,
+    orientation_cases,
+    search_case,
+)
+
+
+class TestOLLTable(unittest.TestCase):
+    """
+    Unit test cases for the OLL table generator.
+    """
+
+    def test_orientation_cases(self):
+        """
+        Validates that there are 216 orientations, 57 OLL cases and the
+        solved one.
+        """
+        cases = orientation_cases()
+        self.assertEqual(len(cases), 216)
+        self.assertEqual(cases[ORIENTED_KEY], list(SOLVED_CODES))
+        for key, codes in cases.items():
+            self.assertEqual(orientation_key(last_layer_key(codes)), key)
+        self.assertEqual(len({oll_case(codes) for codes in cases.values()}), 58)
+
+    def test_search_case(self):
+        """
+        Validates that a shallow search finds a shortest sequence, and gives
+        up on cases deeper than its bounds.
+        """
+        backward = BackwardSearch(3)
+        codes = case_codes("F R U R' U' F'")
+        key = orientation_key(last_layer_key(codes))
+        moves = search_case(codes, backward, 3)
+        self.assertEqual(len(moves), 6)
+        check_sequence(key, held_sequence(moves))
+        self.assertIsNone(search_case(codes, backward, 2))
+        self.assertEqual(search_case(SOLVED_CODES, backward, 0), [])
+
+    def test_table(self):
+        """
+        Validates that the stored table holds every orientation, and that
+        every sequence orients its case and keeps F2L.
+        """
+        table = ALGORITHMS["oll_table"]
+        self.assertEqual(set(table), set(orientation_cases()))
+        self.assertEqual(table[ORIENTED_KEY], "")
+        for key, sequence in table.items():
+            check_sequence(key, sequence)
+            self.assertLessEqual(len(sequence.split()), 12)
+        with self.assertRaises(ValueError):
+            check_sequence(ORIENTED_KEY, "R U R' U'")
+
+
+if __name__ == "__main__":
+    unittest.main()
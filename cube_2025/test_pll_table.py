@@ -0,0 +1,63 @@
+"""
+Unit tests for the PLL table generator
+"""
+
+import contextlib
+import io
+import os
+import tempfile
+import unittest
+from algorithms import ALGORITHMS
+from cube import Cube
+from last_layer import YELLOW_UP
+from pll_table import candidates, generate_table, inverse_sequence, write_table
+from solver import Solver
+
+
+class TestPLLTable(unittest.TestCase):
+    """
+    Unit test cases for the PLL table generator.
+    """
+
+    def test_inverse_sequence(self):
+        """
+        Validates that a sequence followed by its inverse does nothing.
+        """
+        cube = Cube()
+        cube.sequence("R U2 x' M F' d")
+        cube.sequence(inverse_sequence("R U2 x' M F' d"))
+        self.assertTrue(cube.is_solved())
+
+    def test_generate_table(self):
+        """
+        Validates that the generated table is the stored one, and that the
+        solver solves every PLL case with it.
+        """
+        table = generate_table(workers=2)
+        self.assertEqual(table, ALGORITHMS["pll"])
+        solved = 0
+        for sequence in candidates():
+            cube = Cube()
+            cube.sequence(f"{YELLOW_UP} {inverse_sequence(sequence)}")
+            solver = Solver(cube)
+            if not solver._f2l_is_solved():  # pylint: disable=protected-access
+                continue
+            with contextlib.redirect_stdout(io.StringIO()):
+                solver.pll_iterative()
+            self.assertTrue(solver._pll_is_solved())  # pylint: disable=protected-access
+            solved += 1
+        # 288 last layer permutations, counting every AUF
+        self.assertGreaterEqual(solved, 288)
+
+    def test_write_table(self):
+        """
+        Validates that the table is written in one step.
+        """
+        with tempfile.TemporaryDirectory() as directory:
+            path = os.path.join(directory, "pll.json")
+            write_table({"FFFRRRBBBLLL": ""}, path)
+            self.assertEqual(os.listdir(directory), ["pll.json"])
+
+
+if __name__ == "__main__":
+    unittest.main()
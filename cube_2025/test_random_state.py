@@ -0,0 +1,96 @@
+"""
+Unit tests for uniform random cube states
+"""
+
+import unittest
+import numpy as np
+from array_cube import ArrayCube
+from coordinates import check_solvable
+from random_state import (
+    pack_pieces,
+    pieces_codes,
+    random_batch,
+    random_cube,
+    random_pieces,
+    random_states,
+)
+from solver import Solver
+from state_encoding import encode_codes
+
+COUNT = 20000
+
+
+class TestRandomState(unittest.TestCase):
+    """
+    Unit test cases for uniform random cube states.
+    """
+
+    def test_solvable(self):
+        """
+        Validates that every state can be solved, and that the codes and
+        packed integers describe the same states.
+        """
+        pieces = random_pieces(500, rng=1)
+        codes = pieces_codes(*pieces)
+        self.assertEqual(codes.shape, (500, 26))
+        for row, value in zip(codes.tolist(), pack_pieces(*pieces)):
+            check_solvable(row)
+            self.assertEqual(encode_codes(row), value)
+
+    def test_uniform(self):
+        """
+        Validates that pieces, orientations and parities are spread evenly.
+        """
+        corners, twists, edges, flips = random_pieces(COUNT, rng=2)
+        # the last slots are the ones the constraints fix
+        for counts, expected in (
+            (np.bincount(corners[:, 0], minlength=8), COUNT / 8),
+            (np.bincount(edges[:, -1], minlength=12), COUNT / 12),
+            (np.bincount(twists[:, -1], minlength=3), COUNT / 3),
+            (np.bincount(flips[:, -1], minlength=2), COUNT / 2),
+        ):
+            # over 6 standard deviations off would be a bias, not bad luck
+            self.assertLess(np.abs(counts - expected).max(), 6 * expected**0.5)
+        even = sum(_parity(row) == 0 for row in corners[:1000].tolist())
+        self.assertLess(abs(even - 500), 6 * 250**0.5)
+
+    def test_reproducible(self):
+        """
+        Validates that a seed always gives the same states.
+        """
+        self.assertEqual(random_states(50, rng=3), random_states(50, rng=3))
+        self.assertEqual(len(set(random_states(1000, rng=4))), 1000)
+
+    def test_cubes(self):
+        """
+        Validates that cubes, batches and packed integers agree, and that
+        the solver solves a random state.
+        """
+        states = random_states(5, rng=5)
+        self.assertEqual(
+            random_batch(5, rng=5).to_strings(),
+            [str(ArrayCube.from_int(value)) for value in states],
+        )
+        cube = random_cube(rng=6)
+        self.assertEqual(str(cube), str(ArrayCube.from_int(random_states(1, 6)[0])))
+        solver = Solver(cube)
+        solution = solver.solve()
+        solver.orient_cube()
+        self.assertTrue(solver.cube.is_solved())
+        self.assertGreater(solution["quarter_turns"] + solution["half_turns"], 0)
+
+
+def _parity(pieces):
+    """
+    Parity of a permutation, 0 for even.
+    """
+    return sum(
+        1
+        for index, piece in enumerate(pieces)
+        for later in pieces[index + 1 :]
+        if later < piece
+    ) % 2
+
+
+if __name__ == "__main__":
+    unittest.main()
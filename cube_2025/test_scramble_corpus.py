@@ -0,0 +1,105 @@
+"""
+Unit tests for the seeded scramble corpus
+"""
+
+import os
+import tempfile
+import unittest
+from cube import FACES, Cube
+from scramble_corpus import (
+    ScrambleCorpus,
+    generate_corpus,
+    scramble_moves,
+    write_corpus,
+)
+from solver_benchmark import run_benchmark
+
+
+class TestScrambleCorpus(unittest.TestCase):
+    """
+    Unit test cases for the seeded scramble corpus.
+    """
+
+    def setUp(self):
+        self.directory = tempfile.TemporaryDirectory()
+        self.path = os.path.join(self.directory.name, "corpus.bin")
+
+    def tearDown(self):
+        self.directory.cleanup()
+
+    def test_reproducible(self):
+        """
+        Validates that a seed always gives the same scrambles.
+        """
+        self.assertEqual(list(scramble_moves(5, 7)), list(scramble_moves(5, 7)))
+        self.assertNotEqual(list(scramble_moves(5, 7)), list(scramble_moves(5, 8)))
+        self.assertEqual(
+            [len(move_ids) for move_ids in scramble_moves(3, moves=25)], [25] * 3
+        )
+
+    def test_no_redundant_moves(self):
+        """
+        Validates that no face follows itself and that opposite faces come
+        in one order.
+        """
+        for sequence, _ in generate_corpus(200, seed=1):
+            faces = [FACES.index(move[0]) for move in sequence.split()]
+            for previous, face in zip(faces, faces[1:]):
+                self.assertNotEqual(previous, face)
+                self.assertFalse(previous // 2 == face // 2 and face < previous)
+
+    def test_states(self):
+        """
+        Validates the packed states against a cube turned by the sequence.
+        """
+        for sequence, state in generate_corpus(20, seed=2):
+            cube = Cube()
+            cube.sequence(sequence)
+            self.assertEqual(state, cube.to_bytes())
+            self.assertEqual(str(ScrambleCorpus.cube(state)), str(cube))
+
+    def test_file(self):
+        """
+        Validates that a corpus file reads back in order and by index.
+        """
+        write_corpus(self.path, 30, seed=4, moves=12)
+        self.assertEqual(os.listdir(self.directory.name), ["corpus.bin"])
+        corpus = ScrambleCorpus(self.path)
+        self.assertEqual((len(corpus), corpus.seed, corpus.moves), (30, 4, 12))
+        entries = list(corpus)
+        self.assertEqual(entries, list(generate_corpus(30, seed=4, moves=12)))
+        self.assertEqual(corpus[3], entries[3])
+        self.assertEqual(corpus[-1], entries[-1])
+        self.assertEqual(
+            list(corpus.sequences(2)), [sequence for sequence, _ in entries[:2]]
+        )
+        with self.assertRaises(IndexError):
+            corpus[30]  # pylint: disable=pointless-statement
+
+    def test_invalid_files(self):
+        """
+        Validates that files that are not whole corpora are rejected.
+        """
+        write_corpus(self.path, 3)
+        with open(self.path, "rb") as file:
+            data = file.read()
+        for content in (b"R U R' U'\n", data[:-1]):
+            with open(self.path, "wb") as file:
+                file.write(content)
+            with self.assertRaises(ValueError):
+                ScrambleCorpus(self.path)
+
+    def test_benchmark_replay(self):
+        """
+        Validates that the solver benchmark replays a corpus file.
+        """
+        write_corpus(self.path, 10, seed=6, moves=15)
+        report = run_benchmark(count=4, workers=1, corpus_path=self.path)
+        self.assertEqual(
+            report["corpus"], {"count": 4, "seed": 6, "moves": 15, "path": self.path}
+        )
+        self.assertEqual(report["success_rate"], 1.0)
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,89 @@
+"""
+Unit tests for the sequence simplifier
+"""
+
+import json
+import unittest
+from cube import compile_sequence
+from simplify import simplify_moves, simplify_sequence
+from test_array_cube import random_sequence
+
+
+def stored_sequences(data):
+    """
+    Yield every sequence string in a nested sequence data file.
+    """
+    if isinstance(data, dict):
+        for value in data.values():
+            yield from stored_sequences(value)
+    elif isinstance(data, str):
+        yield data
+
+
+def same_effect(first, second):
+    """
+    Check whether two sequences compile to the same move table.
+    """
+    first = compile_sequence(first)
+    second = compile_sequence(second)
+    return first.source == second.source and first.twist == second.twist
+
+
+class TestSimplify(unittest.TestCase):
+    """
+    Unit test cases for simplify_sequence.
+    """
+
+    def test_cancel_and_merge(self):
+        """
+        Validates cancelling, merging and commuting opposite faces.
+        """
+        self.assertEqual(simplify_sequence("R R'"), "")
+        self.assertEqual(simplify_sequence("U U"), "U2")
+        self.assertEqual(simplify_sequence("U,U,U"), "U'")
+        self.assertEqual(simplify_sequence("U D U"), "U2 D")
+        self.assertEqual(simplify_sequence("R U U' R'"), "")
+        self.assertEqual(simplify_sequence("r r r r"), "")
+        self.assertEqual(simplify_sequence("u U'"), "E")
+
+    def test_rotations(self):
+        """
+        Validates that rotations are pushed to the end.
+        """
+        self.assertEqual(simplify_sequence("x x'"), "")
+        self.assertEqual(simplify_sequence("Y Y Y Y R"), "R")
+        moves = simplify_moves("Y R Y'")
+        self.assertEqual(len(moves), 1)
+        self.assertTrue(same_effect("Y R Y'", moves[0]))
+        self.assertEqual(simplify_moves("Y R Y'", keep_rotation=False), moves)
+        self.assertEqual(simplify_moves("Y R", keep_rotation=False), moves)
+
+    def test_same_effect(self):
+        """
+        Validates that random sequences keep their effect and never grow.
+        """
+        for _ in range(200):
+            sequence = random_sequence()
+            simplified = simplify_sequence(sequence)
+            self.assertTrue(same_effect(sequence, simplified), sequence)
+            self.assertLessEqual(len(simplified.split()), len(sequence.split()))
+            self.assertEqual(simplify_sequence(simplified), simplified)
+
+    def test_stored_sequences(self):
+        """
+        Validates the simplifier on every stored algorithm.
+        """
+        for path in (
+            "f2l_sequence_data.json",
+            "oll_sequence_data.json",
+            "pll_sequence_data.json",
+        ):
+            with open(path, "r", encoding="utf-8") as file:
+                data = json.load(file)
+            for sequence in stored_sequences(data):
+                simplified = simplify_sequence(sequence)
+                self.assertTrue(same_effect(sequence, simplified), sequence)
+
+
+if __name__ == "__main__":
+    unittest.main()
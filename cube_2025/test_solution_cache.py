@@ -0,0 +1,103 @@
+"""
+Unit tests for the solution cache
+"""
+
+import os
+import tempfile
+import unittest
+from cube import Cube
+from solution_cache import SolutionCache
+from solver import Solver
+from symmetry import SYMMETRIES, apply_symmetry
+
+ITERATIONS = 3
+# the mirrored symmetries swap the L and R colors
+MIRROR_COLORS = str.maketrans("GB", "BG")
+# colors of a cube turned a quarter about the L R axis
+TURNED_COLORS = str.maketrans("WRYO", "RYOW")
+
+
+def _solved_faces(cube):
+    """
+    Whether every face of a cube has a single color.
+    """
+    state = str(cube)
+    face_size = cube.size**2
+    return all(
+        len(set(state[start : start + face_size])) == 1
+        for start in range(0, len(state), face_size)
+    )
+
+
+class TestSolutionCache(unittest.TestCase):
+    """
+    Unit test cases for the solution cache.
+    """
+
+    def test_symmetric_hits(self):
+        """
+        Validates that states symmetric to a solved one, recolored or not,
+        hit the cache and their mapped solutions solve them.
+        """
+        cache = SolutionCache()
+        for _ in range(ITERATIONS):
+            cube = Cube()
+            cube.scramble()
+            state = str(cube)
+            solution = Solver(cube, cache).solve()
+            self.assertTrue(_solved_faces(cube))
+            for symmetry in range(len(SYMMETRIES)):
+                moved = apply_symmetry(state, symmetry)
+                if symmetry >= len(SYMMETRIES) // 2:
+                    moved = moved.translate(MIRROR_COLORS)
+                moved = moved.translate(TURNED_COLORS)
+                cube = Cube(state=moved)
+                hit = Solver(cube, cache).solve(dry_run=True)
+                self.assertEqual(str(cube), moved)
+                self.assertEqual(hit["quarter_turns"], solution["quarter_turns"])
+                cube.sequence(hit["moves"])
+                self.assertTrue(_solved_faces(cube))
+        self.assertEqual(cache.misses, ITERATIONS)
+        self.assertEqual(cache.hits, ITERATIONS * len(SYMMETRIES))
+
+    def test_lru(self):
+        """
+        Validates that the least recently used solution is dropped.
+        """
+        cache = SolutionCache(maxsize=2)
+        cubes = []
+        for sequence in ("R", "U F", "L2 D"):
+            cube = Cube()
+            cube.sequence(sequence)
+            cubes.append(cube)
+        for cube in cubes[:2]:
+            Solver(cube.copy(), cache).solve()
+        self.assertIsNotNone(cache.get(cache.key(cubes[0])))
+        Solver(cubes[2].copy(), cache).solve()
+        self.assertEqual(len(cache), 2)
+        self.assertIsNone(cache.get(cache.key(cubes[1])))
+        self.assertIsNotNone(cache.get(cache.key(cubes[0])))
+        self.assertEqual(cache.stats(), {"hits": 2, "misses": 4, "size": 2})
+        with self.assertRaises(ValueError):
+            SolutionCache(maxsize=0)
+
+    def test_persistence(self):
+        """
+        Validates that solutions kept in a sqlite file survive a restart.
+        """
+        cube = Cube()
+        cube.scramble()
+        with tempfile.TemporaryDirectory() as directory:
+            path = os.path.join(directory, "solutions.sqlite")
+            cache = SolutionCache(path=path)
+            solution = Solver(cube.copy(), cache).solve()
+            cache.close()
+            cache = SolutionCache(path=path)
+            self.assertEqual(len(cache), 0)
+            self.assertEqual(cache.get(cache.key(cube)), solution)
+            self.assertEqual(len(cache), 1)
+            cache.close()
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,179 @@
+"""
+Unit tests for the solve service
+"""
+
+import asyncio
+import json
+import os
+import tempfile
+import unittest
+from concurrent.futures.process import BrokenProcessPool
+from unittest.mock import patch
+from cube import Cube
+from solve_server import (
+    LINE_LIMIT,
+    SolveServer,
+    load_test,
+    scrambled_states,
+    solve_batch,
+)
+from solver import Solver
+
+
+class TestSolveServer(unittest.IsolatedAsyncioTestCase):
+    """
+    Unit test cases for the solve service.
+    """
+
+    async def asyncSetUp(self):
+        """
+        Start a server with two workers on a Unix socket.
+        """
+        self.directory = tempfile.TemporaryDirectory()
+        self.path = os.path.join(self.directory.name, "solve.sock")
+        self.server = SolveServer(workers=2, batch_size=4, queue_size=2)
+        await self.server.start(path=self.path)
+
+    async def asyncTearDown(self):
+        await self.server.close()
+        self.directory.cleanup()
+
+    async def test_requests(self):
+        """
+        Validates that every request is answered with a solution of its
+        state, and that bad requests get errors without closing the
+        connection.
+        """
+        states = scrambled_states(10)
+        reader, writer = await asyncio.open_unix_connection(self.path)
+        lines = [
+            json.dumps({"id": index, "state": state})
+            for index, state in enumerate(states)
+        ]
+        mirrored = _swap(states[0], "G", "B")
+        lines += ["not json", json.dumps({"id": "short", "state": "WWW"})]
+        lines.append(json.dumps({"id": "mirrored", "state": mirrored}))
+        writer.write("\n".join(lines).encode() + b"\n")
+        await writer.drain()
+        responses = [json.loads(await reader.readline()) for _ in lines]
+        writer.close()
+        await writer.wait_closed()
+        errors = [response for response in responses if "error" in response]
+        self.assertEqual(len(errors), 3)
+        self.assertEqual(
+            {response.get("id") for response in errors}, {None, "short", "mirrored"}
+        )
+        solved = {
+            response["id"]: response for response in responses if "solution" in response
+        }
+        self.assertEqual(set(solved), set(range(len(states))))
+        for index, state in enumerate(states):
+            self.assertGreater(solved[index]["latency_ms"], 0)
+            solver = Solver(Cube(state=state))
+            solver.cube.sequence(solved[index]["solution"]["moves"])
+            solver.orient_cube()
+            self.assertTrue(solver.cube.is_solved())
+
+    async def test_oversized_request(self):
+        """
+        Validates that a line over the limit is answered with an error after
+        the requests before it, and ends the connection.
+        """
+        reader, writer = await asyncio.open_unix_connection(self.path)
+        state = scrambled_states(1)[0]
+        writer.write(json.dumps({"id": 1, "state": state}).encode() + b"\n")
+        writer.write(b"x" * (LINE_LIMIT + 10) + b"\n")
+        await writer.drain()
+        responses = [json.loads(line) for line in await _read_all(reader)]
+        writer.close()
+        await writer.wait_closed()
+        errors = [response for response in responses if "error" in response]
+        self.assertEqual(len(responses), 2)
+        self.assertEqual(len(errors), 1)
+        self.assertIn("longer than", errors[0]["error"])
+        self.assertIn(1, [response.get("id") for response in responses])
+
+    async def test_worker_died(self):
+        """
+        Validates that the pool is started again after a worker dies, the
+        requests it had failing on their own.
+        """
+        broken = self.server.executor
+        with self.assertRaises(BrokenProcessPool):
+            await asyncio.wrap_future(broken.submit(os._exit, 1))
+        reader, writer = await asyncio.open_unix_connection(self.path)
+        state = scrambled_states(1)[0]
+        responses = []
+        # the first request finds the broken pool, the next the new one
+        with self.assertLogs("solve_server", "ERROR"):
+            for index in range(2):
+                request = {"id": index, "state": state}
+                writer.write(json.dumps(request).encode() + b"\n")
+                await writer.drain()
+                responses.append(json.loads(await reader.readline()))
+        writer.close()
+        await writer.wait_closed()
+        self.assertIn("worker died", responses[0]["error"])
+        self.assertIn("solution", responses[1])
+        self.assertIsNot(self.server.executor, broken)
+
+    async def test_load_test(self):
+        """
+        Validates that the load generator gets every answer over several
+        connections, with more requests than the queue holds.
+        """
+        results = await load_test(requests=12, connections=3, path=self.path)
+        self.assertEqual(results["requests"], 12)
+        self.assertEqual(results["errors"], 0)
+        self.assertLessEqual(results["p50_ms"], results["p99_ms"])
+        self.assertLessEqual(results["p99_ms"], results["max_ms"])
+        self.assertGreater(results["throughput"], 0)
+
+
+class TestSolveBatch(unittest.TestCase):
+    """
+    Unit test cases for the worker side of the solve service.
+    """
+
+    def test_solve_batch(self):
+        """
+        Validates that a batch answers every state in order.
+        """
+        state = scrambled_states(1, seed=1)[0]
+        results = solve_batch([state, "X" * 54, str(Cube())])
+        self.assertIn("solution", results[0])
+        self.assertIn("error", results[1])
+        solution = results[2]["solution"]
+        self.assertEqual(solution["quarter_turns"] + solution["half_turns"], 0)
+
+    def test_solver_error(self):
+        """
+        Validates that a state the solver fails on only fails itself.
+        """
+        failing = [RuntimeError("no pll case"), {"moves": ""}]
+        with patch("solve_server.solve_state", side_effect=failing):
+            with self.assertLogs("solve_server", "ERROR"):
+                results = solve_batch(["first", "second"])
+        self.assertEqual(results[0], {"error": "RuntimeError: no pll case"})
+        self.assertEqual(results[1], {"solution": {"moves": ""}})
+
+
+async def _read_all(reader):
+    """
+    Lines read until the server closes the connection.
+    """
+    lines = []
+    while line := await reader.readline():
+        lines.append(line)
+    return lines
+
+
+def _swap(state, first, second):
+    """
+    State string with two colors swapped, a mirror image no move can solve.
+    """
+    return state.translate(str.maketrans(first + second, second + first))
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -165,6 +165,35 @@ class TestSolver(unittest.TestCase):
             # check if our _check method works, not really necessary, but just to be sure
             self.assertTrue(solver._pll_is_solved())
 
+    def test_solve_recording(self):
+        """
+        Test that solve() returns a solution that replays on the scramble,
+        and that a dry run leaves the cube alone.
+        """
+        solver = Solver()
+        for _ in range(20):
+            solver.cube.reset()
+            solver.cube.scramble()
+            scramble_state = str(solver.cube)
+            dry = solver.solve(dry_run=True)
+            self.assertEqual(str(solver.cube), scramble_state)
+            solution = solver.solve()
+            self.assertEqual(solution, dry)
+            solved_state = str(solver.cube)
+            self.assertEqual(list(solution["phases"]), ["cross", "f2l", "oll", "pll"])
+            moves = solution["moves"].split()
+            turns = [move for move in moves if move[0] not in "XYZ"]
+            self.assertEqual(
+                len(turns), solution["quarter_turns"] + solution["half_turns"]
+            )
+            # the solution replays to the same cube, and so do the phases
+            for moves in (solution["moves"], " ".join(solution["phases"].values())):
+                solver.cube.load(scramble_state)
+                solver.cube.sequence(moves)
+                self.assertEqual(str(solver.cube), solved_state)
+            solver.orient_cube()
+            self.assertTrue(check_mask(solver.cube, cube_states["solved"]))
+
 
 if __name__ == "__main__":
     unittest.main()
@@ -0,0 +1,98 @@
+"""
+Unit tests for the solver benchmark harness
+"""
+
+import json
+import os
+import tempfile
+import unittest
+from unittest.mock import patch
+from benchmark import percentile
+from solver_benchmark import (
+    SOLVERS,
+    TurnCounter,
+    legacy_module,
+    run_benchmark,
+    solve_chunk,
+    summarize,
+    write_report,
+)
+
+
+class TestSolverBenchmark(unittest.TestCase):
+    """
+    Unit test cases for the solver benchmark harness.
+    """
+
+    def test_run_benchmark(self):
+        """
+        Validates the report of every solver on a small corpus.
+        """
+        for solver in SOLVERS:
+            report = run_benchmark(solver, count=6, seed=3, workers=2)
+            self.assertEqual(report["solver"], solver)
+            self.assertEqual(report["corpus"], {"count": 6, "seed": 3, "moves": 20})
+            self.assertEqual(report["solves"], 6)
+            self.assertEqual(report["success_rate"], 1.0)
+            self.assertGreater(report["solves_per_second"], 0)
+            self.assertEqual(sum(report["moves"]["histogram"].values()), 6)
+            latency = report["latency_ms"]
+            self.assertIn("total", latency)
+            self.assertGreater(len(latency), 1)
+            for stats in latency.values():
+                self.assertLessEqual(stats["p50"], stats["p95"])
+                self.assertLessEqual(stats["p95"], stats["p99"])
+            # the report is plain json
+            self.assertEqual(json.loads(json.dumps(report)), report)
+
+    def test_failures(self):
+        """
+        Validates that a solve that raises is counted as a failure.
+        """
+        results = solve_chunk("solver", ["R U", "R Q"])
+        self.assertTrue(results[0]["ok"])
+        self.assertFalse(results[1]["ok"])
+        report = summarize(results)
+        self.assertEqual(report["success_rate"], 0.5)
+        self.assertEqual(sum(report["failures"].values()), 1)
+        self.assertEqual(summarize(results[1:])["moves"], {})
+        # any other exception is a bug, raised with the scramble it hit
+        broken = {"broken": lambda scramble: None + scramble}
+        with patch.dict(SOLVERS, broken), self.assertRaises(TypeError) as raised:
+            solve_chunk("broken", ["R U"])
+        self.assertEqual(raised.exception.__notes__, ["broken solving 'R U'"])
+
+    def test_turn_counter(self):
+        """
+        Validates that whole cube rotations of a legacy cube are not counted.
+        """
+        for name in ("cube", "cube2"):
+            cube = legacy_module(name).Cube()
+            counter = TurnCounter(cube)
+            cube.rotate("R")
+            cube.rotate_cube()
+            cube.tilt_cube(clockwise=False)
+            cube.rotate("U", clockwise=False)
+            self.assertEqual(counter.turns, 2)
+
+    def test_percentile(self):
+        """
+        Validates nearest rank percentiles.
+        """
+        values = list(range(1, 101))
+        self.assertEqual(percentile(values, 50), 50)
+        self.assertEqual(percentile(values, 99), 99)
+        self.assertEqual(percentile([3.0], 99), 3.0)
+
+    def test_write_report(self):
+        """
+        Validates that the report is written in one step.
+        """
+        with tempfile.TemporaryDirectory() as directory:
+            path = os.path.join(directory, "report.json")
+            write_report({"solver": "solver"}, path)
+            self.assertEqual(os.listdir(directory), ["report.json"])
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,151 @@
+"""
+Unit tests for cube symmetries
+"""
+
+import unittest
+from cube import FACE_COLORS, SOLVED_CODES, Cube
+from solver import Solver
+from state_encoding import decode_codes, encode_codes
+from symmetry import (
+    FACE_MAPS,
+    RECOLORINGS,
+    SYMMETRIES,
+    SYMMETRY_INVERSES,
+    apply_symmetry,
+    canonical_codes,
+    canonicalize,
+    conjugate_codes,
+    map_sequence,
+)
+
+ITERATIONS = 5
+
+
+def _recolor(state, symmetry):
+    """
+    Recolor a state string so every color follows its face through a symmetry.
+    """
+    colors = {
+        FACE_COLORS[face]: FACE_COLORS[FACE_MAPS[symmetry][face]]
+        for face in FACE_COLORS
+    }
+    return "".join(colors[color] for color in state)
+
+
+class TestSymmetry(unittest.TestCase):
+    """
+    Unit test cases for cube symmetries.
+    """
+
+    def test_group(self):
+        """
+        Validates that there are 48 distinct symmetries with inverses.
+        """
+        self.assertEqual(len(set(SYMMETRIES)), 48)
+        for symmetry, inverse in enumerate(SYMMETRY_INVERSES):
+            self.assertEqual(SYMMETRY_INVERSES[inverse], symmetry)
+            self.assertTrue(
+                all(
+                    SYMMETRIES[inverse][SYMMETRIES[symmetry][sticker]] == sticker
+                    for sticker in range(54)
+                )
+            )
+
+    def test_map_sequence(self):
+        """
+        Validates that a move on a moved state matches the mapped move on
+        the state.
+        """
+        cube = Cube()
+        cube.scramble()
+        state = str(cube)
+        for symmetry in range(len(SYMMETRIES)):
+            moved = Cube(state=_recolor(apply_symmetry(state, symmetry), symmetry))
+            for sequence in ("R U' M2", "x f S'", "b' E y2"):
+                turned = moved.copy()
+                turned.sequence(sequence)
+                mapped = cube.copy()
+                mapped.sequence(map_sequence(sequence, symmetry))
+                self.assertEqual(
+                    str(turned),
+                    _recolor(apply_symmetry(str(mapped), symmetry), symmetry),
+                )
+
+    def test_conjugate_codes(self):
+        """
+        Validates that conjugated slot codes match the moved and recolored
+        stickers.
+        """
+        cube = Cube()
+        cube.scramble()
+        codes = cube.slot_codes()
+        for symmetry in range(len(SYMMETRIES)):
+            conjugated = Cube()
+            conjugated.load_codes(conjugate_codes(codes, symmetry))
+            self.assertEqual(
+                str(conjugated),
+                _recolor(apply_symmetry(str(cube), symmetry), symmetry),
+            )
+        # a 2x2 only has corners, which conjugate the same way
+        small = Cube(size=2)
+        small.scramble()
+        codes = small.slot_codes()
+        encoding = canonicalize(small)[0]
+        for symmetry in range(len(SYMMETRIES)):
+            conjugated = conjugate_codes(codes, symmetry)
+            self.assertEqual(canonical_codes(conjugated, size=2)[0], encoding)
+        self.assertEqual(conjugate_codes(SOLVED_CODES, 30), list(SOLVED_CODES))
+
+    def test_canonicalize(self):
+        """
+        Validates that symmetric states share a representative and that its
+        solution solves the cube once mapped back.
+        """
+        for _ in range(ITERATIONS):
+            cube = Cube()
+            cube.scramble()
+            codes = cube.slot_codes()
+            encoding, symmetry, recoloring = canonicalize(cube)
+            self.assertEqual(recoloring, 0)
+            self.assertEqual(
+                encoding, encode_codes(conjugate_codes(codes, symmetry))
+            )
+            recolored = canonicalize(cube, colors=True)
+            self.assertLessEqual(recolored[0], encoding)
+            for other in (7, 29, 47):
+                conjugated = conjugate_codes(codes, other)
+                self.assertEqual(canonical_codes(conjugated)[0], encoding)
+                conjugated = conjugate_codes(codes, other, other % 24)
+                self.assertEqual(
+                    canonical_codes(conjugated, colors=True)[0], recolored[0]
+                )
+            for value, symmetry, _ in (canonicalize(cube), recolored):
+                representative = Cube()
+                representative.load_codes(decode_codes(value))
+                solution = Solver(representative).solve()["moves"]
+                solved = cube.copy()
+                solved.sequence(map_sequence(solution, symmetry))
+                Solver(solved).orient_cube()
+                self.assertTrue(solved.is_solved())
+
+    def test_color_canonicalize(self):
+        """
+        Validates that trying only the recoloring that brings the centers home
+        finds the smallest value over every symmetry and color scheme.
+        """
+        for axis in "XYZ":
+            cube = Cube()
+            cube.scramble()
+            cube.rotate_cube(axis=axis)
+            codes = cube.slot_codes()
+            smallest = min(
+                encode_codes(conjugate_codes(codes, symmetry, recoloring))
+                for symmetry in range(len(SYMMETRIES))
+                for recoloring in range(len(RECOLORINGS))
+            )
+            self.assertEqual(canonical_codes(codes, colors=True)[0], smallest)
+
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,56 @@
+"""
+Unit tests for the optimal white cross table
+"""
+
+import unittest
+from cube import Cube
+from array_cube import ArrayCube
+from solver import Solver
+from white_cross import cross_distance, cross_table, optimal_cross
+
+ITERATIONS = 50
+
+
+class TestWhiteCross(unittest.TestCase):
+    """
+    Unit test cases for the white cross table.
+    """
+
+    def test_table(self):
+        """
+        Validates the size and depth of the table.
+        """
+        _, _, depths = cross_table()
+        self.assertEqual(len(depths), 190080)
+        self.assertEqual(max(depths), 8)
+        self.assertEqual(depths.count(0), 1)
+
+    def test_optimal_cross(self):
+        """
+        Validates that the moves solve the cross in exactly the table distance.
+        """
+        for cube_class in (Cube, ArrayCube):
+            for _ in range(ITERATIONS):
+                cube = cube_class()
+                cube.scramble()
+                moves = optimal_cross(cube)
+                self.assertEqual(len(moves), cross_distance(cube))
+                self.assertLessEqual(len(moves), 8)
+                cube.sequence(" ".join(moves))
+                self.assertEqual(cross_distance(cube), 0)
+                self.assertTrue(Solver(cube)._check_white_cross())  # pylint: disable=protected-access
+
+    def test_rotated(self):
+        """
+        Validates that rotated cubes are turned back first.
+        """
+        cube = Cube()
+        cube.sequence("x R U F")
+        moves = optimal_cross(cube)
+        self.assertEqual(moves[0], "X'")
+        cube.sequence(" ".join(moves))
+        self.assertEqual(cross_distance(cube), 0)
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -1,73 +1,93 @@
-from heapq import heappush, heappop
-import json
-from time import time
-from cube import Cube
-from visualize import print_color_cube
-from solver import Solver
+"""
+Optimal white cross.
+The distance table holds the fewest face turns that solve the white cross
+(the UF, UR, UB and UL edges) for every position and flip of those four edges,
+12 * 11 * 10 * 9 * 2^4 = 190080 entries.
+It is built once per process with a breadth first search over the edge
+coordinate, and optimal_cross() walks it down to 0 one move at a time.
+Run this module to build the table and print how many states are at each depth.
+"""
 
+from functools import lru_cache
+from time import perf_counter
+from coordinates import (
+    FACE_MOVES,
+    breadth_first_depths,
+    edge_coordinates,
+    edge_moves,
+    int_array,
+    oriented_codes,
+)
+from cube import SOLVED_CODES
 
-def mask_cube(cube):
+# the white edges, as indexes into EDGES
+CROSS_EDGES = (0, 1, 2, 3)
+FLIP_COUNT = 2 ** len(CROSS_EDGES)
+MOVE_COUNT = len(FACE_MOVES)
+
+
+@lru_cache(maxsize=None)
+def cross_table():
+    """
+    Build the cross distance table.
+    Returns (positions, flips, depths): the edge coordinate move tables
+    as flat arrays and the distance of every coordinate as bytes.
+    """
+    positions, flips = edge_moves(CROSS_EDGES)
+    position, flip = edge_coordinates(SOLVED_CODES, CROSS_EDGES)
+
+    def children(states, move):
+        position, flip = divmod(states, FLIP_COUNT)
+        return positions[position, move] * FLIP_COUNT + (flip ^ flips[position, move])
+
+    depths = breadth_first_depths(
+        len(positions) * FLIP_COUNT, children, position * FLIP_COUNT + flip
+    )
+    return int_array(positions), int_array(flips), depths.tobytes()
+
+
+def cross_distance(cube):
     """
-    Mask the cube to show only the top face.
+    Fewest face turns that solve the white cross on the up face,
+    once the centers are home.
     """
-    for cubie in cube:
-        if len(cubie.color) == 1:
-            continue
-        if len(cubie.color) == 2 and "W" in cubie.color:
-            continue
-        cubie.color = tuple(["Y" for color in cubie.color])
+    _, _, depths = cross_table()
+    position, flip = edge_coordinates(oriented_codes(cube)[0], CROSS_EDGES)
+    return depths[position * FLIP_COUNT + flip]
 
 
-# already_seen is a dictionary to keep track of already seen cube states
-# and the number of moves to reach them, only update if the new instance
-# of the state is reached in fewer moves
+def optimal_cross(cube):
+    """
+    Get a shortest list of moves that solves the white cross on the up face.
+    Whole cube rotations that put the centers home come first.
+    """
+    positions, flips, depths = cross_table()
+    codes, moves = oriented_codes(cube)
+    position, flip = edge_coordinates(codes, CROSS_EDGES)
+    depth = depths[position * FLIP_COUNT + flip]
+    while depth:
+        for move in range(MOVE_COUNT):
+            index = position * MOVE_COUNT + move
+            child_position = positions[index]
+            child_flip = flip ^ flips[index]
+            if depths[child_position * FLIP_COUNT + child_flip] < depth:
+                break
+        moves.append(FACE_MOVES[move])
+        position, flip = child_position, child_flip
+        depth -= 1
+    return moves
 
 
-def run_cube_states(state_string, move_limit=2):
+def main():
     """
-    breadth first search function to run through all possible cube states
+    Build the table and print its depth distribution.
     """
-    already_seen = {}
-    heap = []
-    heappush(heap, (0, state_string, "X", True, ()))
-    while heap:
-        moves, state_string, face, clockwise, history = heappop(heap)
-        if len(heap) % 1000 == 0:
-            print(
-                f"heap: {len(heap)}, moves: {moves}, move_limit: {move_limit}, saved: {len(already_seen)}, state_string: {state_string}"
-            )
-        if state_string in already_seen and already_seen[state_string]["moves"] < moves:
-            continue
-        already_seen[state_string] = {"moves": moves, "history": history}
-        if moves >= move_limit:
-            continue
-        if face == "X":
-            # run each move clockwise and counter clockwise
-            for move in ["U", "D", "L", "R", "F", "B"]:
-                heappush(heap, (moves, state_string, move, True, history))
-                heappush(heap, (moves, state_string, move, False, history))
-            continue
-        cube = Cube(state=state_string)
-        if face in ["U", "D", "L", "R", "F", "B"]:
-            # rotate the face
-            cube.rotate_face(face, clockwise)
-        elif face in ["M", "E", "S"]:
-            # rotate the slice
-            cube.rotate_slice(face, clockwise)
-        else:
-            print(f"How did we get here? {face}")
-            continue
-        # push new state to heap
-        heappush(
-            heap, (moves + 1, str(cube), "X", True, history + ((face, clockwise),))
-        )
-    return already_seen
+    start = perf_counter()
+    _, _, depths = cross_table()
+    print(f"built {len(depths)} entries in {perf_counter() - start:.2f} seconds")
+    for depth in range(max(depths) + 1):
+        print(f"  {depth} moves: {depths.count(depth)}")
 
 
-masked_cube_string = "YWYWWWYWYYYYYYYYYYYGYYGYYYYYBYYBYYYYYRYYRYYYYYOYYOYYYY"
-start_time = time()
-result = run_cube_states(masked_cube_string, 20)
-print(f"Result length: {len(result)}")
-with open("white_cross_states.json", "w") as f:
-    json.dump(result, f)
-print(f"Time taken: {time() - start_time} seconds")
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,50 @@
+"""
+Process pools whose workers are all warm before any work is timed or served.
+Every worker runs an initializer, typically a first solve that loads the
+solver tables, and waits at a barrier, so warm_pool only returns once all of
+them are ready. Shared by the solve server and the solver benchmark.
+"""
+
+import multiprocessing
+import os
+from concurrent.futures import ProcessPoolExecutor
+
+# workers are started fresh rather than forked from a parent that may run
+# threads, like the event loop of the solve server
+START_METHOD = (
+    "forkserver" if "forkserver" in multiprocessing.get_all_start_methods() else "spawn"
+)
+
+
+def _warm_worker(barrier, initializer, initargs):
+    """
+    Run a worker's initializer, then wait at the barrier for the others.
+    The barrier is passed even if the initializer fails, the pool breaks then.
+    """
+    try:
+        initializer(*initargs)
+    finally:
+        barrier.wait()
+
+
+def warm_pool(workers, initializer, initargs=()):
+    """
+    Start a process pool and return it once every worker has run
+    initializer(*initargs). The workers are started with START_METHOD.
+    """
+    context = multiprocessing.get_context(START_METHOD)
+    barrier = context.Barrier(workers + 1)
+    executor = ProcessPoolExecutor(
+        workers,
+        mp_context=context,
+        initializer=_warm_worker,
+        initargs=(barrier, initializer, initargs),
+    )
+    # a task per worker makes the pool start all of them, also where it
+    # starts workers on demand, as none is idle before the barrier
+    started = [executor.submit(os.getpid) for _ in range(workers)]
+    barrier.wait()
+    for future in started:
+        # raises BrokenProcessPool if an initializer failed
+        future.result()
+    return executor